@@ -1,5 +1,18 @@
 from .core import Tool
 from .core import toolkit
 
-from . import ui
-from .ui.widgets.toolbar import launch
\ No newline at end of file
+# -- The user interface requires Qt, whereas discovering and running tools
+# -- does not. Without it the core remains usable, and launching reports
+# -- why the interface is unavailable
+try:
+    from . import ui
+    from .ui.widgets.toolbar import launch
+
+except ImportError as _error:
+    _UI_ERROR = str(_error)
+
+    # ----------------------------------------------------------------------------------------------
+    def launch(*args, **kwargs):
+        raise ImportError(
+            'The carapace interface is unavailable : {}'.format(_UI_ERROR),
+        )
@@ -1,9 +1,18 @@
 import os
-from .vendors import scribble
+import time
+import threading
 from .vendors import factories
 from . import constants
 
 
+# -- Toolkits are shared across the process rather than being searched again each time one is
+# -- asked for. Each is keyed by the locations it searches along with the value of the environment
+# -- variable, alongside the time it was last searched
+_toolkits = dict()
+_refreshed = dict()
+_toolkits_lock = threading.RLock()
+
+
 # --------------------------------------------------------------------------------------------------
 def _get_resource(name):
     return os.path.join(
@@ -14,18 +23,20 @@ def _get_resource(name):
 
 
 # --------------------------------------------------------------------------------------------------
-def toolkit(additional_paths=None):
+def tool_paths(additional_paths=None):
     """
-    Returns a factory containing all the carapace tools available for use.
+    Returns all the locations which carapace tools are searched for within, in
+    the order they are searched. Any location given more than once - including
+    through a symlink - is only returned the first time it is given.
 
-    :param additional_paths: Any additional locations you want to specify. Each location
-        will be added to the factories search locations.
+    :param additional_paths: Any additional locations you want to specify. These
+        are searched before the built in tools and the environment locations.
     :type additional_paths: list
 
-    :return: factories.Factory instance
+    :return: list(str, ...)
     """
     # -- Allow the user to give additional paths to find carapace tools
-    paths = additional_paths or list()
+    paths = list(additional_paths or list())
     paths.append(
         os.path.join(
             os.path.dirname(__file__),
@@ -33,13 +44,162 @@ def toolkit(additional_paths=None):
         ),
     )
 
-    return factories.Factory(
-        abstract=Tool,
-        plugin_identifier='Identifier',
-        envvar=constants.CARAPACE_TOOL_PATHS_ENVVAR,
-        paths=paths,
+    # -- Followed by any paths given through the environment
+    paths.extend(
+        path
+        for path in os.environ.get(constants.CARAPACE_TOOL_PATHS_ENVVAR, '').split(';')
+        if path
     )
 
+    # -- Searching the same location twice would give us nothing new
+    unique = list()
+    seen = set()
+
+    for path in paths:
+        canonical = _canonical(path)
+
+        if canonical in seen:
+            continue
+
+        seen.add(canonical)
+        unique.append(path)
+
+    return unique
+
+
+# --------------------------------------------------------------------------------------------------
+def _canonical(path):
+    return os.path.normcase(os.path.realpath(path))
+
+
+# --------------------------------------------------------------------------------------------------
+def _toolkit_key(paths):
+    """
+    Returns the key the toolkit searching the given paths is shared under
+    """
+    return (
+        tuple(_canonical(path) for path in paths),
+        os.environ.get(constants.CARAPACE_TOOL_PATHS_ENVVAR, ''),
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+def toolkit(additional_paths=None, search=True, max_age=None):
+    """
+    Returns a factory containing all the carapace tools available for use.
+
+    The factory is shared across the process, so asking for the toolkit of the same locations
+    (with the same environment) again returns the factory which has already been searched. Use
+    refresh to search the locations again, or invalidate to have the next call create a new
+    factory.
+
+    :param additional_paths: Any additional locations you want to specify. Each location
+        will be added to the factories search locations.
+    :type additional_paths: list
+
+    :param search: If False, any locations which have not yet been searched are left for the
+        caller to add as and when it chooses, such as through the factories iter_add_path.
+    :type search: bool
+
+    :param max_age: If given, a shared factory which was last searched more than this many
+        seconds ago is searched again before being returned. Only files which have changed
+        are scanned.
+    :type max_age: float
+
+    :return: factories.Factory instance
+    """
+    paths = tool_paths(additional_paths)
+    key = _toolkit_key(paths)
+
+    with _toolkits_lock:
+        kit = _toolkits.get(key)
+
+        if kit is None:
+            kit = factories.Factory(
+                abstract=Tool,
+                plugin_identifier='Identifier',
+            )
+
+            _toolkits[key] = kit
+            _refreshed[key] = time.time()
+
+        elif max_age is not None and time.time() - _refreshed[key] >= max_age:
+            kit.reload()
+            _refreshed[key] = time.time()
+
+        # -- Search any locations which have not already been searched
+        if search:
+            searched = kit.paths()
+
+            for path in paths:
+                if path not in searched:
+                    kit.add_path(path)
+
+    return kit
+
+
+# --------------------------------------------------------------------------------------------------
+def refresh(additional_paths=None, full=False):
+    """
+    Searches the locations of the shared toolkit again, returning it. Only files which have
+    been added or changed since they were last searched are scanned, unless a full refresh is
+    asked for.
+
+    :param additional_paths: The additional locations the toolkit was asked for with
+    :type additional_paths: list
+
+    :param full: If True, every tool is forgotten and all the locations are searched afresh
+    :type full: bool
+
+    :return: factories.Factory instance
+    """
+    paths = tool_paths(additional_paths)
+    key = _toolkit_key(paths)
+
+    with _toolkits_lock:
+        if key not in _toolkits:
+            return toolkit(additional_paths)
+
+        kit = _toolkits[key]
+        kit.reload(full=full)
+
+        # -- Pick up any locations which were left unsearched
+        searched = kit.paths()
+
+        for path in paths:
+            if path not in searched:
+                kit.add_path(path)
+
+        _refreshed[key] = time.time()
+
+    return kit
+
+
+# --------------------------------------------------------------------------------------------------
+def invalidate(additional_paths=None, everything=False):
+    """
+    Forgets the shared toolkit of the given locations, so the next call to toolkit creates and
+    searches a new one. Anything still holding the previous toolkit may continue to use it.
+
+    :param additional_paths: The additional locations the toolkit was asked for with
+    :type additional_paths: list
+
+    :param everything: If True, every shared toolkit is forgotten
+    :type everything: bool
+
+    :return: None
+    """
+    with _toolkits_lock:
+        if everything:
+            _toolkits.clear()
+            _refreshed.clear()
+            return
+
+        key = _toolkit_key(tool_paths(additional_paths))
+
+        _toolkits.pop(key, None)
+        _refreshed.pop(key, None)
+
 
 # --------------------------------------------------------------------------------------------------
 class Tool(object):
@@ -59,6 +219,10 @@ class Tool(object):
     @classmethod
     def options(cls):
 
+        # -- Stored options are only read when asked for, so the core can
+        # -- be used (and tested) without scribble being available
+        from .vendors import scribble
+
         settings = dict()
 
         for k, v in cls.DEFAULT_OPTIONS.items():
@@ -0,0 +1,4 @@
+"""
+This contains the tests run over the core of carapace, such as the sharing
+of the toolkit across the process.
+"""
@@ -0,0 +1,298 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from carapace import core
+from carapace import constants
+
+
+# -- The source of a tool written into a temporary location
+_TEMP_TOOL = (
+    'from carapace.core import Tool\n'
+    '\n'
+    '\n'
+    'class {name}(Tool):\n'
+    '    Identifier = \'{name}\'\n'
+)
+
+
+# --------------------------------------------------------------------------------------------------
+def _write_tool(directory, name):
+    filepath = os.path.join(directory, '{}.py'.format(name.lower()))
+
+    with open(filepath, 'w') as f:
+        f.write(_TEMP_TOOL.format(name=name))
+
+    return filepath
+
+
+# --------------------------------------------------------------------------------------------------
+class ToolkitTests(unittest.TestCase):
+    """
+    Tests the sharing of the toolkit across the process
+    """
+
+    # ----------------------------------------------------------------------------------------------
+    def setUp(self):
+
+        # -- Only search the locations given by the tests
+        environment = os.environ.pop(constants.CARAPACE_TOOL_PATHS_ENVVAR, None)
+
+        if environment is not None:
+            self.addCleanup(
+                os.environ.__setitem__,
+                constants.CARAPACE_TOOL_PATHS_ENVVAR,
+                environment,
+            )
+
+        # -- Every test starts and ends without any shared toolkits
+        core.invalidate(everything=True)
+        self.addCleanup(core.invalidate, everything=True)
+
+        self.directory = self._mkdtemp()
+
+        _write_tool(self.directory, 'Hammer')
+
+    # ----------------------------------------------------------------------------------------------
+    def _mkdtemp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+
+        return directory
+
+    # ----------------------------------------------------------------------------------------------
+    def test_toolkit_is_shared(self):
+        """
+        Ensures asking for the toolkit of the same locations again gives
+        the factory which has already been searched
+
+        :return:
+        """
+        kit = core.toolkit([self.directory])
+
+        self.assertIn('Hammer', kit.identifiers())
+        self.assertIs(core.toolkit([self.directory]), kit)
+
+        # -- Other locations have a toolkit of their own
+        self.assertIsNot(core.toolkit([self._mkdtemp()]), kit)
+
+    # ----------------------------------------------------------------------------------------------
+    def test_toolkit_is_not_searched_again(self):
+        """
+        Ensures the shared toolkit does not see tools added since it was
+        searched, unless it has expired
+
+        :return:
+        """
+        core.toolkit([self.directory])
+
+        _write_tool(self.directory, 'Saw')
+
+        self.assertNotIn(
+            'Saw',
+            core.toolkit([self.directory], max_age=60).identifiers(),
+        )
+
+    # ----------------------------------------------------------------------------------------------
+    def test_toolkit_expires(self):
+        """
+        Ensures a shared toolkit which was searched longer ago than the
+        max_age is searched again before being given
+
+        :return:
+        """
+        kit = core.toolkit([self.directory])
+
+        _write_tool(self.directory, 'Saw')
+
+        # -- Pretend the toolkit was searched a while ago
+        key = core._toolkit_key(core.tool_paths([self.directory]))
+        core._refreshed[key] -= 120
+
+        self.assertIs(core.toolkit([self.directory], max_age=60), kit)
+        self.assertIn('Saw', kit.identifiers())
+
+    # ----------------------------------------------------------------------------------------------
+    def test_toolkit_without_searching(self):
+        """
+        Ensures the locations of a toolkit can be left for the caller
+        to search
+
+        :return:
+        """
+        kit = core.toolkit([self.directory], search=False)
+
+        self.assertEqual(kit.paths(), [])
+
+    # ----------------------------------------------------------------------------------------------
+    def test_refresh(self):
+        """
+        Ensures refreshing the toolkit finds the tools added since it was
+        searched, whilst keeping the same factory
+
+        :return:
+        """
+        kit = core.toolkit([self.directory])
+
+        _write_tool(self.directory, 'Saw')
+
+        self.assertIs(core.refresh([self.directory]), kit)
+        self.assertIn('Saw', kit.identifiers())
+
+    # ----------------------------------------------------------------------------------------------
+    def test_refresh_full(self):
+        """
+        Ensures a full refresh forgets every tool - including those which
+        were registered directly - before searching again
+
+        :return:
+        """
+        class Chisel(core.Tool):
+            Identifier = 'Chisel'
+
+        kit = core.toolkit([self.directory])
+        kit.register(Chisel)
+
+        core.refresh([self.directory])
+
+        self.assertIn('Chisel', kit.identifiers())
+
+        self.assertIs(core.refresh([self.directory], full=True), kit)
+        self.assertNotIn('Chisel', kit.identifiers())
+        self.assertIn('Hammer', kit.identifiers())
+
+    # ----------------------------------------------------------------------------------------------
+    def test_refresh_without_toolkit(self):
+        """
+        Ensures refreshing locations which have no shared toolkit creates
+        and searches one
+
+        :return:
+        """
+        kit = core.refresh([self.directory])
+
+        self.assertIn('Hammer', kit.identifiers())
+        self.assertIs(core.toolkit([self.directory]), kit)
+
+    # ----------------------------------------------------------------------------------------------
+    def test_invalidate(self):
+        """
+        Ensures invalidating a toolkit only forgets the toolkit of the
+        given locations
+
+        :return:
+        """
+        other_directory = self._mkdtemp()
+
+        kit = core.toolkit([self.directory])
+        other_kit = core.toolkit([other_directory])
+
+        core.invalidate([self.directory])
+
+        self.assertIsNot(core.toolkit([self.directory]), kit)
+        self.assertIs(core.toolkit([other_directory]), other_kit)
+
+    # ----------------------------------------------------------------------------------------------
+    def test_invalidate_everything(self):
+        """
+        Ensures every shared toolkit can be forgotten at once
+
+        :return:
+        """
+        other_directory = self._mkdtemp()
+
+        kit = core.toolkit([self.directory])
+        other_kit = core.toolkit([other_directory])
+
+        core.invalidate(everything=True)
+
+        self.assertIsNot(core.toolkit([self.directory]), kit)
+        self.assertIsNot(core.toolkit([other_directory]), other_kit)
+
+
+# --------------------------------------------------------------------------------------------------
+class ToolPathsTests(unittest.TestCase):
+    """
+    Tests the locations tools are searched for within
+    """
+
+    # ----------------------------------------------------------------------------------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+        environment = os.environ.get(constants.CARAPACE_TOOL_PATHS_ENVVAR)
+
+        if environment is None:
+            self.addCleanup(os.environ.pop, constants.CARAPACE_TOOL_PATHS_ENVVAR, None)
+
+        else:
+            self.addCleanup(
+                os.environ.__setitem__,
+                constants.CARAPACE_TOOL_PATHS_ENVVAR,
+                environment,
+            )
+
+        os.environ[constants.CARAPACE_TOOL_PATHS_ENVVAR] = ''
+
+    # ----------------------------------------------------------------------------------------------
+    def test_order(self):
+        """
+        Ensures additional locations are searched before the built in tools,
+        which are searched before the environment locations
+
+        :return:
+        """
+        environment_directory = os.path.join(self.directory, 'environment')
+        os.environ[constants.CARAPACE_TOOL_PATHS_ENVVAR] = environment_directory
+
+        paths = core.tool_paths([self.directory])
+
+        self.assertEqual(paths[0], self.directory)
+        self.assertEqual(os.path.basename(paths[1]), 'tools')
+        self.assertEqual(paths[2], environment_directory)
+
+    # ----------------------------------------------------------------------------------------------
+    def test_duplicates_are_removed(self):
+        """
+        Ensures a location given more than once is only searched the first
+        time it is given
+
+        :return:
+        """
+        os.environ[constants.CARAPACE_TOOL_PATHS_ENVVAR] = self.directory
+
+        paths = core.tool_paths(
+            [
+                self.directory,
+                os.path.join(self.directory, '.'),
+            ],
+        )
+
+        self.assertEqual(paths.count(self.directory), 1)
+        self.assertEqual(len(paths), 2)
+
+    # ----------------------------------------------------------------------------------------------
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'Requires symlinks')
+    def test_symlinks_are_removed(self):
+        """
+        Ensures a location given through a symlink is not searched again
+
+        :return:
+        """
+        target = os.path.join(self.directory, 'target')
+        link = os.path.join(self.directory, 'link')
+
+        os.makedirs(target)
+
+        try:
+            os.symlink(target, link)
+
+        except OSError:
+            self.skipTest('Symlinks cannot be created')
+
+        self.assertEqual(core.tool_paths([target, link])[0], target)
+        self.assertNotIn(link, core.tool_paths([target, link]))
+        self.assertEqual(core.tool_paths([link, target])[0], link)
+        self.assertNotIn(target, core.tool_paths([link, target]))
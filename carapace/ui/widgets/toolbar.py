@@ -11,10 +11,17 @@ from ...import core
 # --------------------------------------------------------------------------------------------------
 class Toolbar(qute.QWidget):
 
+    # -- Emitted with the identifiers of any tools which have been added
+    # -- or removed from the toolkit. This may be emitted from the toolkits
+    # -- watcher thread, so the signal is used to update on the ui thread
+    toolsChanged = qute.Signal(object)
+
     # ----------------------------------------------------------------------------------------------
-    def __init__(self, additional_paths=None, parent=None):
+    def __init__(self, additional_paths=None, parent=None, watch=False):
         super(Toolbar, self).__init__(parent=parent)
 
+        self.group_name = None
+
         with open(resources.get('struct.json'), 'r') as f:
             self.layout_data = json.load(f)
 
@@ -25,8 +32,28 @@ class Toolbar(qute.QWidget):
             ),
         )
 
-        # -- Get a toolkit instance
-        self.toolkit = core.toolkit(additional_paths=additional_paths)
+        # -- Get the shared toolkit. Any of its paths which have not already been
+        # -- searched are searched once the ui is showing, so tools can appear as
+        # -- soon as they are found
+        self.toolkit = core.toolkit(additional_paths=additional_paths, search=False)
+        self._search_paths = core.tool_paths(additional_paths)
+        self._watch = watch
+
+        # -- Keep track of tools being added or removed so we can
+        # -- update only when the visible tools are affected
+        self.toolsChanged.connect(self.updateTools)
+        self.toolkit.add_callback(self.toolkit.ADDED, self._toolkitChanged)
+        self.toolkit.add_callback(self.toolkit.REMOVED, self._toolkitChanged)
+
+        # -- The toolkit outlives us, so we must stop listening to it
+        # -- once we are gone
+        toolkit, callback = self.toolkit, self._toolkitChanged
+        self.destroyed.connect(
+            lambda *args: [
+                toolkit.remove_callback(event, callback)
+                for event in (toolkit.ADDED, toolkit.REMOVED)
+            ],
+        )
 
         # -- Create the switcher
         self.switcher = switcher.Switcher(
@@ -48,23 +75,70 @@ class Toolbar(qute.QWidget):
 
         self.setToolGroup('Test')
 
+        qute.QTimer.singleShot(0, self.searchTools)
+
     # ----------------------------------------------------------------------------------------------
-    def setToolGroup(self, group_name):
+    def searchTools(self):
+
+        # -- Stream the tools in, showing each one which belongs to the
+        # -- current group as soon as it is found rather than once every
+        # -- path has been searched
+        for path in self._search_paths:
+
+            # -- The shared toolkit may already have searched this path
+            if path in self.toolkit.paths():
+                continue
+
+            for tool in self.toolkit.iter_add_path(path):
+                self.updateTools([tool.Identifier])
+                qute.QApplication.processEvents()
+
+        # -- Only watch the paths once they have all been searched
+        if self._watch:
+            self.toolkit.watch()
+
+    # ----------------------------------------------------------------------------------------------
+    def _toolkitChanged(self, plugins):
+        self.toolsChanged.emit(
+            {
+                plugin.Identifier
+                for plugin in plugins
+            },
+        )
 
-        tools_in_panel = list()
+    # ----------------------------------------------------------------------------------------------
+    def toolsInGroup(self, group_name):
 
         for panel in self.layout_data:
             if group_name == panel['panel_name']:
-                tools_in_panel = panel['tools']
+                return panel['tools']
+
+        return list()
+
+    # ----------------------------------------------------------------------------------------------
+    def updateTools(self, identifiers):
+
+        # -- Only rebuild the buttons if the changed tools are shown
+        if set(identifiers).intersection(self.toolsInGroup(self.group_name)):
+            self.setToolGroup(self.group_name)
+
+    # ----------------------------------------------------------------------------------------------
+    def setToolGroup(self, group_name):
+
+        self.group_name = group_name
+        tools_in_panel = self.toolsInGroup(group_name)
 
         # -- Now clear the tool layout
         qute.utilities.layouts.empty(self.tool_layout)
 
+        # -- Take the available identifiers once, rather than per tool
+        identifiers = self.toolkit.identifiers()
+
         # -- Now add in a tool item
         for tool_name in tools_in_panel:
 
             # -- If this is an invalid tool we cannot show it
-            if tool_name not in self.toolkit.identifiers():
+            if tool_name not in identifiers:
                 continue
 
             # -- Instance the tool, passing the tool plugin
@@ -86,24 +160,26 @@ class Toolbar(qute.QWidget):
 class ToolKitWindow(qute.QMainWindow):
 
     # --------------------------------------------------------------------------
-    def __init__(self, additional_paths=None, parent=None):
+    def __init__(self, additional_paths=None, parent=None, watch=False):
         super(ToolKitWindow, self).__init__(parent=parent)
 
         self.setCentralWidget(
             Toolbar(
                 additional_paths=additional_paths,
+                watch=watch,
                 parent=self,
             ),
         )
 
 
 # --------------------------------------------------------------------------------------------------
-def launch(additional_paths=None):
+def launch(additional_paths=None, watch=False):
 
     q_app = qute.qApp([])
 
     w = ToolKitWindow(
         additional_paths=additional_paths,
+        watch=watch,
         parent=qute.utilities.windows.mainWindow(),
     )
     w.show()
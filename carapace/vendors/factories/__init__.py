@@ -66,6 +66,21 @@ from .factory import (
     enable_debugging,
 )
 
+from .proxy import (
+    PluginProxy,
+)
+
+from .cache import (
+    DiscoveryCache,
+)
+
+from .report import (
+    LoadReport,
+    UnloadReport,
+)
+
+from . import scanner
+
 from .constants import (
     log,
 )
@@ -0,0 +1,229 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module allows plugins to be bundled within a zip archive (or a wheel,
+which is a zip archive by another name). The archive is read from disk in
+a single pass and all the plugin files within it are then served from
+memory, which is far cheaper than opening many small files - particularly
+on network shares.
+
+Files within an archive are addressed as though the archive were a
+directory, for example /tools/bundle.zip/package/plugin.py
+"""
+from . import cache
+from . import prefetch
+
+import io
+import os
+import sys
+import zipfile
+
+
+# -- The extensions of the files which are treated as archives
+EXTENSIONS = ('.zip', '.whl')
+
+
+# ------------------------------------------------------------------------------
+def is_archive(path):
+    """
+    Returns True if the given path is an archive which plugins can be
+    loaded from.
+
+    :param path: Absolute path
+    :type path: str
+
+    :return: bool
+    """
+    return path.lower().endswith(EXTENSIONS) and os.path.isfile(path)
+
+
+# ------------------------------------------------------------------------------
+class Archive(object):
+    """
+    Holds the content of all the python files within an archive, having read
+    the archive in one go.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filepath, match=None):
+        """
+        :param filepath: Absolute path to the archive
+        :type filepath: str
+
+        :param match: Optional callable which is given the name of each
+            file in the archive and returns whether it should be read
+        :type match: callable
+        """
+        self.filepath = os.path.abspath(filepath)
+        self.stamp = cache.stamp(filepath)
+
+        # -- virtual filepath -> (zipfile.ZipInfo, bytes)
+        self.members = dict()
+
+        # -- The directories which are packages within the archive
+        self._packages = set()
+
+        # -- Read the archive in a single sequential read, and then
+        # -- work with it entirely in memory
+        with open(self.filepath, 'rb') as f:
+            data = f.read()
+
+        with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+            for info in bundle.infolist():
+
+                directory, filename = os.path.split(info.filename)
+
+                if filename in ('__init__.py', '__init__.pyc'):
+                    self._packages.add(directory)
+
+                if match and not match(filename):
+                    continue
+
+                if not filename.endswith(('.py', '.pyc')):
+                    continue
+
+                self.members[self._filepath(info.filename)] = (
+                    info,
+                    bundle.read(info),
+                )
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[Archive - {} ({} files)]'.format(
+            self.filepath,
+            len(self.members),
+        )
+
+    # --------------------------------------------------------------------------
+    def _filepath(self, name):
+        """
+        Returns the virtual filepath of the given archive member name
+        """
+        return os.path.join(self.filepath, *name.split('/'))
+
+    # --------------------------------------------------------------------------
+    def _name(self, filepath):
+        """
+        Returns the archive member name of the given virtual filepath
+        """
+        relative = filepath[len(self.filepath) + 1:]
+        return relative.replace(os.sep, '/')
+
+    # --------------------------------------------------------------------------
+    def contains(self, filepath):
+        """
+        Returns True if the given filepath is within this archive
+
+        :param filepath: Absolute (virtual) filepath
+        :type filepath: str
+
+        :return: bool
+        """
+        return filepath in self.members
+
+    # --------------------------------------------------------------------------
+    def filepaths(self):
+        """
+        Returns the virtual filepaths of all the python files in the archive,
+        in the order they are stored.
+
+        :return: list(str, ...)
+        """
+        return list(self.members.keys())
+
+    # --------------------------------------------------------------------------
+    def file_stamp(self, filepath):
+        """
+        Returns the stamp of a file within the archive. This is formed from
+        the modification time of the archive and the size of the file, so
+        every file is considered changed if the archive is rewritten.
+
+        :param filepath: Absolute (virtual) filepath
+        :type filepath: str
+
+        :return: tuple or None
+        """
+        if not self.stamp or filepath not in self.members:
+            return None
+
+        return self.stamp[0], self.members[filepath][0].file_size
+
+    # --------------------------------------------------------------------------
+    def source(self, filepath):
+        """
+        Returns the content of a file within the archive
+
+        :param filepath: Absolute (virtual) filepath
+        :type filepath: str
+
+        :return: bytes
+        """
+        return self.members[filepath][1]
+
+    # --------------------------------------------------------------------------
+    def compile(self, filepath):
+        """
+        Returns the compiled code of a file within the archive
+
+        :param filepath: Absolute (virtual) filepath
+        :type filepath: str
+
+        :return: code or None if the file cannot be compiled
+        """
+        # noinspection PyProtectedMember
+        return prefetch._compile(filepath, self.source(filepath))
+
+    # --------------------------------------------------------------------------
+    def module_name(self, filepath):
+        """
+        Returns the name the given file would be imported as if the archive
+        were on the sys.path. Files within directories which are not
+        packages cannot be imported, in which case None is returned.
+
+        :param filepath: Absolute (virtual) filepath
+        :type filepath: str
+
+        :return: str or None
+        """
+        parts = self._name(filepath).split('/')
+        module = os.path.splitext(parts.pop())[0]
+
+        for index in range(len(parts)):
+            if '/'.join(parts[:index + 1]) not in self._packages:
+                return None
+
+        if module == '__init__':
+            return '.'.join(parts) or None
+
+        return '.'.join(parts + [module])
+
+    # --------------------------------------------------------------------------
+    def is_importable(self):
+        """
+        Returns True if the archive is on the sys.path, meaning its modules
+        can be imported through zipimport.
+
+        :return: bool
+        """
+        return any(
+            os.path.abspath(path) == self.filepath
+            for path in sys.path
+            if path
+        )
@@ -0,0 +1,559 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module benchmarks the factory against synthetic plugin trees of
+varying sizes, so that changes to discovery can be measured rather than
+guessed at. Each tree is a package of plugin files - optionally nested,
+holding several versions of each plugin and some files which fail to
+import - and every public factory operation is timed against it.
+
+The results are written as json, and a previous set of results can be
+given to compare against:
+
+.. code-block:: bash
+
+    python -m factories.benchmark --sizes 100 1000 10000 --output new.json
+    python -m factories.benchmark --output new.json --compare old.json
+"""
+from . import factory as _factory
+from .factory import Factory
+from . import __version__
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import importlib
+
+# -- Use the highest resolution timer available
+try:
+    _timer = time.perf_counter
+
+except AttributeError:
+    _timer = time.time
+
+
+# -- The plugin sizes measured by default
+SIZES = (100, 1000, 10000)
+
+# -- The mechanisms add_path is measured with
+MECHANISMS = (
+    ('GUESS', Factory.GUESS),
+    ('IMPORTABLE', Factory.IMPORTABLE),
+    ('LOAD_SOURCE', Factory.LOAD_SOURCE),
+)
+
+_ABSTRACT = '''
+class BenchmarkPlugin(object):
+    identifier = ''
+    version = 0
+'''
+
+_PLUGIN = '''
+class Plugin{index}(BenchmarkPlugin):
+    identifier = 'plugin_{identifier}'
+    version = {version}
+'''
+
+_BROKEN = '''
+raise ImportError('This file is broken for benchmarking purposes')
+'''
+
+
+# ------------------------------------------------------------------------------
+class Tree(object):
+    """
+    Describes a synthetic plugin tree which has been written to disk
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, root, package, plugins, files, identifiers):
+        """
+        :param root: The directory holding the package, which must be on
+            the sys.path for the package to be imported
+        :type root: str
+
+        :param package: The name of the package
+        :type package: str
+
+        :param plugins: The number of plugins within the tree
+        :type plugins: int
+
+        :param files: The number of plugin files within the tree, including
+            any broken files
+        :type files: int
+
+        :param identifiers: The identifiers of the plugins
+        :type identifiers: list(str, ...)
+        """
+        self.root = root
+        self.package = package
+        self.plugins = plugins
+        self.files = files
+        self.identifiers = identifiers
+
+    # --------------------------------------------------------------------------
+    @property
+    def path(self):
+        """
+        The path to give to a factory
+
+        :return: str
+        """
+        return os.path.join(self.root, self.package)
+
+    # --------------------------------------------------------------------------
+    def abstract(self):
+        """
+        Imports and returns the abstract the plugins in the tree inherit from
+
+        :return: class
+        """
+        return importlib.import_module(
+            '{}.abstract'.format(self.package),
+        ).BenchmarkPlugin
+
+    # --------------------------------------------------------------------------
+    def purge(self):
+        """
+        Removes every module of the tree (other than the abstract) from
+        sys.modules so each measurement starts from a cold interpreter.
+
+        :return: None
+        """
+        keep = '{}.abstract'.format(self.package)
+
+        for name in list(sys.modules.keys()):
+            if name == keep or name == self.package:
+                continue
+
+            if name.startswith(self.package + '.'):
+                sys.modules.pop(name, None)
+
+        # -- Modules loaded directly are shared between factories, so
+        # -- these need to be forgotten too
+        prefix = os.path.join(self.path, '')
+
+        # noinspection PyProtectedMember
+        with _factory._loaded_lock:
+            # noinspection PyProtectedMember
+            loaded = _factory._loaded_modules
+
+            for filepath in list(loaded.keys()):
+                if filepath.startswith(prefix):
+                    module_name = loaded.pop(filepath)
+
+                    sys.modules.pop(module_name, None)
+
+                    # noinspection PyProtectedMember
+                    _factory._module_users.pop(module_name, None)
+
+
+# ------------------------------------------------------------------------------
+def _write(filepath, content):
+    with open(filepath, 'w') as f:
+        f.write(content)
+
+
+# ------------------------------------------------------------------------------
+def generate(root,
+             plugins,
+             plugins_per_file=5,
+             files_per_directory=20,
+             depth=2,
+             versions=2,
+             broken=0.01,
+             package=None):
+    """
+    Writes a synthetic plugin tree to disk
+
+    :param root: The directory to write the tree into
+    :type root: str
+
+    :param plugins: The number of plugins to generate
+    :type plugins: int
+
+    :param plugins_per_file: The number of plugins defined in each file
+    :type plugins_per_file: int
+
+    :param files_per_directory: The number of files in each directory
+    :type files_per_directory: int
+
+    :param depth: How deeply the directories are nested within the package
+    :type depth: int
+
+    :param versions: The number of versions of each plugin identifier
+    :type versions: int
+
+    :param broken: The proportion of additional files which fail to import
+    :type broken: float
+
+    :param package: The name of the package to generate. A unique name
+        is used by default.
+    :type package: str
+
+    :return: Tree
+    """
+    package = package or 'factories_benchmark_{}'.format(plugins)
+    package_path = os.path.join(root, package)
+
+    os.makedirs(package_path)
+    _write(os.path.join(package_path, '__init__.py'), '')
+    _write(os.path.join(package_path, 'abstract.py'), _ABSTRACT)
+
+    header = 'from {}.abstract import BenchmarkPlugin\n\n'.format(package)
+
+    file_count = max(1, -(-plugins // plugins_per_file))
+    broken_count = int(file_count * broken)
+    directories = set()
+    identifiers = set()
+
+    for index in range(file_count + broken_count):
+
+        # -- Spread the files over nested directories
+        parts = ['group_{}'.format(index // files_per_directory)]
+        parts.extend(['nested'] * (max(depth, 1) - 1))
+
+        directory = package_path
+
+        for part in parts:
+            directory = os.path.join(directory, part)
+
+            if directory not in directories:
+                os.makedirs(directory)
+                _write(os.path.join(directory, '__init__.py'), '')
+                directories.add(directory)
+
+        filepath = os.path.join(directory, 'plugins_{}.py'.format(index))
+
+        if index >= file_count:
+            _write(filepath, _BROKEN)
+            continue
+
+        content = [header]
+
+        first = index * plugins_per_file
+
+        for plugin in range(first, min(first + plugins_per_file, plugins)):
+            identifier = plugin // versions
+            identifiers.add('plugin_{}'.format(identifier))
+
+            content.append(
+                _PLUGIN.format(
+                    index=plugin,
+                    identifier=identifier,
+                    version=plugin % versions + 1,
+                ),
+            )
+
+        _write(filepath, '\n'.join(content))
+
+    return Tree(
+        root=root,
+        package=package,
+        plugins=plugins,
+        files=file_count + broken_count,
+        identifiers=sorted(identifiers),
+    )
+
+
+# ------------------------------------------------------------------------------
+def _measure(function, repeat):
+    """
+    Calls the given function the given number of times, returning the
+    timings of each call.
+    """
+    timings = list()
+
+    for _ in range(repeat):
+        start = _timer()
+        function()
+        timings.append(_timer() - start)
+
+    return timings
+
+
+# ------------------------------------------------------------------------------
+def _result(tree, operation, timings, calls=1):
+    """
+    Builds the result dictionary of a measured operation
+    """
+    return dict(
+        plugins=tree.plugins,
+        files=tree.files,
+        operation=operation,
+        calls=calls,
+        best=min(timings),
+        mean=sum(timings) / len(timings),
+        per_call=min(timings) / calls,
+    )
+
+
+# ------------------------------------------------------------------------------
+def measure(tree, repeat=3):
+    """
+    Measures every factory operation against the given tree
+
+    :param tree: The tree to measure against
+    :type tree: Tree
+
+    :param repeat: The number of times to measure each operation
+    :type repeat: int
+
+    :return: list(dict, ...)
+    """
+    results = list()
+    abstract = tree.abstract()
+
+    def factory():
+        return Factory(
+            abstract=abstract,
+            plugin_identifier='identifier',
+            versioning_identifier='version',
+            log_errors=False,
+        )
+
+    # -- Discovery, with each mechanism starting from a cold
+    # -- interpreter so that imports are not shared between them
+    for name, mechanism in MECHANISMS:
+        timings = list()
+
+        for _ in range(repeat):
+            tree.purge()
+            instance = factory()
+
+            start = _timer()
+            instance.add_path(tree.path, mechanism=mechanism)
+            timings.append(_timer() - start)
+
+        results.append(
+            _result(tree, 'add_path[{}]'.format(name), timings),
+        )
+
+    # -- Everything else is measured against a populated factory
+    tree.purge()
+    instance = factory()
+    instance.add_path(tree.path)
+
+    identifiers = tree.identifiers
+
+    def request():
+        for identifier in identifiers:
+            instance.request(identifier)
+
+    def versions():
+        for identifier in identifiers:
+            instance.versions(identifier)
+
+    for operation, function, calls in [
+            ('request', request, len(identifiers)),
+            ('versions', versions, len(identifiers)),
+            ('plugins', instance.plugins, 1),
+            ('identifiers', instance.identifiers, 1),
+            ('reload', instance.reload, 1),
+            ]:
+        results.append(
+            _result(tree, operation, _measure(function, repeat), calls),
+        )
+
+    results.append(
+        _result(
+            tree,
+            'reload[full]',
+            _measure(lambda: instance.reload(full=True), repeat),
+        ),
+    )
+
+    # -- Removing a path can only be done once per population
+    timings = list()
+
+    for _ in range(repeat):
+        instance.add_path(tree.path)
+
+        start = _timer()
+        instance.remove_path(tree.path)
+        timings.append(_timer() - start)
+
+    results.append(_result(tree, 'remove_path', timings))
+
+    tree.purge()
+    return results
+
+
+# ------------------------------------------------------------------------------
+def run(sizes=SIZES, repeat=3, **kwargs):
+    """
+    Generates a tree for each of the given sizes and measures it
+
+    :param sizes: The numbers of plugins to measure
+    :type sizes: list(int, ...)
+
+    :param repeat: The number of times to measure each operation
+    :type repeat: int
+
+    :param kwargs: Any arguments to pass to generate
+
+    :return: dict
+    """
+    results = list()
+    root = tempfile.mkdtemp()
+
+    sys.path.insert(0, root)
+
+    try:
+        for size in sizes:
+            tree = generate(root, size, **kwargs)
+            results.extend(measure(tree, repeat=repeat))
+
+    finally:
+        sys.path.remove(root)
+        shutil.rmtree(root)
+
+    return dict(
+        environment=dict(
+            python=platform.python_version(),
+            implementation=platform.python_implementation(),
+            platform=platform.platform(),
+            factories=__version__,
+            time=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        ),
+        settings=dict(
+            sizes=list(sizes),
+            repeat=repeat,
+            **kwargs
+        ),
+        results=results,
+    )
+
+
+# ------------------------------------------------------------------------------
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two sets of results, returning the operations which have
+    become slower by more than the given threshold.
+
+    :param baseline: The results to compare against
+    :type baseline: dict
+
+    :param current: The results to compare
+    :type current: dict
+
+    :param threshold: The proportion an operation may slow by before it
+        is reported
+    :type threshold: float
+
+    :return: list(dict, ...) of the operation, plugin count and the ratio
+        of the current time to the baseline time.
+    """
+    previous = dict(
+        ((result['operation'], result['plugins']), result['best'])
+        for result in baseline['results']
+    )
+
+    regressions = list()
+
+    for result in current['results']:
+        key = (result['operation'], result['plugins'])
+
+        if not previous.get(key):
+            continue
+
+        ratio = result['best'] / previous[key]
+
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                dict(
+                    operation=result['operation'],
+                    plugins=result['plugins'],
+                    ratio=ratio,
+                ),
+            )
+
+    return regressions
+
+
+# ------------------------------------------------------------------------------
+def main(argv=None):
+    """
+    Command line entry point for running the benchmarks
+
+    :param argv: Arguments to parse, defaults to sys.argv
+    :type argv: list(str, ...)
+
+    :return: exit code, which is 1 if any regressions were found
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmarks factories against synthetic plugin trees',
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--plugins-per-file', type=int, default=5)
+    parser.add_argument('--files-per-directory', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--versions', type=int, default=2)
+    parser.add_argument('--broken', type=float, default=0.01)
+    parser.add_argument('--output', help='Write the results to this file')
+    parser.add_argument('--compare', help='Results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+
+    results = run(
+        sizes=args.sizes,
+        repeat=args.repeat,
+        plugins_per_file=args.plugins_per_file,
+        files_per_directory=args.files_per_directory,
+        depth=args.depth,
+        versions=args.versions,
+        broken=args.broken,
+    )
+
+    for result in results['results']:
+        sys.stdout.write(
+            '{plugins:>6} {operation:<24} {best:.6f}s\n'.format(**result),
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, 'r') as f:
+        regressions = compare(json.load(f), results, args.threshold)
+
+    for regression in regressions:
+        sys.stdout.write(
+            'REGRESSION {plugins:>6} {operation:<24} x{ratio:.2f}\n'.format(
+                **regression
+            ),
+        )
+
+    return 1 if regressions else 0
+
+
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.exit(main())
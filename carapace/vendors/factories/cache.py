@@ -0,0 +1,377 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .constants import log
+
+import os
+import json
+
+
+# ------------------------------------------------------------------------------
+def _replace(source, destination):
+    """
+    Renames the source file over the destination file. Python 2 has no
+    os.replace, and its os.rename will not overwrite a file on windows, so
+    the destination is removed first there. This leaves a moment in which
+    there is no cache file, which readers treat as an empty cache.
+
+    :param source: Absolute path of the file to rename
+    :type source: str
+
+    :param destination: Absolute path to rename the file to
+    :type destination: str
+
+    :return: None
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+        return
+
+    if os.name == 'nt' and os.path.exists(destination):
+        os.remove(destination)
+
+    os.rename(source, destination)
+
+
+# ------------------------------------------------------------------------------
+def stamp(filepath):
+    """
+    Returns the (mtime, size) pair which is used to decide whether a file
+    has changed since it was last inspected.
+
+    :param filepath: Absolute path to the file to stamp
+    :type filepath: str
+
+    :return: tuple(float, int) or None if the file cannot be accessed
+    """
+    try:
+        stat = os.stat(filepath)
+
+    except OSError:
+        return None
+
+    return stat.st_mtime, stat.st_size
+
+
+# ------------------------------------------------------------------------------
+class DiscoveryCache(object):
+    """
+    A DiscoveryCache persists the results of plugin discovery to a json
+    file on disk. Entries are keyed by the abstract (along with the
+    identifier and version attributes) and then by the path of each
+    inspected file, alongside that files mtime and size.
+
+    This allows a factory to rebuild its knowledge of which identifiers and
+    versions are available - and which file defines them - without having
+    to import any file which has not changed since the last session.
+
+    Files which failed to load are also stored, along with the traceback of
+    the failure, so they are not retried until they change.
+
+    As a plugin may derive from a class within another file, what a file
+    gives can change without the file itself changing. Each entry therefore
+    also records the stamps of the files it depends upon, and is only used
+    whilst none of those have changed either.
+    """
+
+    # -- Bump this if the layout of the cache file changes
+    # -- so that old caches are disregarded
+    FORMAT = 3
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filepath):
+        """
+        :param filepath: Absolute path to the json file to store the cache in
+        :type filepath: str
+        """
+        self._filepath = filepath
+        self._data = dict()
+        self._dirty = False
+
+        # -- The stamps of the dependencies which have been checked, as
+        # -- many entries tend to share the same dependencies
+        self._stamps = dict()
+
+        self.load()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[DiscoveryCache - {}]'.format(self._filepath)
+
+    # --------------------------------------------------------------------------
+    @property
+    def filepath(self):
+        """
+        Returns the location of the cache file
+
+        :return: str
+        """
+        return self._filepath
+
+    # --------------------------------------------------------------------------
+    def _read(self):
+        """
+        Reads the cache data from disk, returning an empty cache if the
+        file does not exist or cannot be understood.
+
+        :return: dict
+        """
+        # noinspection PyBroadException
+        try:
+            with open(self._filepath, 'r') as f:
+                data = json.load(f)
+
+        except BaseException:
+            return dict()
+
+        if not isinstance(data, dict) or data.get('format') != self.FORMAT:
+            return dict()
+
+        return data.get('factories', dict())
+
+    # --------------------------------------------------------------------------
+    def load(self):
+        """
+        Reads the cache from disk, discarding anything held in memory.
+
+        :return: None
+        """
+        self._data = self._read()
+        self._stamps = dict()
+        self._dirty = False
+
+    # --------------------------------------------------------------------------
+    def clear_stamps(self):
+        """
+        Forgets the stamps of the dependencies checked so far, so that any
+        changes made to them since are seen. This should be called before
+        each search.
+
+        :return: None
+        """
+        self._stamps = dict()
+
+    # --------------------------------------------------------------------------
+    def _stamp(self, filepath):
+        """
+        Returns the stamp of a dependency, only reading it the first time
+        it is asked for since the stamps were last cleared.
+
+        :param filepath: Absolute path to the dependency
+        :type filepath: str
+
+        :return: list
+        """
+        if filepath not in self._stamps:
+            self._stamps[filepath] = list(stamp(filepath) or ())
+
+        return self._stamps[filepath]
+
+    # --------------------------------------------------------------------------
+    def save(self):
+        """
+        Writes the cache to disk if it has been altered. The file is
+        re-read first so that entries for other abstracts written by other
+        processes are retained.
+
+        :return: True if the cache was written
+        """
+        if not self._dirty:
+            return False
+
+        data = self._read()
+        data.update(self._data)
+
+        temp_filepath = '{}.{}.tmp'.format(self._filepath, os.getpid())
+
+        try:
+            directory = os.path.dirname(self._filepath)
+
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            with open(temp_filepath, 'w') as f:
+                json.dump(
+                    dict(format=self.FORMAT, factories=data),
+                    f,
+                )
+
+            # -- Swap the file in so readers never see a partially
+            # -- written cache
+            _replace(temp_filepath, self._filepath)
+
+        except (OSError, IOError, TypeError, ValueError):
+            log.warning(
+                'Could not write discovery cache : {}'.format(self._filepath),
+            )
+            return False
+
+        self._data = data
+        self._dirty = False
+        return True
+
+    # --------------------------------------------------------------------------
+    def get(self, key, filepath, file_stamp):
+        """
+        Returns the cached entry for the given file, but only if the file
+        has not changed since it was cached.
+
+        :param key: Key identifying the factory configuration
+        :type key: str
+
+        :param filepath: Absolute path of the inspected file
+        :type filepath: str
+
+        :param file_stamp: The current (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :return: dict or None
+        """
+        if not file_stamp:
+            return None
+
+        entry = self._data.get(key, dict()).get(filepath)
+
+        if not entry:
+            return None
+
+        if entry.get('mtime') != file_stamp[0] or \
+                entry.get('size') != file_stamp[1]:
+            return None
+
+        # -- The entry is just as out of date if anything it
+        # -- depends upon has changed
+        for dependency, dependency_stamp in \
+                entry.get('dependencies', dict()).items():
+            if self._stamp(dependency) != dependency_stamp:
+                return None
+
+        return entry
+
+    # --------------------------------------------------------------------------
+    def set(self,
+            key,
+            filepath,
+            file_stamp,
+            mechanism,
+            plugins,
+            failure=None,
+            dependencies=None):
+        """
+        Stores the discovery result for a file.
+
+        :param key: Key identifying the factory configuration
+        :type key: str
+
+        :param filepath: Absolute path of the inspected file
+        :type filepath: str
+
+        :param file_stamp: The (mtime, size) of the file when inspected
+        :type file_stamp: tuple
+
+        :param mechanism: The factory mechanism used to load the file
+        :type mechanism: int
+
+        :param plugins: List of dictionaries, each holding the name of the
+            plugin within the module and the attribute values the factory
+            requires of it.
+        :type plugins: list(dict, dict, ...)
+
+        :param failure: If the file could not be loaded, this should be the
+            traceback of the failure. The file is then known to fail until
+            it changes.
+        :type failure: str
+
+        :param dependencies: The files (or directories) which - should they
+            change - would alter what the file gives, such as the files
+            defining the bases of its classes. Those which cannot be
+            accessed are ignored.
+        :type dependencies: list(str, ...)
+
+        :return: None
+        """
+        if not file_stamp:
+            return
+
+        entry = dict(
+            mtime=file_stamp[0],
+            size=file_stamp[1],
+            mechanism=mechanism,
+            plugins=plugins,
+            dependencies=dict(),
+        )
+
+        for dependency in dependencies or list():
+            dependency_stamp = self._stamp(dependency)
+
+            if dependency_stamp and dependency != filepath:
+                entry['dependencies'][dependency] = dependency_stamp
+
+        if failure:
+            entry['failure'] = failure
+
+        self._data.setdefault(key, dict())[filepath] = entry
+        self._dirty = True
+
+    # --------------------------------------------------------------------------
+    def discard(self, key, filepath):
+        """
+        Removes any entry stored for the given file.
+
+        :param key: Key identifying the factory configuration
+        :type key: str
+
+        :param filepath: Absolute path of the file to forget
+        :type filepath: str
+
+        :return: None
+        """
+        if self._data.get(key, dict()).pop(filepath, None) is not None:
+            self._dirty = True
+
+    # --------------------------------------------------------------------------
+    def prune(self, key, root, filepaths):
+        """
+        Removes all entries within the given root which are not in the
+        given list of files. This is used to forget files which have been
+        deleted since the cache was written.
+
+        :param key: Key identifying the factory configuration
+        :type key: str
+
+        :param root: Directory which was scanned
+        :type root: str
+
+        :param filepaths: All the files which were found during the scan
+        :type filepaths: list(str, str, ...)
+
+        :return: None
+        """
+        entries = self._data.get(key)
+
+        if not entries:
+            return
+
+        prefix = os.path.join(root, '')
+        filepaths = set(filepaths)
+
+        for filepath in list(entries.keys()):
+            if filepath.startswith(prefix) and filepath not in filepaths:
+                entries.pop(filepath)
+                self._dirty = True
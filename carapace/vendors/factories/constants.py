@@ -5,4 +5,19 @@ logging.basicConfig(level=logging.INFO)
 log = logging.getLogger('factories')
 
 # ------------------------------------------------------------------------------
-DEBUG_ENVVAR = 'PYTHON_FACTORIES_DEBUGGING'
\ No newline at end of file
+DEBUG_ENVVAR = 'PYTHON_FACTORIES_DEBUGGING'
+
+# ------------------------------------------------------------------------------
+# -- If this is set, it is used as the location of the persistent discovery
+# -- cache for any factory which is not explicitly given one
+CACHE_ENVVAR = 'PYTHON_FACTORIES_CACHE'
+
+# ------------------------------------------------------------------------------
+# -- The name of the manifest file which may be placed within a plugin
+# -- directory to describe the plugins it contains
+MANIFEST_FILENAME = 'factories_manifest.json'
+
+# ------------------------------------------------------------------------------
+# -- The name of the file which may be placed within a plugin directory to
+# -- list patterns of files and directories which should not be searched
+IGNORE_FILENAME = '.factoryignore'
@@ -0,0 +1,248 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module matches plugin versions against constraints. A constraint is
+a string of comma separated clauses, all of which a version must satisfy:
+
+.. code-block:: text
+
+    >=2,<3      Any version from 2 up to (but not including) 3
+    2.x         Any version starting with 2, the same as >=2,<3
+    2.1.*       Any version starting with 2.1
+    !=2.4       Any version other than 2.4
+    ==2         Only version 2 (as does a clause of just 2)
+    *           Any version
+
+The values within a constraint are converted to the type of the versions
+being matched, so a constraint can be used with versions which are ints,
+floats, strings or tuples.
+
+Versions are matched against a sorted list using bisect, so finding the
+versions within a range never needs to visit every version. This relies
+on every version of an identifier being comparable with the others, so a
+factory does not store a plugin whose version cannot be compared with the
+versions already held (such as a string amongst ints), logging a warning
+instead. A constraint which cannot be compared with the versions (or
+versions which cannot be constrained at all, such as None) matches
+nothing, again with a warning.
+"""
+import bisect
+
+try:
+    _STRING_TYPES = (str, unicode)
+
+except NameError:
+    _STRING_TYPES = (str,)
+
+
+# -- The operators a clause may start with. Longer operators are given
+# -- first so that they are matched ahead of their prefixes
+OPERATORS = ('>=', '<=', '==', '!=', '>', '<')
+
+# -- The suffixes marking a clause as a wildcard
+_WILDCARDS = ('.x', '.*')
+
+# -- The clauses which match any version
+_ANY = ('*', 'x')
+
+
+# ------------------------------------------------------------------------------
+def is_constraint(value):
+    """
+    Returns True if the given value is a constraint rather than a version
+
+    :param value: The value to check
+    :type value: any
+
+    :return: bool
+    """
+    if not isinstance(value, _STRING_TYPES):
+        return False
+
+    value = value.strip()
+
+    if ',' in value or value in _ANY:
+        return True
+
+    if value.endswith(_WILDCARDS):
+        return True
+
+    return value.startswith(OPERATORS)
+
+
+# ------------------------------------------------------------------------------
+def _coerce(value, sample):
+    """
+    Converts the given value from a constraint to the type of the given
+    version.
+
+    :param value: The value as written in the constraint
+    :type value: str
+
+    :param sample: A version of the type to convert to
+
+    :return: The converted value
+    """
+    if isinstance(sample, bool):
+        raise ValueError('Booleans cannot be constrained')
+
+    if isinstance(sample, int):
+        try:
+            return int(value)
+
+        except ValueError:
+            return float(value)
+
+    if isinstance(sample, float):
+        return float(value)
+
+    if isinstance(sample, (tuple, list)):
+        return type(sample)(
+            int(part) if part.isdigit() else part
+            for part in value.split('.')
+        )
+
+    return type(sample)(value)
+
+
+# ------------------------------------------------------------------------------
+class Constraint(object):
+    """
+    A parsed version constraint
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, text):
+        """
+        :param text: The constraint, such as '>=2,<3' or '2.x'
+        :type text: str
+        """
+        self.text = text
+
+        # -- The (operator, value) pairs of each clause. Wildcards are
+        # -- given as a pair of clauses bounding the range they match
+        self.clauses = list()
+
+        for clause in text.split(','):
+            clause = clause.strip()
+
+            if not clause or clause in _ANY:
+                continue
+
+            if clause.endswith(_WILDCARDS):
+                parts = clause[:-2].split('.')
+
+                try:
+                    upper = parts[:-1] + [str(int(parts[-1]) + 1)]
+
+                except ValueError:
+                    raise ValueError(
+                        'Invalid wildcard in constraint : {}'.format(text),
+                    )
+
+                self.clauses.append(('>=', '.'.join(parts)))
+                self.clauses.append(('<', '.'.join(upper)))
+                continue
+
+            for operator in OPERATORS:
+                if clause.startswith(operator):
+                    value = clause[len(operator):].strip()
+                    break
+
+            else:
+                operator, value = '==', clause
+
+            if not value:
+                raise ValueError(
+                    'Missing version in constraint : {}'.format(text),
+                )
+
+            self.clauses.append((operator, value))
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[Constraint - {}]'.format(self.text)
+
+    # --------------------------------------------------------------------------
+    def select(self, versions):
+        """
+        Returns the versions which satisfy the constraint
+
+        :param versions: The versions to match, in ascending order
+        :type versions: list
+
+        :return: list of the matching versions, in ascending order
+        """
+        if not versions:
+            return list()
+
+        sample = versions[-1]
+
+        start = 0
+        end = len(versions)
+        excluded = list()
+
+        try:
+            for operator, value in self.clauses:
+                value = _coerce(value, sample)
+
+                # -- Each bound narrows the slice of the versions which
+                # -- could match
+                if operator in ('>=', '=='):
+                    start = max(start, bisect.bisect_left(versions, value))
+
+                if operator in ('<=', '=='):
+                    end = min(end, bisect.bisect_right(versions, value))
+
+                if operator == '>':
+                    start = max(start, bisect.bisect_right(versions, value))
+
+                if operator == '<':
+                    end = min(end, bisect.bisect_left(versions, value))
+
+                if operator == '!=':
+                    excluded.append(value)
+
+        except (TypeError, ValueError):
+            raise ValueError(
+                'Constraint {} cannot be applied to versions such as {}'.format(
+                    self.text,
+                    repr(sample),
+                ),
+            )
+
+        return [
+            version
+            for version in versions[start:end]
+            if version not in excluded
+        ]
+
+    # --------------------------------------------------------------------------
+    def best(self, versions):
+        """
+        Returns the highest version which satisfies the constraint
+
+        :param versions: The versions to match, in ascending order
+        :type versions: list
+
+        :return: The highest matching version, or None
+        """
+        matching = self.select(versions)
+        return matching[-1] if matching else None
@@ -57,6 +57,10 @@ class Zoo(object):
     # --------------------------------------------------------------------------
     def __init__(self, climate=None, *args, **kwargs):
 
+        # -- Animals are looked up by climate, so we have them
+        # -- indexed by it as they are registered
+        kwargs.setdefault('indexed_attributes', ['required_climate'])
+
         # -- Define the factory which will give us access to
         # -- the available animals
         self.factory = factories.Factory(
@@ -95,8 +99,7 @@ class Zoo(object):
         """
         return [
             animal.species
-            for animal in self.factory.plugins()
-            if animal.required_climate() == self.climate
+            for animal in self.factory.find(required_climate=self.climate)
         ]
 
     # --------------------------------------------------------------------------
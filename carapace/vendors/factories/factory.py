@@ -17,16 +17,48 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from . import cache
+from . import report
+from . import archive
+from . import scanner
+from . import prefetch
+from . import walk
+from . import watcher
+from . import registry
+from . import resolver
+from . import isolate
+from . import constraint
 from . import constants
+from .proxy import PluginProxy
 from .constants import log
 
 import re
 import os
 import sys
-import uuid
 import time
+import types
+import hashlib
 import inspect
 import logging
+import traceback
+import functools
+import weakref
+import importlib
+import contextlib
+import threading
+
+# -- Entry points are read through importlib.metadata, or its backport in
+# -- older versions of python. Without either, entry points cannot be used
+try:
+    from importlib import metadata as _metadata
+
+except ImportError:
+    try:
+        # noinspection PyUnresolvedReferences
+        import importlib_metadata as _metadata
+
+    except ImportError:
+        _metadata = None
 
 # -- Our direct file loading depends on whether we're
 # -- in python 2 or python 3. Therefore we wrap these
@@ -40,6 +72,99 @@ except ImportError:
     import imp
     _py_version = 2
 
+# -- Reloading a module is also specific to the python version
+try:
+    from importlib import reload as _reload_module
+
+except ImportError:
+    _reload_module = reload
+
+
+# -- These are the types of identifier and version values which can
+# -- be written to the discovery cache. Indexed attributes may also be
+# -- lists of these
+_CACHEABLE_TYPES = (str, int, float, bool)
+
+# -- Modules loaded directly from files are shared by every factory in the
+# -- process, so a file is only executed again once it has changed. This
+# -- maps the filepath of each such module to its name in sys.modules
+_loaded_modules = dict()
+_loaded_lock = threading.RLock()
+
+# -- The factories holding each of those modules, keyed by module name. A
+# -- module is only removed from sys.modules once no factory holds it
+_module_users = dict()
+
+# -- Bump this if the layout of a factory snapshot changes
+_SNAPSHOT_FORMAT = 1
+
+# -- The plugins of each entry point group are recorded as though they
+# -- were found within a path of this form
+_ENTRY_POINT_PATH = 'entry_points:{}'
+
+
+# ------------------------------------------------------------------------------
+def _entry_points(group):
+    """
+    Returns the entry points of the installed distributions within the
+    given group. This copes with the differing interfaces of
+    importlib.metadata across python versions.
+
+    :param group: The name of the entry point group
+    :type group: str
+
+    :return: list
+    """
+    found = _metadata.entry_points()
+
+    if hasattr(found, 'select'):
+        return list(found.select(group=group))
+
+    return list(found.get(group, list()))
+
+
+# ------------------------------------------------------------------------------
+def _module_name(filepath, file_stamp):
+    """
+    Returns the name a file is given when it is loaded directly. This is
+    derived from the path of the file and its stamp, meaning the name is
+    the same for as long as the file is unchanged.
+
+    :param filepath: Absolute path to the file
+    :type filepath: str
+
+    :param file_stamp: The (mtime, size) of the file
+    :type file_stamp: tuple
+
+    :return: str
+    """
+    filename = os.path.splitext(os.path.basename(filepath))[0]
+
+    return 'factories_{}_{}_{}'.format(
+        re.sub(r'\W', '_', filename),
+        hashlib.sha1(filepath.encode('utf-8')).hexdigest()[:12],
+        hashlib.sha1(repr(file_stamp).encode('utf-8')).hexdigest()[:8],
+    )
+
+
+# ------------------------------------------------------------------------------
+def _format_error():
+    """
+    Returns the traceback of the exception currently being handled. If the
+    source of the failing file cannot be read (such as a compiled file
+    being loaded as source) only the exception itself is described.
+
+    :return: str
+    """
+    error_type, error = sys.exc_info()[:2]
+
+    # noinspection PyBroadException
+    try:
+        return traceback.format_exc()
+
+    except BaseException:
+        return ''.join(traceback.format_exception_only(error_type, error))
+
 
 # ------------------------------------------------------------------------------
 def enable_debugging(state=True):
@@ -122,10 +247,27 @@ class Factory(object):
     LOAD_SOURCE = 1
     IMPORTABLE = 2
 
+    # -- The names of the loading mechanisms, as given in load reports
+    _MECHANISM_NAMES = {
+        GUESS: 'GUESS',
+        LOAD_SOURCE: 'LOAD_SOURCE',
+        IMPORTABLE: 'IMPORTABLE',
+    }
+
+    # -- These are the events which callbacks can be added for
+    ADDED = 'added'
+    REMOVED = 'removed'
+
     # -- Regex to test for any of the relevant python
     # -- file types
     _PY_CHECK = re.compile('([a-zA-Z].*)(\.py$|\.pyc$)')
 
+    # -- When streaming the plugins of a path they are made readable in
+    # -- batches, once this many files have been scanned or this many
+    # -- seconds have passed - whichever comes first
+    _PUBLISH_FILES = 100
+    _PUBLISH_INTERVAL = 0.1
+
     # --------------------------------------------------------------------------
     def __init__(self,
                  abstract,
@@ -134,7 +276,19 @@ class Factory(object):
                  versioning_identifier=None,
                  envvar=None,
                  mechanism=0,
-                 log_errors=True):
+                 log_errors=True,
+                 cache_path=None,
+                 lazy=False,
+                 workers=None,
+                 watch=False,
+                 ignore=None,
+                 max_depth=None,
+                 prune=None,
+                 isolate=False,
+                 budget=None,
+                 indexed_attributes=None,
+                 metrics_hook=None,
+                 entry_points=None):
         """
         :param abstract: The abstract class to utilise when searching for
             plugins within the add_pathed plugin locations
@@ -165,24 +319,186 @@ class Factory(object):
         :param envvar: Optional environment variable name. If defined this
             will be inspected and split by ; and registered as paths.
         :type envvar: str
+
+        :param cache_path: Optional path to a json file in which the results
+            of plugin discovery are persisted between sessions. When given,
+            any file which has not changed since it was last inspected is
+            not imported during add_path - instead a proxy is registered
+            which only imports the file when the plugin is requested. If
+            this is not given, the PYTHON_FACTORIES_CACHE environment
+            variable is used if it is set.
+        :type cache_path: str
+
+        :param lazy: If True, python source files are inspected statically
+            rather than being executed when paths are added. Any file which
+            defines a class inheriting from the abstract (and whose
+            identifier and version are literal values) has a proxy stored
+            for each plugin, and the file is only imported when the plugin
+            is requested. Files which define no plugins are never imported.
+        :type lazy: bool
+
+        :param workers: If given, files are stat'ed, read and compiled over
+            a pool of this many threads during add_path. Modules are still
+            executed one at a time and in the same order, so this does not
+            alter the order plugins are registered in. This is most
+            beneficial when plugins are stored on high latency file systems.
+        :type workers: int
+
+        :param watch: If True, the factory will monitor its paths and apply
+            any changes (files being added, modified or removed) as they
+            happen. See the watch method for more information.
+        :type watch: bool
+
+        :param ignore: Optional list of glob patterns of files and
+            directories which should not be searched. Patterns may also be
+            given by placing a .factoryignore file within any directory,
+            see the walk module for details of the patterns.
+        :type ignore: list(str, ...)
+
+        :param max_depth: If given, directories nested deeper than this
+            within a path are not searched. A depth of 0 only searches the
+            files directly within each path.
+        :type max_depth: int
+
+        :param prune: Optional callable which is given the absolute path of
+            each directory before it is searched, and returns True if it
+            should not be searched.
+        :type prune: callable
+
+        :param isolate: If True, any file which would be imported during
+            add_path is instead imported and inspected within a pool of
+            separate processes. Proxies are stored for the plugins found,
+            and the file is only imported by this process when a plugin
+            from it is requested. When isolating, workers is the number of
+            processes to use. The abstract must be importable for files
+            to be isolated.
+        :type isolate: bool
+
+        :param budget: The time, in seconds, each file is given to be
+            inspected when isolating. Any file which takes longer has its
+            process terminated, and is reported as a failure in the load
+            report rather than holding up the discovery of other plugins.
+        :type budget: float
+
+        :param indexed_attributes: Optional list of the names of plugin
+            attributes (or classmethods taking no arguments) to index the
+            plugins by when they are registered. This allows plugins to be
+            looked up by value through find without visiting every plugin.
+            Where a value is a list or tuple, the plugin is indexed under
+            each of its elements.
+        :type indexed_attributes: list(str, ...)
+
+        :param metrics_hook: Optional callable which is given the name and
+            the change in value of each counter and timing of stats() as
+            it changes, such as ('hits', 1) or ('discovery_time', 0.2).
+            This allows the statistics to be pushed into a metrics system.
+        :type metrics_hook: callable
+
+        :param entry_points: Optional name (or list of names) of entry point
+            groups. The plugins of installed distributions which advertise
+            entry points within these groups are registered without any
+            directory being searched. See add_entry_points.
+        :type entry_points: str or list(str, ...)
         """
         # -- Store our incoming variables
         self._abstract = abstract
         self._identifier = plugin_identifier or '__name__'
         self._version = versioning_identifier
+        self._indexed = list(indexed_attributes or list())
+
+        # -- Store our plugins, along with an index of identifiers
+        # -- and versions (and any indexed attributes) to plugins
+        self._registry = self._new_registry()
 
-        # -- Store a list of plugins
-        self._plugins = list()
+        # -- The registry is never altered once it is readable. Instead
+        # -- changes are made to a copy of it - held here - which is then
+        # -- swapped in. Only one thread may be altering it at a time
+        self._working = None
+        self._write_lock = threading.RLock()
+        self._writers = 0
+
+        # -- The thread currently altering the factory, along with the
+        # -- events it has emitted. These are only sent once it has
+        # -- finished, so callbacks are free to alter the factory
+        self._writer = None
+        self._events = list()
 
         # -- Store whether we should immediately log errors
         self._log_errors = log_errors
 
+        # -- Store whether we should use static inspection rather
+        # -- than importing files during add_path
+        self._lazy = lazy
+
+        # -- Store the amount of threads to prefetch files with
+        self._workers = workers
+
+        # -- Store the rules which limit which parts of our paths
+        # -- are searched
+        self._ignore = list(ignore or list())
+        self._max_depth = max_depth
+        self._prune = prune
+
+        # -- Store whether files should be inspected in other processes,
+        # -- and the time each file is given to be inspected
+        self._isolate = isolate
+        self._budget = budget
+
+        # -- Store the callbacks to call when plugins are added
+        # -- or removed, along with any active file watcher
+        self._callbacks = {
+            self.ADDED: list(),
+            self.REMOVED: list(),
+        }
+        self._watcher = None
+
+        # -- Modules we have loaded, keyed by the file they were
+        # -- loaded from, along with any files which we know have
+        # -- changed since they were loaded
+        self._modules = dict()
+        self._stale = set()
+
+        # -- Files which failed to load, keyed by filepath, along with
+        # -- the stamp of the file and the traceback of the failure. These
+        # -- are not loaded again until they change. We also hold the
+        # -- traceback of the most recent failure to load a file
+        self._failures = dict()
+        self._error = None
+
+        # -- Archives we have read plugins from, keyed by the path
+        # -- they were added with
+        self._archives = dict()
+
+        # -- Record how each file was scanned, and how long it took
+        self._report = report.LoadReport()
+
+        # -- Counters and timings over the lifetime of the factory
+        self._stats = report.Stats(hook=metrics_hook)
+
+        # -- The module resolver of the scan in progress, which holds
+        # -- what it learns about directories for the duration of a scan
+        self._resolver = None
+
+        # -- filepath -> module name, for files whose module name we have
+        # -- been told of rather than needing to resolve
+        self._addresses = dict()
+
+        # -- If we have been given a cache location (either directly
+        # -- or through the environment) then we persist what we
+        # -- discover so that unchanged files need not be imported
+        # -- in subsequent sessions
+        cache_path = cache_path or os.environ.get(constants.CACHE_ENVVAR)
+        self._cache = cache.DiscoveryCache(cache_path) if cache_path else None
+
         # -- Store all the paths we add_path regardless
         # -- of what plugins they hold. We use a dictionary
         # -- for this so we can store the Mechanisms for each
         # -- path too
         self._add_pathed_paths = dict()
 
+        # -- The entry point groups we have been given
+        self._groups = list()
+
         # -- Any paths we're giving during the init we should
         # -- add_path
         if paths and isinstance(paths, (list, tuple)):
@@ -194,11 +510,22 @@ class Factory(object):
             for path in os.environ[envvar].split(';'):
                 self.add_path(path, mechanism=mechanism)
 
+        # -- Followed by the plugins of any installed distributions
+        if isinstance(entry_points, str):
+            entry_points = [entry_points]
+
+        for group in entry_points or list():
+            self.add_entry_points(group)
+
+        # -- Start monitoring our paths if we have been asked to
+        if watch:
+            self.watch()
+
     # --------------------------------------------------------------------------
     def __repr__(self):
         return '[FACTORY - Identifier: {}, Plugin Count: {}]'.format(
             self._identifier,
-            len(self._plugins),
+            len(self._registry),
         )
 
     # --------------------------------------------------------------------------
@@ -274,7 +601,202 @@ class Factory(object):
         return identifier
 
     # --------------------------------------------------------------------------
-    def _mechanism_load(self, filepath):
+    def _get_attribute(self, plugin, attribute):
+        """
+        Returns the value of the given attribute of the plugin, calling it
+        if it is a method.
+
+        :param plugin: Plugin to take the value from
+
+        :param attribute: Name of the attribute
+        :type attribute: str
+
+        :return: The attribute value
+        """
+        value = getattr(plugin, attribute)
+
+        if inspect.ismethod(value):
+            return value()
+
+        return value
+
+    # --------------------------------------------------------------------------
+    def _described_attributes(self):
+        """
+        Returns the names of the attributes which describe a plugin without
+        it being loaded - the identifier, version and indexed attributes.
+
+        :return: list(str, ...)
+        """
+        attributes = [self._identifier]
+
+        if self._version:
+            attributes.append(self._version)
+
+        for attribute in self._indexed:
+            if attribute not in attributes:
+                attributes.append(attribute)
+
+        return attributes
+
+    # --------------------------------------------------------------------------
+    def _describe(self, plugin):
+        """
+        Returns the values of the attributes which describe the given
+        plugin, if they can all be written to the discovery cache.
+
+        :param plugin: The plugin to describe
+
+        :return: dict or None if the plugin cannot be described
+        """
+        attributes = dict()
+
+        for attribute in self._described_attributes():
+
+            # noinspection PyBroadException
+            try:
+                value = self._get_attribute(plugin, attribute)
+
+            except BaseException:
+                return None
+
+            values = value if isinstance(value, (list, tuple)) else [value]
+
+            for item in values:
+                if not isinstance(item, _CACHEABLE_TYPES):
+                    return None
+
+            attributes[attribute] = value
+
+        return attributes
+
+    # --------------------------------------------------------------------------
+    def _has_value(self, plugin, attribute, value):
+        """
+        Returns True if the given attribute of the plugin is the given
+        value - or is a list or tuple which holds the value.
+
+        :param plugin: The plugin to check
+
+        :param attribute: Name of the attribute
+        :type attribute: str
+
+        :param value: The value to check for
+
+        :return: bool
+        """
+        # noinspection PyBroadException
+        try:
+            actual = self._get_attribute(plugin, attribute)
+
+        except BaseException:
+            return False
+
+        if isinstance(actual, (list, tuple, set, frozenset)):
+            return value in actual
+
+        return actual == value
+
+    # --------------------------------------------------------------------------
+    def _new_registry(self):
+        """
+        Returns an empty registry for this factory
+
+        :return: registry.Registry
+        """
+        return registry.Registry(
+            versioned=bool(self._version),
+            indexed=self._indexed,
+        )
+
+    # --------------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _writing(self):
+        """
+        Context for altering the factory. Writers are serialised, and any
+        changes are made to a copy of the registry (self._working) which is
+        swapped in once the outermost writer has finished. This means other
+        threads reading the factory never wait on - or see part of - the
+        changes being made.
+
+        Any events emitted within the writer are held back until it has
+        finished, at which point the changes are readable and the factory
+        can be altered again.
+
+        :return: None
+        """
+        events = list()
+
+        try:
+            with self._write_lock:
+
+                # -- A writer within a writer simply continues to alter
+                # -- the same copy
+                self._writers += 1
+
+                if self._writers == 1:
+                    self._working = self._registry.copy()
+                    self._writer = threading.current_thread()
+
+                try:
+                    yield
+
+                finally:
+                    self._writers -= 1
+
+                    if not self._writers:
+                        self._registry, self._working = self._working, None
+                        self._writer = None
+
+                        events, self._events = self._events, list()
+
+        finally:
+            for event, plugins in events:
+                self._emit(event, plugins)
+
+    # --------------------------------------------------------------------------
+    def _publish(self):
+        """
+        Makes the changes made so far within a writer readable, whilst the
+        writer continues to alter a fresh copy of the registry. This has no
+        effect within a writer within a writer, as the outer writer expects
+        its changes to be made readable together.
+
+        :return: None
+        """
+        if self._writers != 1:
+            return
+
+        self._registry = self._working
+        self._working = self._working.copy()
+
+    # --------------------------------------------------------------------------
+    def _set_path(self, path, mechanism=None):
+        """
+        Adds - or when no mechanism is given removes - the given path from
+        the paths of the factory. The paths are replaced rather than altered
+        so that they can be read from other threads.
+
+        :param path: The path to add or remove
+        :type path: str
+
+        :param mechanism: The mechanism of the path, or None to remove it
+        :type mechanism: int
+
+        :return: None
+        """
+        paths = dict(self._add_pathed_paths)
+
+        if mechanism is None:
+            paths.pop(path, None)
+
+        else:
+            paths[path] = mechanism
+
+        self._add_pathed_paths = paths
+
+    # --------------------------------------------------------------------------
+    def _mechanism_load(self, filepath, code=None):
         """
         Attemps to find any plugins on the given filepath using the loading
         Mechanisms. This utilises import.load_source.
@@ -284,25 +806,102 @@ class Factory(object):
         advantage of being able to load plugins from locations outside of
         the sys.path.
 
+        Each file is loaded under a name derived from its path and stamp,
+        and the module is shared by every factory in the process. The file
+        is therefore only executed again once it has changed (or has been
+        marked as stale), at which point the old module is removed from
+        sys.modules.
+
         :param filepath: Absolute filepath to the file to inspect
         :type filepath: str
 
+        :param code: If the file has already been compiled, this is the
+            code object to execute rather than reading the file again.
+        :type code: code
+
         :return: List of found plugins
         """
-        filename = os.path.splitext(
-            os.path.basename(
-                filepath,
-            ),
-        )[0]
+        # -- The module name is stable for as long as the file is not
+        # -- changed, which allows every factory to share the module
+        module_name = _module_name(filepath, self._stamp(filepath))
+
+        with _loaded_lock:
+            previous = _loaded_modules.get(filepath)
+
+            if previous == module_name and module_name in sys.modules \
+                    and filepath not in self._stale:
+                _module_users[module_name].add(self)
+                return sys.modules[module_name]
+
+            # -- The file has changed since it was loaded, so the old
+            # -- module should no longer be held
+            if previous:
+                sys.modules.pop(previous, None)
+                _loaded_modules.pop(filepath, None)
+                _module_users.pop(previous, None)
+
+            module = self._direct_load(module_name, filepath, code)
+
+            if module:
+                _loaded_modules[filepath] = module_name
+                _module_users[module_name] = weakref.WeakSet([self])
+
+            return module
+
+    # --------------------------------------------------------------------------
+    def _release_module(self, filepath):
+        """
+        Releases this factory's hold on the module directly loaded from the
+        given file. If no other factory holds the module it is removed from
+        sys.modules.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: The module removed from sys.modules, or None
+        """
+        with _loaded_lock:
+            module_name = _loaded_modules.get(filepath)
+            users = _module_users.get(module_name)
 
-        # -- Generate a unique name for the module to prevent
-        # -- us from creating any clashes
-        module_name = filename + str(uuid.uuid4())
+            # -- We only release modules which we hold
+            if not users or self not in users:
+                return None
 
+            users.discard(self)
+
+            if users:
+                return None
+
+            _loaded_modules.pop(filepath, None)
+            _module_users.pop(module_name, None)
+
+            return sys.modules.pop(module_name, None)
+
+    # --------------------------------------------------------------------------
+    def _direct_load(self, module_name, filepath, code=None):
+        """
+        Executes the given file as a module of the given name
+
+        :param module_name: Name to give the module
+        :type module_name: str
+
+        :param filepath: Absolute filepath to the file to load
+        :type filepath: str
+
+        :param code: Optional code object to execute rather than reading
+            the file.
+        :type code: code
+
+        :return: module or None
+        """
         # -- The mechanism to load module files directly is specifically
         # -- different between python2 and python3, so we need to deal
         # -- with both cases.
         try:
+            if code is not None:
+                return self._execute_code(module_name, filepath, code)
+
             if _py_version == 3:
                 return SourceFileLoader(
                     module_name,
@@ -312,17 +911,19 @@ class Factory(object):
             elif _py_version == 2:
                 if filepath.endswith('.py'):
                     return imp.load_source(
-                        filename + str(uuid.uuid4()),
+                        module_name,
                         filepath,
                     )
 
                 elif filepath.endswith('.pyc'):
                     return imp.load_compiled(
-                        filename + str(uuid.uuid4()),
+                        module_name,
                         filepath,
                     )
 
         except BaseException:
+            sys.modules.pop(module_name, None)
+            self._error = _format_error()
             self._log(
                 'Failed trying to direct load : {} ({})'.format(
                     filepath,
@@ -331,6 +932,41 @@ class Factory(object):
             )
             return None
 
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _execute_code(cls, module_name, filepath, code):
+        """
+        Creates a module with the given name by executing the given code,
+        in the same way that loading the file directly would.
+
+        :param module_name: Name to give the module
+        :type module_name: str
+
+        :param filepath: Absolute path to the file the code was compiled from
+        :type filepath: str
+
+        :param code: Compiled code of the file
+        :type code: code
+
+        :return: module
+        """
+        module = types.ModuleType(module_name)
+        module.__file__ = filepath
+
+        if _py_version == 3:
+            module.__loader__ = SourceFileLoader(module_name, filepath)
+
+        sys.modules[module_name] = module
+
+        try:
+            exec(code, module.__dict__)
+
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+
+        return module
+
     # --------------------------------------------------------------------------
     def _mechanism_import(self, filepath):
         """
@@ -357,142 +993,1954 @@ class Factory(object):
         return None
 
     # --------------------------------------------------------------------------
-    @classmethod
-    def _module_address(cls, filepath):
+    def _module_address(self, filepath):
         """
-        This will take a file and attempt to build up a module address from
-        it by looking at the __init__ files around it.
+        This will take a file and determine the module address it can be
+        imported by, from the packages around it and the sys.path.
+
+        The module address will only be returned if the import system
+        confirms it refers to the given file, in which case the module is
+        imported. If no address could be determined this will return None.
 
-        The module address will only be returned if it is successfully
-        validated in the sys.modules. If no address could be determined this
-        will return None.
+        The package structure of each directory is only examined once per
+        scan of a path.
 
         :param filepath: Filepath to attempt to resolve
         :type filepath: str
 
-        :return:
+        :return: str or None
         """
-        # -- Ensure we're working with consistent character
-        # -- types in the path
-        filepath = filepath.replace('\\', '/')
+        # -- If we have been told the name of the module (such as within
+        # -- a snapshot) then it need not be resolved
+        if filepath in self._addresses:
 
-        # -- Do an immediate test to check if this is a lone-python
-        # -- package
-        lone_name = os.path.splitext(
-            os.path.basename(filepath),
-        )[0]
+            # noinspection PyBroadException
+            try:
+                importlib.import_module(self._addresses[filepath])
 
-        # noinspection PyBroadException
-        try:
-            exec('import {}'.format(lone_name))
+            except BaseException:
+                return None
 
-        except BaseException:
-            pass
+            return self._addresses[filepath]
+
+        module_resolver = self._resolver or resolver.ModuleResolver()
 
-        # -- If the lone name is in the sys.modules list we then
-        # -- need to check if it equates to the same file we're
-        # -- looking at.
-        if lone_name in sys.modules:
-            add_pathed_path = sys.modules[lone_name].__file__.replace('\\', '/')
+        return module_resolver.resolve(filepath)
 
-            # -- If it matches we return it as we do not need to start
-            # -- looking at __init__ structures
-            if filepath == add_pathed_path:
-                return lone_name
+    # --------------------------------------------------------------------------
+    def _archive_for(self, filepath):
+        """
+        Returns the archive the given file is held within, if any
 
-        # -- Collage a list of parts which we can move between
-        parts = filepath.split('/')
-        package_parts = []
+        :param filepath: Absolute filepath
+        :type filepath: str
 
-        # -- Keep cycling for as long as we have a path to actually
-        # -- cycle
-        while parts:
+        :return: archive.Archive or None
+        """
+        for bundle in self._archives.values():
+            if bundle.contains(filepath):
+                return bundle
 
-            # -- Build a path to look for
-            # -- TODO: This needs to work with PYC & PYD files
-            package_test = os.path.join(
-                '/'.join(parts[:-1]),
-                '__init__.py',
-            )
+        return None
 
-            # -- Get the current part
-            part = parts.pop()
+    # --------------------------------------------------------------------------
+    def _archive_import(self, bundle, filepath):
+        """
+        Attempts to import the given file from an archive through zipimport.
+        This is only possible if the archive is on the sys.path and the
+        file is within a package (or at the root) of the archive.
 
-            # -- If the path does not exist, we have hit the end
-            # -- of the package
-            if not os.path.exists(package_test):
+        :param bundle: The archive holding the file
+        :type bundle: archive.Archive
 
-                # -- Pop the final component and define the
-                # -- sys path and the package name
-                package_parts.append(part)
-                package_name = '.'.join(reversed(package_parts))
+        :param filepath: Absolute (virtual) filepath within the archive
+        :type filepath: str
 
-                # -- If our package name has a suffix we need to remove
-                # -- it. Note: We do not test the last characters, as
-                # -- this means the test works for .py, .pyc and .pyd files
-                if '.py' in package_name:
-                    package_name = os.path.splitext(package_name)[0]
+        :return: module or None
+        """
+        if not bundle.is_importable():
+            return None
 
-                # noinspection PyBroadException
-                try:
-                    exec('import {}'.format(package_name))
+        module_name = bundle.module_name(filepath)
 
-                except BaseException:
-                    pass
+        if not module_name:
+            return None
 
-                # -- Return our type of data
-                if package_name in sys.modules:
-                    return package_name
+        # noinspection PyBroadException
+        try:
+            importlib.import_module(module_name)
 
-            # -- Pop the item and keep searching
-            package_parts.append(part)
+        except BaseException:
+            self._log(
+                'Failed trying to import : {} ({})'.format(
+                    filepath,
+                    str(sys.exc_info()),
+                ),
+            )
+            return None
 
-        # -- We could not determine the package name, so we
-        # -- skip out
-        return None
+        return sys.modules.get(module_name)
 
     # --------------------------------------------------------------------------
-    def clear(self):
+    def _canonical(self, filepath):
         """
-        Clears the entire factory of plugins and add_pathed paths.
-
-        :return: None
+        Returns the physical file the given filepath refers to, resolving
+        any symlinks. Files within archives are left as they are.
 
-        ..code-block:: python
+        :param filepath: Absolute filepath
+        :type filepath: str
 
-        >>> from factories.examples.reader import DataReader
-        >>>
-        >>> # -- Instance a new factory
-        >>> reader = DataReader()
-        >>>
-        >>> # -- Print how many plugins we have
-        >>> print(len(reader.factory.plugins()))
-        2
-        >>>
-        >>> # -- Clear the factory
-        >>> reader.factory.clear()
-        >>>
-        >>> # -- We now have no plugins in the factory
-        >>> print(len(reader.factory.plugins()))
-        0
+        :return: str
         """
-        # -- Start clearing out the factory variables
-        self._plugins = list()
-        self._add_pathed_paths = dict()
+        if self._archive_for(filepath):
+            return filepath
+
+        return os.path.normcase(os.path.realpath(filepath))
 
     # --------------------------------------------------------------------------
-    def identifiers(self):
+    def _shared_files(self, path, filepaths, canonicals):
         """
-        Returns a list of plugin class names add_pathed within the factory.
+        Returns the files which refer to a physical file which is already
+        held by another path (or by an earlier file in the given list).
+        These files share the plugins already stored for the physical file
+        rather than being scanned again.
 
-        The list of class names will be unique - therefore classes which share
-        the same name will not appear twice.
+        :param path: The path the files were found within
+        :type path: str
 
-        :return: list(str, str, ...)
+        :param filepaths: The files being scanned
+        :type filepaths: list(str, ...)
 
-        ..code-block:: python
+        :param canonicals: Dictionary of each filepath to its physical file
+        :type canonicals: dict
 
-            >>> from factories.examples.reader import DataReader
+        :return: set(str, ...)
+        """
+        shared = set()
+        seen = set()
+
+        for filepath in filepaths:
+            canonical = canonicals[filepath]
+            owner = self._working.owner(canonical)
+
+            if canonical in seen or \
+                    (owner and owner[:2] != (path, filepath)):
+                shared.add(filepath)
+
+            seen.add(canonical)
+
+        return shared
+
+    # --------------------------------------------------------------------------
+    def _stamp(self, filepath):
+        """
+        Returns the (mtime, size) stamp of the given file, which may be
+        within an archive.
+
+        :param filepath: Absolute filepath
+        :type filepath: str
+
+        :return: tuple or None
+        """
+        bundle = self._archive_for(filepath)
+
+        if bundle:
+            return bundle.file_stamp(filepath)
+
+        return cache.stamp(filepath)
+
+    # --------------------------------------------------------------------------
+    def _resolve(self, plugin):
+        """
+        Returns the real plugin class for the given plugin. Plugins which
+        are held as proxies are resolved (and therefore imported) at this
+        point.
+
+        :param plugin: Plugin class or PluginProxy
+        :type plugin: class or PluginProxy
+
+        :return: Plugin class or None if a proxy could not be resolved
+        """
+        if not isinstance(plugin, PluginProxy):
+            return plugin
+
+        resolved = plugin.resolve()
+
+        if resolved is None:
+            self._log(
+                'Could not resolve plugin : {}'.format(plugin),
+                is_warning=True,
+            )
+
+        return resolved
+
+    # --------------------------------------------------------------------------
+    def _cache_key(self):
+        """
+        Returns the key under which this factories discovery results are
+        stored in the discovery cache. This encompasses the abstract along
+        with the identifier, version and indexed attributes, as all of
+        these affect what is discovered.
+
+        :return: str
+        """
+        key = '{}.{}:{}:{}'.format(
+            self._abstract.__module__,
+            self._abstract.__name__,
+            self._identifier,
+            self._version,
+        )
+
+        if self._indexed:
+            key += ':' + ','.join(self._indexed)
+
+        return key
+
+    # --------------------------------------------------------------------------
+    def _dependencies(self, module, found=None):
+        """
+        Returns the files which define the bases of the classes within the
+        given module, along with those of the plugins found within it. What
+        the module gives may change should any of these files change.
+
+        :param module: The module which was inspected
+        :type module: module
+
+        :param found: The (name, plugin) pairs found within the module
+        :type found: list
+
+        :return: list(str, ...)
+        """
+        classes = [
+            item
+            for item in list(vars(module).values())
+            if inspect.isclass(item)
+            and getattr(item, '__module__', None) == module.__name__
+        ]
+        classes.extend(plugin for _, plugin in found or list())
+
+        dependencies = set()
+
+        for item in classes:
+            # noinspection PyBroadException
+            try:
+                bases = inspect.getmro(item)
+
+            except BaseException:
+                continue
+
+            for base in bases:
+                defining_module = sys.modules.get(
+                    getattr(base, '__module__', None),
+                )
+                filepath = getattr(defining_module, '__file__', None)
+
+                if filepath:
+                    dependencies.add(os.path.abspath(filepath))
+
+        return sorted(dependencies)
+
+    # --------------------------------------------------------------------------
+    def _is_cached(self, filepath, file_stamp):
+        """
+        Returns True if the discovery cache holds an up to date entry for
+        the given file.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param file_stamp: The current (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :return: bool
+        """
+        if not self._cache:
+            return False
+
+        entry = self._cache.get(self._cache_key(), filepath, file_stamp)
+
+        return entry is not None
+
+    # --------------------------------------------------------------------------
+    def _load_module(self, filepath, mechanism, code=None):
+        """
+        Loads the module for the given file using the given mechanism.
+
+        :param filepath: Absolute path to the file to load
+        :type filepath: str
+
+        :param mechanism: The mechanism to use - IMPORTABLE, LOAD_SOURCE
+            or GUESS
+        :type mechanism: int
+
+        :param code: Optional pre-compiled code of the file, which is used
+            if the file needs to be loaded directly.
+        :type code: code
+
+        :return: tuple(module, mechanism) where the mechanism is the one
+            which was actually used to load the module. If the module could
+            not be loaded this returns (None, None)
+        """
+        self._error = None
+
+        # -- Files within archives are served from memory rather
+        # -- than from disk
+        bundle = self._archive_for(filepath)
+
+        # -- If we need to import - or guess, then we attempt to
+        # -- get the package name
+        if mechanism == self.IMPORTABLE or mechanism == self.GUESS:
+            if bundle:
+                module = self._archive_import(bundle, filepath)
+
+            else:
+                module = self._mechanism_import(filepath)
+
+            # -- The plugin name may clash with a module name, so we
+            # -- need to protect against that and fall back to a direct
+            # -- load if that is the case
+            if module and module.__file__ != filepath:
+                module = None
+
+            if module and filepath in self._stale:
+                module = self._reload(module)
+
+            if module:
+                self._log('Module Import : {}'.format(filepath))
+                self._stale.discard(filepath)
+                self._modules[filepath] = module
+                return module, self.IMPORTABLE
+
+        # -- If we do not have a module, and we're using the loading
+        # -- or guess Mechanisms
+        if mechanism == self.LOAD_SOURCE or mechanism == self.GUESS:
+            if bundle and code is None:
+                code = bundle.compile(filepath)
+
+                if code is None:
+                    self._log('Could not compile : {}'.format(filepath))
+                    return None, None
+
+            module = self._mechanism_load(filepath, code=code)
+
+            if module:
+                self._log('Direct Load : {}'.format(filepath))
+                self._stale.discard(filepath)
+                self._modules[filepath] = module
+                return module, self.LOAD_SOURCE
+
+        return None, None
+
+    # --------------------------------------------------------------------------
+    def _reload(self, module):
+        """
+        Executes the given module again, returning the refreshed module.
+
+        :param module: The module to reload
+        :type module: module
+
+        :return: module or None if the module failed to reload
+        """
+        # noinspection PyBroadException
+        try:
+            return _reload_module(module)
+
+        except BaseException:
+            self._error = _format_error()
+            self._log(
+                'Failed trying to reload : {} ({})'.format(
+                    module,
+                    str(sys.exc_info()),
+                ),
+            )
+            return None
+
+    # --------------------------------------------------------------------------
+    def _module_for(self, filepath, mechanism):
+        """
+        Returns the module for the given file, only loading it if this
+        factory has not already done so. This is used when resolving
+        plugin proxies.
+
+        :param filepath: Absolute path to the file to load
+        :type filepath: str
+
+        :param mechanism: The mechanism to use if the file needs loading
+        :type mechanism: int
+
+        :return: module or None
+        """
+        if filepath in self._modules:
+            return self._modules[filepath]
+
+        start_time = time.time()
+        module = self._load_module(filepath, mechanism)[0]
+
+        # -- Deferred plugins are imported at this point, so this is
+        # -- where the cost of importing them is recorded
+        record = self._report.get(filepath)
+
+        if record:
+            record.import_time += time.time() - start_time
+
+            if not module:
+                record.failure = 'Could not import or load'
+
+        return module
+
+    # --------------------------------------------------------------------------
+    def _inspect_module(self, module, names=None):
+        """
+        Looks within the given module for any implementations of the
+        abstract.
+
+        :param module: The module to inspect
+        :type module: module
+
+        :param names: Optional list of the attribute names to inspect. If
+            not given every attribute of the module is inspected.
+        :type names: list(str, ...)
+
+        :return: list(tuple(str, class), ...) of the attribute name each
+            plugin was found under along with the plugin itself
+        """
+        found = list()
+
+        # -- Look for implementations of the abstract
+        for item_name in dir(module) if names is None else names:
+
+            item = getattr(
+                module,
+                item_name,
+                None,
+            )
+
+            # -- If this bases off the abstract, we should store it
+            if inspect.isclass(item):
+
+                # -- We do not want to pick up the abstract
+                # -- itself, so ignore that
+                if item == self._abstract:
+                    continue
+
+                if issubclass(item, self._abstract):
+                    found.append((item_name, item))
+
+        return found
+
+    # --------------------------------------------------------------------------
+    def _scan_file(self,
+                   filepath,
+                   mechanism,
+                   file_stamp=None,
+                   static_plugins=None,
+                   prefetched=None,
+                   names=None,
+                   isolated=None,
+                   record=None):
+        """
+        Finds and stores all the plugins within the given file. If the file
+        is known to the discovery cache and has not changed then it is
+        not imported at all, and proxies are stored in place of the plugins.
+
+        :param filepath: Absolute path to the file to scan
+        :type filepath: str
+
+        :param mechanism: The mechanism to load the file with
+        :type mechanism: int
+
+        :param file_stamp: The (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :param static_plugins: If the plugins within the file have already
+            been determined through static inspection this should be the
+            list of (name, attributes) for those plugins, in which case
+            the file will not be imported.
+        :type static_plugins: list
+
+        :param prefetched: The result of any work already performed on the
+            file, such as stat'ing or compiling it.
+        :type prefetched: prefetch.Prefetch
+
+        :param names: If the names of the plugins within the file are
+            already known (such as from a manifest) only these attributes
+            of the module are inspected.
+        :type names: list(str, ...)
+
+        :param isolated: The result of inspecting the file within another
+            process, if it was isolated.
+        :type isolated: isolate.Result
+
+        :param record: The record to fill in with how the file was scanned
+        :type record: report.FileRecord
+
+        :return: list of the plugins stored from the file
+        """
+        if record is None:
+            record = report.FileRecord(filepath)
+
+        # -- Track the time we started the load
+        start_time = time.time()
+
+        # -- If the file failed to load and has not changed since then
+        # -- it would only fail again
+        failure = self._known_failure(filepath, file_stamp)
+
+        if failure:
+            record.method = record.SKIPPED
+            record.failure = failure.strip().splitlines()[-1]
+            self._log('Skipping known failure : {}'.format(filepath))
+            return list()
+
+        # -- If the file has not changed since we last saw it then
+        # -- we can simply use what we learned last time
+        if self._cache:
+            entry = self._cache.get(self._cache_key(), filepath, file_stamp)
+
+            if entry:
+                record.method = record.CACHED
+                record.mechanism = self._MECHANISM_NAMES.get(
+                    entry['mechanism'],
+                )
+
+                plugins = self._store_proxies(
+                    filepath,
+                    entry['mechanism'],
+                    [
+                        (data['name'], data['attributes'])
+                        for data in entry['plugins']
+                    ],
+                )
+                record.plugins = self._identifiers_of(plugins)
+                return plugins
+
+        # -- If we know what the file contains we do not need
+        # -- to load it
+        if static_plugins is not None:
+            record.method = record.DEFERRED
+            record.mechanism = self._MECHANISM_NAMES.get(mechanism)
+
+            plugins = self._store_proxies(filepath, mechanism, static_plugins)
+            record.plugins = self._identifiers_of(plugins)
+            return plugins
+
+        # -- If the file was inspected within another process then we
+        # -- only need to import it here if we could not be told what
+        # -- it holds
+        if isolated and isolated.status != isolated.UNDESCRIBED:
+            return self._store_isolated(filepath, file_stamp, isolated, record)
+
+        module_to_inspect, used_mechanism = self._load_module(
+            filepath,
+            mechanism,
+            code=prefetched.code if prefetched else None,
+        )
+
+        record.method = record.IMPORTED
+        record.mechanism = self._MECHANISM_NAMES.get(used_mechanism)
+        record.import_time = time.time() - start_time
+
+        # -- If the module is invalid for any reason we do not
+        # -- go further
+        if not module_to_inspect:
+            record.failure = 'Could not import or load'
+            failure = self._error or record.failure
+
+            self._add_failure(filepath, file_stamp, mechanism, failure)
+            self._log(
+                'Could not import or load : {}\n\t{}'.format(
+                    filepath,
+                    failure,
+                ),
+                is_warning=True,
+            )
+            return list()
+
+        plugins = list()
+        inspect_time = time.time()
+
+        # -- We have no control over what we load, so we wrap
+        # -- this is a try/except
+        try:
+            found = self._inspect_module(module_to_inspect, names)
+
+            for _, item in found:
+                if self._store(item):
+                    plugins.append(item)
+                    self._log('Loaded Plugin : {}'.format(item))
+
+            record.inspect_time = time.time() - inspect_time
+            record.plugins = self._identifiers_of(plugins)
+
+            # -- Output the time it took to load this module
+            delta_time = time.time() - start_time
+            self._log(
+                '{} took {} to load'.format(
+                    module_to_inspect,
+                    round(delta_time, 4),
+                ),
+                is_warning=False,
+            )
+
+        # -- We keep the exception type explitely broad as it
+        # -- is completely out of our control what might be being
+        # -- imported
+        except BaseException:
+            failure = _format_error()
+
+            record.inspect_time = time.time() - inspect_time
+            record.failure = str(sys.exc_info()[1])
+
+            # -- The file is now known to fail, so nothing it gave
+            # -- is kept
+            self._working.remove(plugins)
+
+            self._add_failure(filepath, file_stamp, mechanism, failure)
+            self._log(
+                'Could not inspect : {}\n\t{}'.format(filepath, failure),
+                is_warning=True,
+            )
+            return list()
+
+        if self._cache:
+            self._cache_file(
+                filepath,
+                file_stamp,
+                used_mechanism,
+                found,
+                self._dependencies(module_to_inspect, found),
+            )
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _known_failure(self, filepath, file_stamp):
+        """
+        Returns the traceback of the failure to load the given file, if it
+        is known to fail and has not changed since it failed.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param file_stamp: The current (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :return: str or None
+        """
+        if not file_stamp:
+            return None
+
+        known = self._failures.get(filepath)
+
+        if known:
+            if tuple(known[0]) == tuple(file_stamp):
+                return known[1]
+
+            self._failures.pop(filepath)
+
+        # -- Failures are also persisted between sessions
+        if self._cache:
+            entry = self._cache.get(self._cache_key(), filepath, file_stamp)
+
+            if entry and entry.get('failure'):
+                self._failures[filepath] = (file_stamp, entry['failure'])
+                return entry['failure']
+
+        return None
+
+    # --------------------------------------------------------------------------
+    def _add_failure(self, filepath, file_stamp, mechanism, failure):
+        """
+        Records that the given file failed to load, so that it is not
+        loaded again until it changes.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param file_stamp: The (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :param mechanism: The mechanism the file was loaded with
+        :type mechanism: int
+
+        :param failure: The traceback (or description) of the failure
+        :type failure: str
+
+        :return: None
+        """
+        if not file_stamp:
+            return
+
+        self._failures[filepath] = (file_stamp, failure)
+
+        # -- We cannot know which files a failure depends upon, but a
+        # -- file it needed may yet be added alongside it
+        if self._cache:
+            self._cache.set(
+                self._cache_key(),
+                filepath,
+                file_stamp,
+                mechanism,
+                list(),
+                failure=failure,
+                dependencies=[os.path.dirname(filepath)],
+            )
+
+    # --------------------------------------------------------------------------
+    def _store_isolated(self, filepath, file_stamp, isolated, record):
+        """
+        Stores proxies for the plugins described by the inspection of a
+        file within another process. Files which failed - or ran out of
+        time - are reported and skipped.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param file_stamp: The (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :param isolated: The result of the inspection
+        :type isolated: isolate.Result
+
+        :param record: The record to fill in with how the file was scanned
+        :type record: report.FileRecord
+
+        :return: list of the plugins stored from the file
+        """
+        record.method = record.ISOLATED
+        record.mechanism = self._MECHANISM_NAMES.get(isolated.mechanism)
+        record.import_time = isolated.duration
+
+        if isolated.status != isolated.FOUND:
+            record.failure = isolated.failure
+
+            # -- Running out of time may be down to circumstance, but
+            # -- a file which raises will raise again
+            if isolated.status == isolated.FAILED:
+                self._add_failure(
+                    filepath,
+                    file_stamp,
+                    isolated.mechanism,
+                    isolated.failure,
+                )
+
+            self._log(
+                'Could not inspect : {} ({})'.format(
+                    filepath,
+                    isolated.failure,
+                ),
+                is_warning=True,
+            )
+            return list()
+
+        plugins = self._store_proxies(
+            filepath,
+            isolated.mechanism,
+            isolated.plugins,
+        )
+        record.plugins = self._identifiers_of(plugins)
+
+        if self._cache:
+            self._cache.set(
+                self._cache_key(),
+                filepath,
+                file_stamp,
+                isolated.mechanism,
+                [
+                    dict(name=name, attributes=attributes)
+                    for name, attributes in isolated.plugins
+                ],
+                dependencies=isolated.dependencies,
+            )
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _isolate_files(self, filepaths, mechanism, processes=None):
+        """
+        Inspects the given files within a pool of processes. Files within
+        archives, or which are known to the discovery cache, are not
+        inspected.
+
+        :param filepaths: The files to inspect
+        :type filepaths: list(str, ...)
+
+        :param mechanism: The mechanism to load the files with
+        :type mechanism: int
+
+        :param processes: The number of processes to use
+        :type processes: int
+
+        :return: Dictionary of filepaths to isolate.Result instances
+        """
+        filepaths = [
+            filepath
+            for filepath in filepaths
+            if not self._archive_for(filepath)
+            and not self._is_cached(filepath, self._stamp(filepath))
+        ]
+
+        if not filepaths:
+            return dict()
+
+        # -- If the processes cannot be given the abstract then the
+        # -- files are imported here as normal
+        # noinspection PyBroadException
+        try:
+            return isolate.inspect_files(
+                filepaths,
+                self._abstract,
+                self._identifier,
+                version=self._version,
+                indexed=self._indexed,
+                mechanism=mechanism,
+                budget=self._budget,
+                processes=processes,
+            )
+
+        except BaseException:
+            self._log(
+                'Could not isolate files : {}'.format(str(sys.exc_info())),
+                is_warning=True,
+            )
+            return dict()
+
+    # --------------------------------------------------------------------------
+    def _store(self, plugin):
+        """
+        Adds the given plugin to the registry, indexing it by its
+        identifier and version.
+
+        :param plugin: Plugin class or PluginProxy
+        :type plugin: class or PluginProxy
+
+        :return: True if the plugin was stored
+        """
+        # -- We have no control over the plugin code, so we protect
+        # -- ourselves from identifiers or versions which fail
+        # noinspection PyBroadException
+        try:
+            identifier = self._get_identifier(plugin)
+            version = self._get_version(plugin) if self._version else None
+
+        except BaseException:
+            self._log(
+                'Could not identify plugin {} : {}'.format(
+                    plugin,
+                    str(sys.exc_info()),
+                ),
+                is_warning=True,
+            )
+            return False
+
+        # -- Versions which cannot be ordered amongst the other versions
+        # -- of the identifier would leave us unable to tell which is the
+        # -- latest, so the plugin is not stored at all
+        try:
+            self._working.add(
+                plugin,
+                identifier,
+                version,
+                attributes=self._indexed_values(plugin),
+            )
+
+        except TypeError:
+            self._log(
+                'Could not store plugin {} : version {!r} of {} cannot be '
+                'compared with its other versions'.format(
+                    plugin,
+                    version,
+                    identifier,
+                ),
+                is_warning=True,
+            )
+            return False
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def _indexed_values(self, plugin):
+        """
+        Returns the values of the indexed attributes of the given plugin.
+        Any attribute which cannot be read is not indexed, but does not
+        prevent the plugin from being stored.
+
+        :param plugin: Plugin class or PluginProxy
+
+        :return: dict
+        """
+        values = dict()
+
+        for attribute in self._indexed:
+
+            # noinspection PyBroadException
+            try:
+                values[attribute] = self._get_attribute(plugin, attribute)
+
+            except BaseException:
+                self._log(
+                    'Could not index {} of {} : {}'.format(
+                        attribute,
+                        plugin,
+                        str(sys.exc_info()),
+                    ),
+                    is_warning=True,
+                )
+
+        return values
+
+    # --------------------------------------------------------------------------
+    def _identifiers_of(self, plugins):
+        """
+        Returns the identifiers of the given (already stored) plugins
+
+        :param plugins: List of plugins
+        :type plugins: list
+
+        :return: list
+        """
+        identifiers = list()
+
+        for plugin in plugins:
+
+            # noinspection PyBroadException
+            try:
+                identifiers.append(self._get_identifier(plugin))
+
+            except BaseException:
+                identifiers.append(None)
+
+        return identifiers
+
+    # --------------------------------------------------------------------------
+    def _store_proxies(self, filepath, mechanism, definitions):
+        """
+        Stores a proxy for each of the given plugin definitions, allowing
+        the plugins to be identified without loading the file.
+
+        :param filepath: Absolute path to the file defining the plugins
+        :type filepath: str
+
+        :param mechanism: The mechanism to load the file with when any
+            of the plugins are resolved
+        :type mechanism: int
+
+        :param definitions: List of (name, attributes) pairs
+        :type definitions: list
+
+        :return: list of the proxies stored
+        """
+        plugins = list()
+
+        for name, attributes in definitions:
+            plugin = PluginProxy(
+                factory=self,
+                filepath=filepath,
+                name=name,
+                mechanism=mechanism,
+                attributes=attributes,
+            )
+
+            if self._store(plugin):
+                plugins.append(plugin)
+                self._log('Deferred Plugin : {}'.format(plugin))
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _static_scan(self, filepaths, prefetched=None):
+        """
+        Statically inspects the given python source files to determine the
+        plugins they define, without executing any of them.
+
+        :param filepaths: List of absolute file paths
+        :type filepaths: list(str, ...)
+
+        :param prefetched: Dictionary of filepaths to prefetch results, any
+            file which has already been parsed is not parsed again.
+        :type prefetched: dict
+
+        :return: Dictionary of filepaths to a list of (name, attributes)
+            pairs. Files which need to be imported to be understood - such
+            as compiled files, or files where an identifier or version is
+            not a literal - are not included.
+        """
+        parsed = dict()
+        prefetched = prefetched or dict()
+
+        for filepath in filepaths:
+            if not filepath.endswith('.py'):
+                continue
+
+            bundle = self._archive_for(filepath)
+
+            if filepath in prefetched and \
+                    prefetched[filepath].classes is not None:
+                parsed[filepath] = prefetched[filepath].classes
+
+            elif bundle:
+                parsed[filepath] = scanner.parse_source(
+                    bundle.source(filepath),
+                    filepath,
+                )
+
+            else:
+                parsed[filepath] = scanner.parse_file(filepath)
+
+        found = scanner.find_plugins(
+            parsed,
+            self._abstract,
+            self._described_attributes(),
+        )
+
+        results = dict()
+
+        for filepath, classes in parsed.items():
+
+            # -- If we could not parse the file we leave it to be
+            # -- imported, which will report the problem
+            if classes is None:
+                continue
+
+            plugins = found.get(filepath, list())
+
+            if plugins is not None:
+                results[filepath] = plugins
+
+        return results
+
+    # --------------------------------------------------------------------------
+    def _cache_file(self,
+                    filepath,
+                    file_stamp,
+                    mechanism,
+                    found,
+                    dependencies=None):
+        """
+        Records the plugins found in a file within the discovery cache.
+        Files defining plugins whose identifier or version cannot be
+        stored as json are not cached, and will therefore always be
+        imported.
+
+        :param filepath: Absolute path to the scanned file
+        :type filepath: str
+
+        :param file_stamp: The (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :param mechanism: The mechanism the file was loaded with
+        :type mechanism: int
+
+        :param found: The (name, plugin) pairs found within the file
+        :type found: list
+
+        :param dependencies: The files which would alter what the file
+            gives should they change, see _dependencies
+        :type dependencies: list(str, ...)
+
+        :return: None
+        """
+        plugins = list()
+
+        for name, plugin in found:
+
+            attributes = self._describe(plugin)
+
+            if attributes is None:
+                self._cache.discard(self._cache_key(), filepath)
+                return
+
+            plugins.append(
+                dict(
+                    name=name,
+                    attributes=attributes,
+                ),
+            )
+
+        self._cache.set(
+            self._cache_key(),
+            filepath,
+            file_stamp,
+            mechanism,
+            plugins,
+            dependencies=dependencies,
+        )
+
+    # --------------------------------------------------------------------------
+    def _read_manifest(self, directory):
+        """
+        Reads the manifest within the given directory, returning the
+        plugins it lists for this factory.
+
+        :param directory: Absolute path to the directory
+        :type directory: str
+
+        :return: Dictionary of filepaths to lists of (name, attributes)
+            pairs, or None if the manifest cannot be used by this factory.
+        """
+        # -- This is imported here as the manifest module can also be
+        # -- run from the command line
+        from . import manifest
+
+        data = manifest.read(directory)
+
+        if data is None:
+            self._log(
+                'Could not read manifest : {}'.format(directory),
+                is_warning=True,
+            )
+            return None
+
+        plugins = manifest.plugins_for(
+            data,
+            directory,
+            self._abstract,
+            self._described_attributes(),
+        )
+
+        # -- A manifest written for another abstract - or with other
+        # -- identifying attributes - does not tell us what we need
+        # -- so the directory must be searched as normal
+        if plugins is None:
+            self._log(
+                'Manifest does not describe {} : {}'.format(
+                    self._cache_key(),
+                    directory,
+                ),
+            )
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _read_archive(self, path):
+        """
+        Reads the given archive, returning the files within it which could
+        hold plugins. The archive is only read again if it has changed
+        since it was last read.
+
+        :param path: Absolute path to the archive
+        :type path: str
+
+        :return: list(str, ...)
+        """
+        bundle = self._archives.get(path)
+
+        if bundle and bundle.stamp == cache.stamp(path):
+            return bundle.filepaths()
+
+        # -- An archive which is unreadable - or no longer exists - holds
+        # -- no plugins
+        # noinspection PyBroadException
+        try:
+            bundle = archive.Archive(path, match=self._PY_CHECK.match)
+
+        except BaseException:
+            self._archives.pop(path, None)
+            self._log(
+                'Could not read archive : {} ({})'.format(
+                    path,
+                    str(sys.exc_info()),
+                ),
+                is_warning=True,
+            )
+            return list()
+
+        self._archives[path] = bundle
+        return bundle.filepaths()
+
+    # --------------------------------------------------------------------------
+    def _collect_files(self, path, manifests=None, search_path=None):
+        """
+        Returns all the files within the given path which could hold
+        plugins. Any files or directories which are ignored - or beyond
+        the maximum depth - are skipped without being examined.
+
+        :param path: Absolute folder location
+        :type path: str
+
+        :param manifests: If given, any directory holding a manifest which
+            describes this factory is not searched. Instead the files listed
+            in the manifest are returned and this dictionary is updated
+            with the plugins the manifest lists for each of them.
+        :type manifests: dict
+
+        :param search_path: If the path is a directory within one of the
+            paths of the factory, this should be that path, so that ignore
+            rules and depths are applied relative to it.
+        :type search_path: str
+
+        :return: list(str, ...)
+        """
+        start_time = time.time()
+
+        if path in self._archives or archive.is_archive(path):
+            filepaths = self._read_archive(path)
+
+            self._stats.increment(
+                self._stats.DISCOVERY_TIME,
+                time.time() - start_time,
+            )
+            return filepaths
+
+        filepaths = list()
+
+        # -- Collate all our valid files in an initial pass. This could
+        # -- be done in situ, but for the sake of clarity its done up-front
+        for root, directories, files in walk.walk(
+                path,
+                patterns=self._ignore,
+                max_depth=self._max_depth,
+                prune=self._prune,
+                root=search_path):
+
+            if manifests is not None and constants.MANIFEST_FILENAME in files:
+                listed = self._read_manifest(root)
+
+                # -- The manifest describes everything beneath this
+                # -- directory, so we do not need to walk any further
+                if listed is not None:
+                    manifests.update(listed)
+                    filepaths.extend(listed.keys())
+                    directories[:] = list()
+                    continue
+
+            for filename in files:
+
+                # -- skip any private or structural files, along with
+                # -- any files which are not py files
+                if not self._PY_CHECK.match(filename):
+                    continue
+
+                filepaths.append(
+                    os.path.join(
+                        root,
+                        filename
+                    ),
+                )
+
+        self._stats.increment(
+            self._stats.DISCOVERY_TIME,
+            time.time() - start_time,
+        )
+        return filepaths
+
+    # --------------------------------------------------------------------------
+    def _scan_files(self, path, filepaths, mechanism, **kwargs):
+        """
+        Finds and stores all the plugins within the given files. This takes
+        the same arguments as _iter_scan_files.
+
+        :return: list of the plugins stored
+        """
+        plugins = list()
+
+        for file_plugins in self._iter_scan_files(
+                path,
+                filepaths,
+                mechanism,
+                **kwargs):
+            plugins.extend(file_plugins)
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _iter_scan_files(self,
+                         path,
+                         filepaths,
+                         mechanism,
+                         lazy=None,
+                         workers=None,
+                         refresh=False,
+                         manifests=None):
+        """
+        Finds and stores all the plugins within the given files, recording
+        the path and file each plugin was found within. The plugins of each
+        file are yielded as soon as they are stored.
+
+        :param path: The path the files were found within
+        :type path: str
+
+        :param filepaths: The files to scan
+        :type filepaths: list(str, ...)
+
+        :param mechanism: The mechanism to load the files with
+        :type mechanism: int
+
+        :param lazy: Whether to inspect the files statically. If None the
+            lazy setting of the factory is used.
+        :type lazy: bool
+
+        :param workers: The number of threads to prefetch files with. If
+            None the workers setting of the factory is used.
+        :type workers: int
+
+        :param refresh: If True, any modules already loaded for these files
+            are executed again. This should be used when the files are
+            known to have changed.
+        :type refresh: bool
+
+        :param manifests: Dictionary of filepaths to the (name, attributes)
+            pairs listed for them in a manifest. These files are trusted to
+            hold exactly these plugins.
+        :type manifests: dict
+
+        :return: generator of the list of plugins stored from each file
+        """
+        start_time = time.time()
+
+        # -- When running lazily we inspect the source of all the files
+        # -- up-front, as plugins may inherit from plugins in other files
+        if lazy is None:
+            lazy = self._lazy
+
+        if workers is None:
+            workers = self._workers
+
+        manifests = manifests or dict()
+
+        # -- Archives are already held in memory so there is no
+        # -- file work to spread over threads
+        if path in self._archives:
+            workers = None
+
+        # -- Any module we hold for these files is out of date
+        if refresh:
+            for filepath in filepaths:
+                self._modules.pop(filepath, None)
+                self._stale.add(filepath)
+
+        # -- Any file a cached entry depends upon may have changed since
+        # -- the last search
+        if self._cache:
+            self._cache.clear_stamps()
+
+        # -- Each physical file is only scanned once, regardless of how
+        # -- many paths (or symlinks) it is reached through. Any file we
+        # -- expect to share the plugins of another is left out of the
+        # -- work performed up-front
+        canonicals = dict(
+            (filepath, self._canonical(filepath))
+            for filepath in filepaths
+        )
+
+        shared = self._shared_files(path, filepaths, canonicals)
+
+        scanned = [
+            filepath
+            for filepath in filepaths
+            if filepath not in shared
+        ]
+
+        # -- If we have been asked to use workers then the file work is
+        # -- spread over a pool of threads. When lazy every file must be
+        # -- parsed up-front, as plugins may inherit from plugins in other
+        # -- files. Otherwise each file is handed over as soon as it is
+        # -- ready, and is only compiled if it will be loaded directly
+        prefetched = dict()
+        fetching = iter(())
+
+        if workers and workers > 1 and lazy:
+            prefetched = prefetch.prefetch(
+                scanned,
+                workers=workers,
+                parse=True,
+                compile_code=False,
+            )
+
+        elif workers and workers > 1:
+            fetching = prefetch.iter_prefetch(
+                scanned,
+                workers=workers,
+                compile_code=(
+                    mechanism == self.LOAD_SOURCE and not self._isolate
+                ),
+                skip=self._is_cached,
+            )
+
+        static_plugins = dict()
+
+        # -- Files listed in a manifest need no inspection at all when
+        # -- lazy, as the manifest already tells us what they hold
+        if lazy:
+            static_plugins = self._static_scan(
+                [
+                    filepath
+                    for filepath in scanned
+                    if filepath not in manifests
+                ],
+                prefetched,
+            )
+            static_plugins.update(manifests)
+
+        # -- When isolating, the files we would otherwise import here are
+        # -- inspected within other processes
+        isolated = dict()
+
+        if self._isolate:
+            isolated = self._isolate_files(
+                [
+                    filepath
+                    for filepath in scanned
+                    if filepath not in static_plugins
+                ],
+                mechanism,
+                processes=workers,
+            )
+
+        # -- Directories are examined once for the whole scan when
+        # -- resolving the module names of files
+        previous_resolver = self._resolver
+        self._resolver = resolver.ModuleResolver()
+
+        try:
+            # -- Start cycling over the files we have found and look inside
+            # -- for plugins
+            for filepath in filepaths:
+
+                record = report.FileRecord(filepath, path)
+                walk_time = time.time()
+
+                # -- The prefetched files are in the same order as those
+                # -- we scan, and are let go of once they have been used
+                fetched = None
+
+                if filepath in shared:
+                    pass
+
+                elif lazy:
+                    fetched = prefetched.pop(filepath, None)
+
+                else:
+                    fetched = next(fetching, None)
+
+                if fetched:
+                    file_stamp = fetched.stamp
+
+                else:
+                    file_stamp = self._stamp(filepath)
+
+                record.walk_time = time.time() - walk_time
+
+                canonical = canonicals[filepath]
+
+                # -- Files reached through another path share the
+                # -- plugins already stored for them
+                if filepath in shared and self._share_file(
+                        path,
+                        filepath,
+                        canonical,
+                        file_stamp,
+                        record):
+                    file_plugins = list()
+
+                else:
+                    listed = manifests.get(filepath)
+
+                    file_plugins = self._scan_file(
+                        filepath,
+                        mechanism,
+                        file_stamp,
+                        static_plugins.get(filepath),
+                        fetched,
+                        names=[name for name, _ in listed] if listed else None,
+                        isolated=isolated.get(filepath),
+                        record=record,
+                    )
+
+                    self._report.add(record)
+
+                    # -- Track where the plugins came from, so they can be
+                    # -- refreshed or removed without affecting others
+                    self._working.record(
+                        path,
+                        filepath,
+                        file_stamp,
+                        file_plugins,
+                        canonical=canonical,
+                    )
+
+                    self._stats.increment(self._stats.FILES_SCANNED)
+
+                    if record.failure:
+                        self._stats.increment(self._stats.FILES_FAILED)
+
+                self._stats.increment(
+                    self._stats.DISCOVERY_TIME,
+                    time.time() - start_time,
+                )
+
+                yield file_plugins
+
+                # -- The time the caller spends with the plugins is not
+                # -- part of discovery
+                start_time = time.time()
+
+        finally:
+            self._resolver = previous_resolver
+
+            # -- Stop fetching ahead of a scan which has been abandoned
+            if hasattr(fetching, 'close'):
+                fetching.close()
+
+    # --------------------------------------------------------------------------
+    def _share_file(self, path, filepath, canonical, file_stamp, record):
+        """
+        Records the given file as sharing the plugins already stored for
+        the physical file it refers to. This only happens if the plugins
+        were stored from the same version of the physical file.
+
+        :param path: The path the file was found within
+        :type path: str
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param canonical: The physical file the filepath refers to
+        :type canonical: str
+
+        :param file_stamp: The (mtime, size) of the file
+        :type file_stamp: tuple
+
+        :param record: The record to fill in
+        :type record: report.FileRecord
+
+        :return: True if the file shares the plugins of another
+        """
+        owner = self._working.owner(canonical)
+
+        if not owner or owner[:2] == (path, filepath):
+            return False
+
+        _, owner_filepath, owner_stamp, plugins = owner
+
+        if owner_stamp != file_stamp:
+            return False
+
+        self._working.record(
+            path,
+            filepath,
+            file_stamp,
+            list(),
+            canonical=canonical,
+        )
+
+        # -- The same file reached through another path keeps the
+        # -- record of how it was actually scanned
+        if filepath != owner_filepath:
+            record.method = record.SHARED
+            record.plugins = self._identifiers_of(plugins)
+            self._report.add(record)
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def _forget_files(self, path, filepaths=None, unloaded=None):
+        """
+        Removes the plugins which were found in the given files when
+        searching the given path. If no files are given then all the plugins
+        found within the path are removed.
+
+        :param path: The path which was searched
+        :type path: str
+
+        :param filepaths: The files to forget
+        :type filepaths: list(str, ...)
+
+        :param unloaded: If given, the modules loaded from the files are
+            unloaded and this report is updated with what was freed. See
+            _unload.
+        :type unloaded: report.UnloadReport
+
+        :return: List of the plugins removed
+        """
+        if filepaths is None:
+            filepaths = list(self._working.sources.get(path, dict()).keys())
+
+        plugins = self._working.forget(path, filepaths)
+        released = list()
+
+        # -- Only release the modules which no other path holds
+        # -- plugins from
+        for filepath in filepaths:
+            if not self._working.is_sourced(filepath):
+                self._modules.pop(filepath, None)
+                self._report.discard(filepath)
+                released.append(filepath)
+
+        if unloaded is not None:
+            self._unload(released, plugins, unloaded)
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def _unload(self, filepaths, plugins, unloaded):
+        """
+        Removes the modules directly loaded from the given files from
+        sys.modules (unless another factory holds them) and releases the
+        given plugins. Modules which were imported by name are left in
+        place, as other code may rely on them.
+
+        :param filepaths: The files whose modules should be unloaded
+        :type filepaths: list(str, ...)
+
+        :param plugins: The plugins which have been removed
+        :type plugins: list
+
+        :param unloaded: The report to update with what was freed
+        :type unloaded: report.UnloadReport
+
+        :return: None
+        """
+        freed = set()
+
+        for filepath in filepaths:
+            module = self._release_module(filepath)
+
+            if module is None:
+                continue
+
+            freed.add(module.__name__)
+
+            unloaded.modules.append(module.__name__)
+            unloaded.filepaths.append(filepath)
+            unloaded.track(module)
+
+        unloaded.plugins.extend(self._identifiers_of(plugins))
+
+        for plugin in plugins:
+            item = plugin
+
+            # -- A proxy must not keep its plugin alive once the
+            # -- module has gone
+            # noinspection PyProtectedMember
+            if isinstance(plugin, PluginProxy):
+                item = plugin._plugin
+                plugin.release()
+
+            if getattr(item, '__module__', None) in freed:
+                unloaded.track(item)
+
+    # --------------------------------------------------------------------------
+    def _refresh_path(self, path, mechanism, within=None):
+        """
+        Searches the given path again, only scanning the files which have
+        been added or modified since the path was last searched, and
+        removing the plugins from any files which no longer exist.
+
+        :param path: The path to refresh
+        :type path: str
+
+        :param mechanism: The mechanism to load files with
+        :type mechanism: int
+
+        :param within: Optional list of files or directories within the
+            path. If given, only these locations are examined rather than
+            the entire path.
+        :type within: list(str, ...)
+
+        :return: tuple(list, list) of the plugins added and the plugins
+            removed.
+        """
+        with self._writing():
+            return self._refresh_files(path, mechanism, within)
+
+    # --------------------------------------------------------------------------
+    def _refresh_files(self, path, mechanism, within=None):
+        """
+        Performs the refresh of a path, see _refresh_path. This must be
+        called within a writer.
+
+        :return: tuple(list, list) of the plugins added and the plugins
+            removed.
+        """
+        sources = self._working.sources.get(path, dict())
+        manifests = dict()
+
+        start_time = time.time()
+
+        if within is None:
+            filepaths = self._collect_files(path, manifests)
+
+        else:
+            filepaths = self._collect_within(within, manifests, path)
+
+        self._report.walks[path] = time.time() - start_time
+
+        existing = set(filepaths)
+
+        # -- When only looking within specific locations we can only
+        # -- consider known files at - or beneath - those locations
+        known = list(sources.keys())
+
+        if within is not None:
+            prefixes = tuple(
+                os.path.join(location, '')
+                for location in within
+            )
+
+            known = [
+                filepath
+                for filepath in known
+                if filepath in within or filepath.startswith(prefixes)
+            ]
+
+        deleted = [
+            filepath
+            for filepath in known
+            if filepath not in existing
+        ]
+
+        changed = list()
+        added = list()
+
+        for filepath in filepaths:
+            if filepath not in sources:
+                added.append(filepath)
+
+            elif sources[filepath][0] != self._stamp(filepath):
+                changed.append(filepath)
+
+        removed_plugins = self._forget_files(
+            path,
+            deleted + changed,
+            unloaded=report.UnloadReport(),
+        )
+
+        added_plugins = self._scan_files(
+            path,
+            added + changed,
+            mechanism,
+            refresh=True,
+            manifests=manifests,
+        )
+
+        if self._cache:
+            if within is None:
+                self._cache.prune(self._cache_key(), path, filepaths)
+
+            self._cache.save()
+
+        return added_plugins, removed_plugins
+
+    # --------------------------------------------------------------------------
+    def _collect_within(self, locations, manifests=None, path=None):
+        """
+        Returns all the existing files at - or beneath - the given
+        locations which could hold plugins.
+
+        :param locations: Files or directories to look within
+        :type locations: list(str, ...)
+
+        :param manifests: Dictionary to update with the plugins listed in
+            any manifests found, see _collect_files.
+        :type manifests: dict
+
+        :param path: The path of the factory the locations are within.
+            If given, any location which is ignored within that path is
+            skipped.
+        :type path: str
+
+        :return: list(str, ...)
+        """
+        filepaths = set()
+
+        for location in locations:
+
+            if path and location not in self._archives and walk.is_excluded(
+                    path,
+                    location,
+                    patterns=self._ignore,
+                    max_depth=self._max_depth,
+                    prune=self._prune):
+                continue
+
+            if os.path.isdir(location) or location in self._archives:
+                filepaths.update(
+                    self._collect_files(location, manifests, path),
+                )
+
+            elif os.path.isfile(location) and \
+                    self._PY_CHECK.match(os.path.basename(location)):
+                filepaths.add(location)
+
+        return sorted(filepaths)
+
+    # --------------------------------------------------------------------------
+    def _emit(self, event, plugins):
+        """
+        Calls all the callbacks registered against the given event with the
+        given plugins.
+
+        :param event: ADDED or REMOVED
+        :type event: str
+
+        :param plugins: The plugins which were added or removed
+        :type plugins: list
+
+        :return: None
+        """
+        if not plugins:
+            return
+
+        # -- Within a writer the event is sent once the writer finishes
+        if self._writer is threading.current_thread():
+            self._events.append((event, plugins))
+            return
+
+        for callback in list(self._callbacks[event]):
+
+            # -- We never want a failing callback to leave the
+            # -- factory in a partial state
+            # noinspection PyBroadException
+            try:
+                callback(plugins)
+
+            except BaseException:
+                self._log(
+                    'Callback {} failed : {}'.format(
+                        callback,
+                        str(sys.exc_info()),
+                    ),
+                    is_warning=True,
+                )
+
+    # --------------------------------------------------------------------------
+    def _on_files_changed(self, locations):
+        """
+        This is called by the file watcher with the locations which have
+        changed. Each path holding a changed location is refreshed, only
+        looking at the changed locations.
+
+        :param locations: Files or directories which have changed
+        :type locations: set(str, ...)
+
+        :return: None
+        """
+        for path, mechanism in list(self._add_pathed_paths.items()):
+            prefix = os.path.join(path, '')
+
+            within = [
+                location
+                for location in locations
+                if location == path or location.startswith(prefix)
+            ]
+
+            if not within:
+                continue
+
+            added, removed = self._refresh_path(path, mechanism, within)
+
+            self._emit(self.REMOVED, removed)
+            self._emit(self.ADDED, added)
+
+    # --------------------------------------------------------------------------
+    def _watchable_paths(self):
+        """
+        Returns the paths of the factory which can be watched. Only
+        directories can be watched, so any archive paths are left to be
+        refreshed through reload.
+
+        :return: list(str, ...)
+        """
+        return [
+            path
+            for path in self.paths()
+            if path not in self._archives
+        ]
+
+    # --------------------------------------------------------------------------
+    def _update_watcher(self):
+        """
+        Brings any active file watcher in line with the current set of
+        paths. The watcher keeps running, and only the paths which were
+        added or removed are affected.
+
+        :return: None
+        """
+        if not self._watcher:
+            return
+
+        self._watcher.set_paths(self._watchable_paths())
+
+    # --------------------------------------------------------------------------
+    def _clear(self, unload=True):
+        """
+        Clears the entire factory of plugins and add_pathed paths.
+
+        :param unload: If False the modules loaded by the factory are left
+            in sys.modules. This is used when the factory is about to
+            search the same paths again.
+        :type unload: bool
+
+        :return: report.UnloadReport
+        """
+        with self._writing():
+            removed = self._working.plugins
+
+            # -- Unload the modules we loaded, ahead of forgetting them
+            unloaded = report.UnloadReport()
+
+            if unload:
+                self._unload(list(self._modules.keys()), removed, unloaded)
+                self._failures = dict()
+
+            # -- Start clearing out the factory variables. The empty
+            # -- registry only becomes readable once the writer is done
+            self._working = self._new_registry()
+            self._modules = dict()
+            self._stale = set()
+            self._archives = dict()
+            self._report = report.LoadReport()
+            self._add_pathed_paths = dict()
+            self._groups = list()
+
+        self._emit(self.REMOVED, removed)
+        self._update_watcher()
+
+        return unloaded
+
+    # --------------------------------------------------------------------------
+    def clear(self):
+        """
+        Clears the entire factory of plugins and add_pathed paths. Any
+        modules which were loaded directly from files are removed from
+        sys.modules, unless another factory holds them.
+
+        :return: report.UnloadReport describing what was freed
+
+        ..code-block:: python
+
+        >>> from factories.examples.reader import DataReader
+        >>>
+        >>> # -- Instance a new factory
+        >>> reader = DataReader()
+        >>>
+        >>> # -- Print how many plugins we have
+        >>> print(len(reader.factory.plugins()))
+        2
+        >>>
+        >>> # -- Clear the factory
+        >>> reader.factory.clear()
+        >>>
+        >>> # -- We now have no plugins in the factory
+        >>> print(len(reader.factory.plugins()))
+        0
+        """
+        return self._clear()
+
+    # --------------------------------------------------------------------------
+    def identifiers(self):
+        """
+        Returns a list of plugin class names add_pathed within the factory.
+
+        The list of class names will be unique - therefore classes which share
+        the same name will not appear twice.
+
+        :return: list(str, str, ...)
+
+        ..code-block:: python
+
+            >>> from factories.examples.reader import DataReader
             >>>
             >>> # -- Instance a new factory
             >>> reader = DataReader()
@@ -501,10 +2949,575 @@ class Factory(object):
             >>> print(reader.factory.identifiers())
             set(['JSONReader', 'INIReader'])
         """
-        return {
-            self._get_identifier(plugin)
-            for plugin in self._plugins
-        }
+        return set(self._registry.index)
+
+    # --------------------------------------------------------------------------
+    def load_report(self):
+        """
+        Returns the load report of the factory. This holds a record of how
+        every file was scanned - the mechanism used, the time spent walking,
+        importing and inspecting it, the plugins found and any failure -
+        along with the time spent walking each path.
+
+        The time taken to import a deferred plugin when it is first
+        requested is added to the record of its file.
+
+        :return: report.LoadReport
+
+        ..code-block:: python
+
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> # -- Instance a new factory
+            >>> reader = DataReader()
+            >>>
+            >>> # -- Print the five slowest files to load
+            >>> for record in reader.factory.load_report().slowest(5):
+            ...     print(record.filepath, record.total_time)
+            >>>
+            >>> # -- Export the report for further analysis
+            >>> reader.factory.load_report().to_json('/tmp/report.json')
+        """
+        return self._report
+
+    # --------------------------------------------------------------------------
+    def stats(self, reset=False):
+        """
+        Returns the counters and cumulative timings of the factory. These
+        are:
+
+            * requests, hits and misses : The number of calls to request
+                and whether they gave a plugin
+            * unknown_identifiers : Requests for an identifier the factory
+                does not hold
+            * version_misses : Requests for a version (or constraint) the
+                factory does not hold
+            * plugins : The number of plugins currently held
+            * files_scanned and files_failed : The number of files scanned
+                for plugins, and how many of those failed to load
+            * discovery_time : The total time, in seconds, spent walking
+                paths and scanning files
+            * request_time : The total time, in seconds, spent in request
+
+        :param reset: If True, the counters and timings are set back to
+            zero once they have been read
+        :type reset: bool
+
+        :return: dict
+
+        ..code-block:: python
+
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> reader = DataReader()
+            >>> reader.factory.request('JSONReader')
+            >>>
+            >>> stats = reader.factory.stats()
+            >>> print(stats['hits'], stats['discovery_time'])
+        """
+        values = self._stats.as_dict()
+        values['plugins'] = len(self._registry)
+
+        if reset:
+            self._stats.reset()
+
+        return values
+
+    # --------------------------------------------------------------------------
+    def set_metrics_hook(self, hook):
+        """
+        Sets the callable which is given the name and the change in value
+        of each counter and timing of stats() as it changes. Passing None
+        removes any hook.
+
+        :param hook: Callable taking a name and an amount
+        :type hook: callable
+
+        :return: None
+        """
+        self._stats.hook = hook
+
+    # --------------------------------------------------------------------------
+    def _snapshot_file(self, registry, path, filepath, stamp, plugins):
+        """
+        Returns the description of a single file within a snapshot. If any
+        of the plugins of the file cannot be described then the plugins
+        are given as None, and the file is scanned when the snapshot is
+        restored.
+
+        :return: dict
+        """
+        canonical = registry.canonical(filepath)
+        owner = registry.owner(canonical)
+
+        # -- The mechanism the file was actually loaded with is preferred
+        # -- over the one the path was added with
+        mechanism = self._add_pathed_paths.get(path, self.GUESS)
+        record = self._report.get(filepath)
+
+        if record and record.mechanism:
+            for value, name in self._MECHANISM_NAMES.items():
+                if name == record.mechanism:
+                    mechanism = value
+
+        entry = dict(
+            filepath=filepath,
+            canonical=canonical,
+            stamp=list(stamp) if stamp else None,
+            mechanism=mechanism,
+            shared=bool(
+                not plugins and owner and owner[:2] != (path, filepath),
+            ),
+            plugins=list(),
+        )
+
+        for plugin in plugins:
+            attributes = self._describe(plugin)
+
+            if attributes is None:
+                entry['plugins'] = None
+                break
+
+            if isinstance(plugin, PluginProxy):
+                name = plugin.name
+
+            else:
+                name = plugin.__name__
+
+            entry['plugins'].append([name, attributes])
+
+        return entry
+
+    # --------------------------------------------------------------------------
+    def snapshot(self):
+        """
+        Returns a description of everything the factory holds - each path
+        along with the files within it and the identifier, version and
+        module of each plugin - which can be written to json or pickled.
+        This can be given to Factory.from_snapshot in another process to
+        rebuild the factory without walking any directories or importing
+        any plugins until they are requested.
+
+        Plugins which were registered directly are included if they can
+        be imported by the name of their module.
+
+        :return: dict
+
+        ..code-block:: python
+
+            >>> import json
+            >>> import factories
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> reader = DataReader()
+            >>> data = json.dumps(reader.factory.snapshot())
+            >>>
+            >>> # -- Within a worker process
+            >>> factory = factories.Factory.from_snapshot(json.loads(data))
+            >>> print(factory.request('JSONReader'))
+        """
+        # -- Take the registry and paths once, as they may be swapped
+        # -- by another thread whilst we're reading them
+        registry = self._registry
+        paths = self._add_pathed_paths
+
+        sourced = set()
+        described_paths = list()
+
+        for path, mechanism in paths.items():
+            files = list()
+
+            for filepath, (stamp, plugins) in registry.sources.get(
+                    path,
+                    dict()).items():
+                sourced.update(id(plugin) for plugin in plugins)
+                files.append(
+                    self._snapshot_file(
+                        registry,
+                        path,
+                        filepath,
+                        stamp,
+                        plugins,
+                    ),
+                )
+
+            described_paths.append(
+                dict(
+                    path=path,
+                    mechanism=mechanism,
+                    files=files,
+                ),
+            )
+
+        registered = list()
+
+        for plugin in registry.plugins:
+            if id(plugin) in sourced:
+                continue
+
+            module = sys.modules.get(plugin.__module__)
+            filepath = getattr(module, '__file__', None)
+            attributes = self._describe(plugin)
+
+            # -- Plugins defined in the main script - or which cannot be
+            # -- described - cannot be restored elsewhere
+            if not filepath or plugin.__module__ == '__main__' or \
+                    attributes is None:
+                self._log(
+                    'Plugin cannot be included in a snapshot : {}'.format(
+                        plugin,
+                    ),
+                    is_warning=True,
+                )
+                continue
+
+            registered.append(
+                dict(
+                    filepath=os.path.abspath(filepath),
+                    module=plugin.__module__,
+                    name=plugin.__name__,
+                    attributes=attributes,
+                ),
+            )
+
+        return dict(
+            format=_SNAPSHOT_FORMAT,
+            abstract='{}:{}'.format(
+                self._abstract.__module__,
+                self._abstract.__name__,
+            ),
+            identifier=self._identifier,
+            version=self._version,
+            indexed=list(self._indexed),
+            paths=described_paths,
+            registered=registered,
+        )
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def from_snapshot(cls, data, abstract=None, **kwargs):
+        """
+        Creates a factory from a snapshot taken with snapshot(). No paths
+        are walked, and a proxy is stored for each plugin, meaning plugin
+        modules are only imported as the plugins are requested.
+
+        The paths of the snapshot are held by the factory, so reload() can
+        be used to pick up any files which have changed since the snapshot
+        was taken.
+
+        :param data: The snapshot
+        :type data: dict
+
+        :param abstract: The abstract of the factory. If not given, the
+            abstract named within the snapshot is imported.
+        :type abstract: class
+
+        :param kwargs: Any further arguments to create the factory with,
+            such as log_errors or cache_path.
+
+        :return: Factory
+        """
+        if data.get('format') != _SNAPSHOT_FORMAT:
+            raise ValueError(
+                'Unsupported snapshot format : {}'.format(data.get('format')),
+            )
+
+        if abstract is None:
+            module_name, _, name = data['abstract'].partition(':')
+            abstract = getattr(importlib.import_module(module_name), name)
+
+        factory = cls(
+            abstract=abstract,
+            plugin_identifier=data['identifier'],
+            versioning_identifier=data['version'],
+            indexed_attributes=data['indexed'],
+            **kwargs
+        )
+
+        factory._restore(data)
+        return factory
+
+    # --------------------------------------------------------------------------
+    def _restore(self, data):
+        """
+        Stores the paths and plugins described by the given snapshot
+
+        :param data: The snapshot
+        :type data: dict
+
+        :return: None
+        """
+        added = list()
+
+        with self._writing():
+            for path_data in data['paths']:
+                path = path_data['path']
+
+                self._set_path(path, path_data['mechanism'])
+
+                for entry in path_data['files']:
+                    added.extend(self._restore_file(path, entry))
+
+            for entry in data['registered']:
+                self._addresses[entry['filepath']] = entry['module']
+
+                added.extend(
+                    self._store_proxies(
+                        entry['filepath'],
+                        self.IMPORTABLE,
+                        [(entry['name'], entry['attributes'])],
+                    ),
+                )
+
+        self._emit(self.ADDED, added)
+        self._update_watcher()
+
+    # --------------------------------------------------------------------------
+    def _restore_file(self, path, entry):
+        """
+        Stores the plugins of a single file described within a snapshot
+
+        :param path: The path the file was found within
+        :type path: str
+
+        :param entry: The description of the file, see _snapshot_file
+        :type entry: dict
+
+        :return: list of the plugins stored
+        """
+        filepath = entry['filepath']
+        mechanism = entry['mechanism']
+
+        # -- Files we were not able to describe are scanned as normal
+        if entry['plugins'] is None:
+            return self._scan_files(path, [filepath], mechanism)
+
+        plugins = list()
+
+        if not entry['shared']:
+            record = report.FileRecord(filepath, path)
+            record.method = record.DEFERRED
+            record.mechanism = self._MECHANISM_NAMES.get(mechanism)
+
+            plugins = self._store_proxies(
+                filepath,
+                mechanism,
+                entry['plugins'],
+            )
+
+            record.plugins = self._identifiers_of(plugins)
+            self._report.add(record)
+
+        self._working.record(
+            path,
+            filepath,
+            tuple(entry['stamp']) if entry['stamp'] else None,
+            plugins,
+            canonical=entry['canonical'],
+        )
+
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def failures(self):
+        """
+        Returns the files which are known to fail to load, along with the
+        traceback of each failure. These files are not loaded again until
+        they change. When the factory has a discovery cache the failures
+        are remembered between sessions.
+
+        :return: dict(filepath: traceback)
+
+        ..code-block:: python
+
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> reader = DataReader()
+            >>>
+            >>> for filepath, failure in reader.factory.failures().items():
+            ...     print(filepath)
+            ...     print(failure)
+        """
+        return dict(
+            (filepath, failure)
+            for filepath, (file_stamp, failure) in self._failures.items()
+            if tuple(file_stamp) == tuple(self._stamp(filepath) or ())
+        )
+
+    # --------------------------------------------------------------------------
+    def clear_failures(self, filepaths=None):
+        """
+        Forgets that files failed to load, meaning they will be loaded again
+        the next time their path is searched. This is useful when a failure
+        was caused by something other than the file itself, such as a
+        dependency which has since been installed.
+
+        :param filepaths: The files to forget. If not given every failure
+            is forgotten.
+        :type filepaths: list(str, ...)
+
+        :return: None
+        """
+        if filepaths is None:
+            filepaths = list(self._failures.keys())
+
+        for filepath in filepaths:
+            if self._failures.pop(filepath, None) and self._cache:
+                self._cache.discard(self._cache_key(), filepath)
+
+        if self._cache:
+            self._cache.save()
+
+    # --------------------------------------------------------------------------
+    def add_entry_points(self, group):
+        """
+        Registers the plugins advertised by installed distributions within
+        the given entry point group. This reads the metadata of the
+        installed distributions rather than searching any directory.
+
+        Each entry point may refer to a plugin class directly, or to a
+        module in which case every plugin within the module is registered.
+        For example, a distribution could advertise its plugins within its
+        setup.cfg as:
+
+        .. code-block:: text
+
+            [options.entry_points]
+            carapace.tools =
+                publish = my_tools.publish:PublishTool
+                export = my_tools.exporters
+
+        If the group has been added before, the plugins it gave previously
+        are forgotten and it is read again.
+
+        :param group: The name of the entry point group
+        :type group: str
+
+        :return: The number of plugins registered
+
+        ..code-block:: python
+
+            >>> import factories
+            >>> import factories.examples.zoo
+            >>>
+            >>> factory = factories.Factory(
+            ...     abstract=factories.examples.zoo.Animal,
+            ...     plugin_identifier='species',
+            ... )
+            >>>
+            >>> factory.add_entry_points('zoo.animals')
+        """
+        if _metadata is None:
+            self._log(
+                'Entry points require importlib.metadata : {}'.format(group),
+                is_warning=True,
+            )
+            return 0
+
+        path = _ENTRY_POINT_PATH.format(group)
+        added = list()
+
+        with self._writing():
+            if group not in self._groups:
+                self._groups = self._groups + [group]
+
+            removed = self._forget_files(path)
+
+            # noinspection PyBroadException
+            try:
+                entry_points = _entry_points(group)
+
+            except BaseException:
+                self._log(
+                    'Could not read entry points {} : {}'.format(
+                        group,
+                        sys.exc_info()[1],
+                    ),
+                    is_warning=True,
+                )
+                entry_points = list()
+
+            for entry_point in entry_points:
+                plugins = self._load_entry_point(path, entry_point)
+
+                # -- The entry point takes the place of a file, and as
+                # -- with files, its plugins are recorded against it
+                self._working.record(
+                    path,
+                    entry_point.value,
+                    None,
+                    plugins,
+                )
+                added.extend(plugins)
+
+        self._emit(self.REMOVED, removed)
+        self._emit(self.ADDED, added)
+
+        return len(added)
+
+    # --------------------------------------------------------------------------
+    def _load_entry_point(self, path, entry_point):
+        """
+        Loads the given entry point and stores the plugins it refers to
+
+        :param path: The path the entry point is recorded against
+        :type path: str
+
+        :param entry_point: The entry point to load
+        :type entry_point: importlib.metadata.EntryPoint
+
+        :return: list of the plugins stored
+        """
+        record = report.FileRecord(entry_point.value, path)
+        record.method = record.IMPORTED
+        record.mechanism = self._MECHANISM_NAMES.get(self.IMPORTABLE)
+
+        start_time = time.time()
+
+        # -- We have no control over what the entry point imports
+        # noinspection PyBroadException
+        try:
+            item = entry_point.load()
+
+        except BaseException:
+            record.import_time = time.time() - start_time
+            record.failure = str(sys.exc_info()[1])
+            self._report.add(record)
+
+            self._log(
+                'Could not load entry point {} : {}'.format(
+                    entry_point.value,
+                    record.failure,
+                ),
+                is_warning=True,
+            )
+            return list()
+
+        record.import_time = time.time() - start_time
+        inspect_time = time.time()
+
+        # -- An entry point may refer to a single plugin, or to a module
+        # -- holding any number of them
+        if isinstance(item, types.ModuleType):
+            found = [plugin for _, plugin in self._inspect_module(item)]
+
+        elif inspect.isclass(item) and issubclass(item, self._abstract):
+            found = [item]
+
+        else:
+            found = list()
+
+        plugins = [
+            plugin
+            for plugin in found
+            if self._store(plugin)
+        ]
+
+        record.inspect_time = time.time() - inspect_time
+        record.plugins = self._identifiers_of(plugins)
+        self._report.add(record)
+
+        return plugins
 
     # --------------------------------------------------------------------------
     def paths(self):
@@ -529,11 +3542,21 @@ class Factory(object):
         return list(self._add_pathed_paths.keys())
 
     # --------------------------------------------------------------------------
-    def plugins(self):
+    def plugins(self, resolve=True):
         """
         Returns a unique list of plugins. Where multiple versions are available
         the highest version will be given.
 
+        Note: When the factory is lazy every plugin which has not yet been
+        imported is imported here, which may mean importing every file
+        along the factory paths. Pass resolve=False to avoid this.
+
+        :param resolve: If False, plugins which have not been imported are
+            given as PluginProxy instances rather than being imported. The
+            attributes the factory holds for a proxy (such as its identifier
+            and version) can be read without importing it.
+        :type resolve: bool
+
         :return: list(class, class, ...)
 
         ..code-block:: python
@@ -549,20 +3572,98 @@ class Factory(object):
             JSONReader
             INIReader
         """
+        if not resolve:
+            return list(self._registry.latest.values())
+
+        plugins = [
+            self._resolve(plugin)
+            for plugin in list(self._registry.latest.values())
+        ]
+
+        # -- Any plugin which could not be resolved is omitted
         return [
-            self.request(identifier)
-            for identifier in self.identifiers()
+            plugin
+            for plugin in plugins
+            if plugin is not None
         ]
 
+    # --------------------------------------------------------------------------
+    def find(self, **criteria):
+        """
+        Returns the plugins whose attributes hold all the given values. As
+        with plugins(), only the highest version of each plugin is given.
+
+        Criteria for attributes given as indexed_attributes are looked up
+        within the index built as plugins were registered. Any other
+        criteria are checked against each of those plugins in turn, which
+        means the plugins need to be loaded. Where an attribute value is a
+        list or tuple, the plugin matches if any of its elements match.
+
+        :return: list(class, class, ...)
+
+        ..code-block:: python
+
+            >>> from factories.examples.zoo import Zoo
+            >>>
+            >>> zoo = Zoo(climate='tropical')
+            >>>
+            >>> for animal in zoo.factory.find(required_climate='tropical'):
+            ...     print(animal.species)
+        """
+        # -- Take the registry once, as it may be swapped by another
+        # -- thread whilst we're reading it
+        registry = self._registry
+
+        indexed = dict()
+        remaining = dict()
+
+        for attribute, value in criteria.items():
+            if attribute in registry.attributes:
+                indexed[attribute] = value
+
+            else:
+                remaining[attribute] = value
+
+        plugins = list()
+
+        for plugin in registry.find(indexed):
+
+            # -- Only give the highest version of each plugin
+            # noinspection PyBroadException
+            try:
+                identifier = self._get_identifier(plugin)
+
+            except BaseException:
+                continue
+
+            if registry.latest.get(identifier) is not plugin:
+                continue
+
+            plugin = self._resolve(plugin)
+
+            if plugin is None:
+                continue
+
+            if all(
+                    self._has_value(plugin, attribute, value)
+                    for attribute, value in remaining.items()):
+                plugins.append(plugin)
+
+        return plugins
+
     # --------------------------------------------------------------------------
     # noinspection PyBroadException
-    def add_path(self, path, mechanism=0):
+    def add_path(self, path, mechanism=0, lazy=None, workers=None):
         """
         Registers a search address with the factory. The factory will
         immediately being searching recursively within this location for
         any plugins.
 
-        :param path: Absolute folder location
+        :param path: Absolute folder location. This may also be the location
+            of a .zip or .whl archive of plugins, in which case the archive
+            is read in a single pass and its files loaded from memory. Files
+            are imported through zipimport if the archive is on the
+            sys.path, otherwise they are loaded directly.
         :type path: str
 
         :param mechanism: This allows you to specify the behaviour for
@@ -582,7 +3683,9 @@ class Factory(object):
                     This method has flexibility in terms of structure but
                     means you cannot utilise relative import paths within
                     your plugin. All loaded plugins using this module are
-                    imported into a namespace defined through a uuid.
+                    given a name derived from their path and modification
+                    time, and are shared by every factory until the file
+                    changes.
 
                 * GUESS
                     This is the default mechanism. When guessing the factory
@@ -593,6 +3696,22 @@ class Factory(object):
                     behaviour.
         :type mechanism: int
 
+        :param lazy: If True the files within the path are inspected
+            statically and only imported when a plugin from them is
+            requested. If this is None, the lazy setting of the factory
+            is used.
+        :type lazy: bool
+
+        :param workers: The number of threads to stat, read and compile
+            files with prior to them being executed. If this is None the
+            workers setting of the factory is used.
+        :type workers: int
+
+        Any directory within the path which holds a manifest describing
+        this factory (see the manifest module) is not searched. Only the
+        files listed in the manifest are imported - or none at all if the
+        factory is lazy.
+
         :return: Count of plugins add_pathed
 
         ..code-block:: python
@@ -619,126 +3738,327 @@ class Factory(object):
             ... )
         """
 
+        # -- The path is searched by exhausting the stream of plugins
+        # -- it yields
+        return len(
+            list(
+                self._iter_add_path(
+                    path,
+                    mechanism,
+                    lazy=lazy,
+                    workers=workers,
+                ),
+            ),
+        )
+
+    # --------------------------------------------------------------------------
+    def iter_add_path(self, path, mechanism=0, lazy=None, workers=None):
+        """
+        Registers a search address with the factory in the same way as
+        add_path, but rather than returning once the entire path has been
+        searched this yields the plugins as they are stored. This allows a
+        caller to start making use of the plugins at the start of a path
+        whilst the remainder of the path is searched. Plugins are made
+        readable - and then yielded - in batches, once a number of files
+        have been scanned or a short time has passed.
+
+        The path is only searched as the generator is iterated. The ADDED
+        callbacks are called with all the plugins found once the generator
+        is exhausted (or closed). If the generator is closed early then
+        the files which were not yet reached are not searched.
+
+        Note: When the factory is lazy the plugins yielded are proxies,
+        which are only imported when something other than their
+        identifier or version is asked of them.
+
+        :param path: Absolute folder (or archive) location
+        :type path: str
+
+        :param mechanism: The mechanism to load plugins with, see add_path
+        :type mechanism: int
+
+        :param lazy: Whether to inspect the files statically, see add_path
+        :type lazy: bool
+
+        :param workers: The number of threads to prefetch files with, see
+            add_path
+        :type workers: int
+
+        :return: generator of plugins
+
+        ..code-block:: python
+
+            >>> import os
+            >>> import factories
+            >>> import factories.examples.zoo
+            >>>
+            >>> factory = factories.Factory(
+            ...     abstract=factories.examples.zoo.Animal,
+            ...     plugin_identifier='species',
+            ... )
+            >>>
+            >>> for plugin in factory.iter_add_path(
+            ...         os.path.dirname(factories.examples.zoo.__file__)):
+            ...     print(plugin.species)
+        """
+        return self._iter_add_path(
+            path,
+            mechanism,
+            lazy=lazy,
+            workers=workers,
+            publish=True,
+        )
+
+    # --------------------------------------------------------------------------
+    def _iter_add_path(self,
+                       path,
+                       mechanism,
+                       lazy=None,
+                       workers=None,
+                       publish=False):
+        """
+        Searches the given path, yielding each plugin as it is stored.
+
+        :param publish: If True, the path is searched in batches (see
+            _PUBLISH_FILES and _PUBLISH_INTERVAL), each of which is a writer
+            of its own. The plugins of a batch are made readable before they
+            are yielded, and the writer is released whilst they are being
+            consumed - so the consumer (or any other thread) is free to
+            alter the factory between batches. Otherwise the entire search
+            is a single writer and the plugins only become readable - along
+            with the forgetting of any plugins the path previously gave -
+            once the search is complete.
+        :type publish: bool
+
+        :return: generator of plugins
+        """
         # -- Refuse none-type paths
         if not path:
-            return 0
+            return
 
-        # -- Regardless of what is found along the path we store the
-        # -- fact that this path has been given to us
-        self._add_pathed_paths[path] = mechanism
+        removed = list()
+        plugins = list()
+        filepaths = None
+        scan = None
 
-        # -- We return how many plugins have been add_pathed
-        # -- by this path, so we get the plugin count prior
-        # -- to doing anything
-        current_plugin_count = len(self._plugins)
+        try:
+            with self._writing():
 
-        filepaths = list()
+                # -- Regardless of what is found along the path we store
+                # -- the fact that this path has been given to us
+                self._set_path(path, mechanism)
 
-        # -- Collate all our valid files in an initial pass. This could
-        # -- be done in situ, but for the sake of clarity its done up-front
-        for root, _, files in os.walk(path):
-            for filename in files:
+                # -- If this path has been searched before then we forget
+                # -- what it gave us previously, as it is about to be
+                # -- searched again
+                removed = self._forget_files(path)
 
-                # -- skip any private or structural files, along with
-                # -- any files which are not py files
-                if not self._PY_CHECK.match(filename):
-                    continue
+                # -- Collate all our valid files in an initial pass. Any
+                # -- directory with a manifest describing us is not walked
+                start_time = time.time()
 
-                filepaths.append(
-                    os.path.join(
-                        root,
-                        filename
-                    ),
+                manifests = dict()
+                filepaths = self._collect_files(path, manifests)
+
+                self._report.walks[path] = time.time() - start_time
+
+                scan = self._iter_scan_files(
+                    path,
+                    filepaths,
+                    mechanism,
+                    lazy=lazy,
+                    workers=workers,
+                    manifests=manifests,
                 )
 
-        # -- Start cycling over the files we have found and look inside
-        # -- for plugins
-        for filepath in filepaths:
+                if not publish:
+                    for file_plugins in scan:
+                        for plugin in file_plugins:
+                            plugins.append(plugin)
+                            yield plugin
 
-            # -- Track the time we started the load
-            start_time = time.time()
+                    return
 
-            # -- Declare the variable we will ultimately inspect
-            # -- for plugins
-            module_to_inspect = None
-
-            # -- If we need to import - or guess, then we attempt to
-            # -- get the package name
-            if mechanism == self.IMPORTABLE or mechanism == self.GUESS:
-                module_to_inspect = self._mechanism_import(filepath)
-
-                # -- The plugin name may clash with a module name, so we
-                # -- need to protect against that and fall back to a direct
-                # -- load if that is the case
-                if module_to_inspect and module_to_inspect.__file__ != filepath:
-                    module_to_inspect = None
-
-                if module_to_inspect:
-                    self._log('Module Import : {}'.format(filepath))
-
-            # -- If we do not have a module, and we're using the loading
-            # -- or guess Mechanisms
-            if not module_to_inspect:
-                if mechanism == self.LOAD_SOURCE or mechanism == self.GUESS:
-                    module_to_inspect = self._mechanism_load(filepath)
-                    if module_to_inspect:
-                        self._log('Direct Load : {}'.format(filepath))
-
-            # -- If the module is invalid for any reason we do not
-            # -- go further
-            if not module_to_inspect:
-                self._log(
-                    'Could not import or load : {}\n\t{}'.format(
-                        filepath,
-                        str(sys.exc_info()),
-                    ),
-                    is_warning=True,
-                )
-                continue
+            for batch in self._iter_batches(scan):
+                for plugin in batch:
+                    plugins.append(plugin)
+                    yield plugin
 
-            # -- We have no control over what we load, so we wrap
-            # -- this is a try/except
-            try:
+        finally:
+            # -- A consumer which stops early leaves the search part way
+            # -- through, so we close it down within a writer of its own
+            if scan is not None:
+                with self._writing():
+                    scan.close()
 
-                # -- Look for implementations of the abstract
-                for item_name in dir(module_to_inspect):
+            # -- Forget about any files we have cached which no longer
+            # -- exist, and write out anything we have learned
+            if self._cache and filepaths is not None:
+                self._cache.prune(self._cache_key(), path, filepaths)
+                self._cache.save()
 
-                    item = getattr(
-                        module_to_inspect,
-                        item_name,
-                    )
+            self._emit(self.REMOVED, removed)
+            self._emit(self.ADDED, plugins)
+            self._update_watcher()
 
-                    # -- If this bases off the abstract, we should store it
-                    if inspect.isclass(item):
+    # --------------------------------------------------------------------------
+    def _iter_batches(self, scan):
+        """
+        Pulls the plugins of the given search in batches, each within a
+        writer of its own. A batch is complete once _PUBLISH_FILES files
+        have been scanned or _PUBLISH_INTERVAL seconds have passed, and is
+        only yielded once its writer has finished (making it readable).
 
-                        # -- We do not want to pick up the abstract
-                        # -- itself, so ignore that
-                        if item == self._abstract:
-                            continue
+        :param scan: The search, as given by _iter_scan_files
+        :type scan: generator
 
-                        if issubclass(item, self._abstract):
-                            self._plugins.append(item)
-                            self._log('Loaded Plugin : {}'.format(item))
+        :return: generator of lists of plugins
+        """
+        exhausted = False
 
-                # -- Output the time it took to load this module
-                delta_time = time.time() - start_time
-                self._log(
-                    '{} took {} to load'.format(
-                        module_to_inspect,
-                        round(delta_time, 4),
-                    ),
-                    is_warning=False,
-                )
+        while not exhausted:
+            batch = list()
+            scanned = 0
+            started = time.time()
 
-            # -- We keep the exception type explitely broad as it
-            # -- is completely out of our control what might be being
-            # -- imported
-            except BaseException:
-                self._log(str(sys.exc_info()), is_warning=True)
+            with self._writing():
+                for file_plugins in scan:
+                    batch.extend(file_plugins)
+                    scanned += 1
+
+                    if (scanned >= self._PUBLISH_FILES or
+                            time.time() - started >= self._PUBLISH_INTERVAL):
+                        break
+
+                else:
+                    exhausted = True
+
+            if batch:
+                yield batch
+
+    # --------------------------------------------------------------------------
+    def add_path_async(self,
+                       path,
+                       mechanism=0,
+                       lazy=None,
+                       workers=None,
+                       executor=None,
+                       loop=None):
+        """
+        Registers a search address with the factory in the same way as
+        add_path, but the path is searched within an executor so that an
+        asyncio event loop is not blocked whilst files are read and
+        imported. The returned future resolves to the count of plugins
+        add_pathed.
+
+        Note: The factory is altered - and any ADDED callbacks are called -
+        from the executor's thread.
+
+        Note: This requires asyncio, and is therefore only available from
+        python 3.4 onwards. asyncio is imported when this is first called,
+        so the factory itself can still be used without it.
+
+        :param path: Absolute folder (or archive) location
+        :type path: str
+
+        :param mechanism: The mechanism to load plugins with, see add_path
+        :type mechanism: int
+
+        :param lazy: Whether to inspect the files statically, see add_path
+        :type lazy: bool
+
+        :param workers: The number of threads to prefetch files with, see
+            add_path
+        :type workers: int
+
+        :param executor: The concurrent.futures executor to search the path
+            within. If None the default executor of the loop is used.
+        :type executor: concurrent.futures.Executor
+
+        :param loop: The event loop to use. If None the running event
+            loop is used.
+        :type loop: asyncio.AbstractEventLoop
+
+        :return: asyncio.Future
+
+        ..code-block:: python
+
+            >>> import asyncio
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> reader = DataReader()
+            >>>
+            >>> async def search(path):
+            ...     count = await reader.factory.add_path_async(path)
+            ...     print('Found {} plugins'.format(count))
+        """
+        import asyncio
+
+        if loop is None:
+            loop = getattr(
+                asyncio,
+                'get_running_loop',
+                asyncio.get_event_loop,
+            )()
+
+        return loop.run_in_executor(
+            executor,
+            functools.partial(
+                self.add_path,
+                path,
+                mechanism=mechanism,
+                lazy=lazy,
+                workers=workers,
+            ),
+        )
+
+    # --------------------------------------------------------------------------
+    def add_callback(self, event, callback):
+        """
+        Registers a callback to be called whenever plugins are added to - or
+        removed from - the factory. The callback is given a list of the
+        plugins which were added or removed.
+
+        Note: When the factory is watching its paths, callbacks are called
+        from the watcher thread.
+
+        :param event: Either Factory.ADDED or Factory.REMOVED
+        :type event: str
+
+        :param callback: Callable which accepts a list of plugins
+        :type callback: callable
+
+        :return: None
+
+        ..code-block:: python
+
+            >>> from factories.examples.reader import DataReader
+            >>>
+            >>> reader = DataReader()
+            >>>
+            >>> def report(plugins):
+            ...     print('Added {} plugins'.format(len(plugins)))
+            >>>
+            >>> reader.factory.add_callback(reader.factory.ADDED, report)
+        """
+        if callback not in self._callbacks[event]:
+            self._callbacks[event].append(callback)
 
-        # -- Return the amount of plugins which have
-        # -- been loaded during this registration pass
-        return len(self._plugins) - current_plugin_count
+    # --------------------------------------------------------------------------
+    def remove_callback(self, event, callback):
+        """
+        Removes a callback previously registered with add_callback
+
+        :param event: Either Factory.ADDED or Factory.REMOVED
+        :type event: str
+
+        :param callback: The callback to remove
+        :type callback: callable
+
+        :return: None
+        """
+        if callback in self._callbacks[event]:
+            self._callbacks[event].remove(callback)
 
     # --------------------------------------------------------------------------
     def register(self, class_type):
@@ -761,28 +4081,63 @@ class Factory(object):
         if not issubclass(class_type, self._abstract):
             return False
 
-        self._plugins.append(class_type)
+        with self._writing():
+            if not self._store(class_type):
+                return False
+
+        self._emit(self.ADDED, [class_type])
+        return True
 
     # --------------------------------------------------------------------------
-    def reload(self):
+    def reload(self, full=False):
         """
-        This will forget any add_pathed plugins or information about plugins
-        and perform a search over all the stored paths.
+        This will search all the stored paths again. Only files which have
+        been added or modified since they were last searched are scanned,
+        and the plugins from any files which have been removed are
+        forgotten.
 
-        :return:
+        :param full: If True, the factory will forget all plugins (including
+            any which were registered directly) and perform a full search
+            over all the stored paths.
+        :type full: bool
+
+        :return: None
         """
         # -- Take a snapshot of the path data
         path_data = self._add_pathed_paths.copy()
+        groups = list(self._groups)
 
-        # -- Start clearing out the factory variables
-        self.clear()
+        if not full:
+            for path, mechanism in path_data.items():
+                added, removed = self._refresh_path(path, mechanism)
 
-        # -- Now cycle over the path data and re-add_path them
-        for path, mechanism in path_data.items():
-            self.add_path(
-                path=path,
-                mechanism=mechanism,
-            )
+                self._emit(self.REMOVED, removed)
+                self._emit(self.ADDED, added)
+
+            # -- Distributions may have been installed or removed, and
+            # -- reading their metadata is cheap
+            for group in groups:
+                self.add_entry_points(group)
+
+            return
+
+        # -- The whole reload is a single writer, so the factory is never
+        # -- seen to be empty by other threads
+        with self._writing():
+
+            # -- Start clearing out the factory variables. The modules are
+            # -- kept so that unchanged files need not be executed again
+            self._clear(unload=False)
+
+            # -- Now cycle over the path data and re-add_path them
+            for path, mechanism in path_data.items():
+                self.add_path(
+                    path=path,
+                    mechanism=mechanism,
+                )
+
+            for group in groups:
+                self.add_entry_points(group)
 
     # --------------------------------------------------------------------------
     def request(self, plugin_identifier, version=None):
@@ -798,8 +4153,11 @@ class Factory(object):
 
         :param version: The version of the plugin you want. By default this
             is None. If the factory does not have a versioning identifier
-            declared this argument has no affect.
-        :type version: int
+            declared this argument has no affect. This may also be a
+            constraint such as '>=2,<3' or '2.x', in which case the highest
+            version satisfying the constraint is given. See the constraint
+            module for the full syntax.
+        :type version: int or str
 
         :return: Plugin Class (or None)
 
@@ -834,43 +4192,73 @@ class Factory(object):
             JSONReader
             >>> print(plugin.version)
             1
+
+        Or the highest version within a range:
+
+        ..code-block:: python
+
+            >>> plugin = reader.factory.request('JSONReader', version='>=1,<2')
         """
+        start_time = time.time()
+
+        plugin = self._request(plugin_identifier, version)
+
+        self._stats.increment(self._stats.REQUESTS)
+        self._stats.increment(
+            self._stats.HITS if plugin is not None else self._stats.MISSES,
+        )
+        self._stats.increment(
+            self._stats.REQUEST_TIME,
+            time.time() - start_time,
+        )
+
+        return plugin
+
+    # --------------------------------------------------------------------------
+    def _request(self, plugin_identifier, version=None):
+        """
+        Retrieves the plugin with the specified plugin identifier and
+        version. See request.
+
+        :return: Plugin Class (or None)
+        """
+        # -- Take the registry once, as it may be swapped by another
+        # -- thread whilst we're reading it
+        registry = self._registry
+
         # -- Get all the plugins which match the given
-        # -- identifier
-        matching_plugins = [
-            plugin
-            for plugin in self._plugins
-            if self._get_identifier(plugin) == plugin_identifier
-        ]
+        # -- identifier, keyed by their version
+        versions = registry.index.get(plugin_identifier)
 
         # -- If there are no matching plugins we have nothing
         # -- to return
-        if not matching_plugins:
+        if not versions:
+            self._stats.increment(self._stats.UNKNOWN_IDENTIFIERS)
             self._log(
                 'No plugin matching {}'.format(plugin_identifier),
                 is_warning=True,
             )
             return None
 
-        # -- If we have not been given a versioning identifier
-        # -- then we arbitrarily return from our matching plugins.
-        if not self._version:
-            return matching_plugins[0]
-
-        # -- Sort out plugins in version order
-        versions = {
-            self._get_version(plugin): plugin
-            for plugin in matching_plugins
-        }
-
-        # -- If we have not been given a version we simply return
-        # -- the plugin with the highest value
-        if not version:
-            return versions[max(versions.keys())]
+        # -- If we have not been given a versioning identifier, or
+        # -- a version we simply return the plugin with the highest
+        # -- value
+        if not self._version or not version:
+            return self._resolve(registry.latest[plugin_identifier])
+
+        # -- A constraint is matched against the ordered versions
+        # -- rather than looked up directly
+        if version not in versions and constraint.is_constraint(version):
+            return self._request_constrained(
+                registry,
+                plugin_identifier,
+                version,
+            )
 
         # -- If the requested version is not in the versions
         # -- available we return None
         if version not in versions:
+            self._stats.increment(self._stats.VERSION_MISSES)
             self._log(
                 'Version {} of {} could not be found'.format(
                     version,
@@ -881,7 +4269,46 @@ class Factory(object):
             return None
 
         # -- Finally we return the requested version
-        return versions[version]
+        return self._resolve(versions[version])
+
+    # --------------------------------------------------------------------------
+    def _request_constrained(self, registry, plugin_identifier, text):
+        """
+        Returns the plugin with the highest version of the given identifier
+        which satisfies the given constraint.
+
+        :param registry: The registry to read from
+        :type registry: registry.Registry
+
+        :param plugin_identifier: The identifier of the plugin
+        :type plugin_identifier: str
+
+        :param text: The constraint, such as '>=2,<3'
+        :type text: str
+
+        :return: Plugin Class (or None)
+        """
+        try:
+            best = constraint.Constraint(text).best(
+                registry.ordered.get(plugin_identifier, list()),
+            )
+
+        except ValueError:
+            self._log(str(sys.exc_info()[1]), is_warning=True)
+            return None
+
+        if best is None:
+            self._stats.increment(self._stats.VERSION_MISSES)
+            self._log(
+                'No version of {} satisfies {}'.format(
+                    plugin_identifier,
+                    text,
+                ),
+                is_warning=True,
+            )
+            return None
+
+        return self._resolve(registry.index[plugin_identifier][best])
 
     # --------------------------------------------------------------------------
     def remove_path(self, path):
@@ -889,13 +4316,19 @@ class Factory(object):
         This will remove a path from the path list. Any plugins from this 
         location will be removed.
         
-        Note: This action performs a factory clear and re-scan.
+        Note: Only the plugins found within this path are removed, the
+        remaining paths are not searched again.
+
+        Any modules which were loaded directly from files within the path
+        are removed from sys.modules, unless another factory holds them.
+        The leak_check of the returned report can be used to verify that
+        the plugins and modules were freed.
         
         :param path: Path to remove from the factory. This must be an 
             absolute path
         :type path: str
         
-        :return: None 
+        :return: report.UnloadReport 
         
         ..code-block::
         
@@ -916,33 +4349,53 @@ class Factory(object):
             >>> print(len(reader.factory.plugins()))
             0
         """
-        # -- Take a snapshot of the path data
-        path_data = self._add_pathed_paths.copy()
+        unloaded = report.UnloadReport()
+        removed = list()
+        matched = False
 
-        # -- Start clearing out the factory variables
-        self._plugins = list()
-        self._add_pathed_paths = dict()
+        with self._writing():
+            for original_path in list(self._add_pathed_paths.keys()):
 
-        # -- Now cycle over the path data and re-add_path them
-        for original_path, mechanism in path_data.items():
+                # -- Skip any path we're not being asked to remove
+                if os.path.abspath(original_path) != os.path.abspath(path):
+                    continue
 
-            # -- Skip the path we're being asked to remove
-            if os.path.abspath(original_path) == os.path.abspath(path):
-                continue
+                # -- Forget the path along with all the plugins which
+                # -- were found within it, unloading their modules
+                matched = True
+                self._set_path(original_path)
+                removed.extend(
+                    self._forget_files(original_path, unloaded=unloaded),
+                )
+                self._archives.pop(original_path, None)
+                self._report.walks.pop(original_path, None)
 
-            self.add_path(
-                path=original_path,
-                mechanism=mechanism,
-            )
+                # -- We no longer need to know of failures within the path
+                prefix = os.path.join(original_path, '')
+
+                for filepath in list(self._failures.keys()):
+                    if filepath == original_path or \
+                            filepath.startswith(prefix):
+                        self._failures.pop(filepath)
+
+        if matched:
+            self._emit(self.REMOVED, removed)
+            self._update_watcher()
+
+        return unloaded
 
     # --------------------------------------------------------------------------
-    def versions(self, identifier):
+    def versions(self, identifier, matching=None):
         """
         Returns a list of all the versions available for the plugins with the
-        given identifier. 
+        given identifier, in ascending order.
         
         :param identifier: Plugin identifier to check
         :type identifier: str
+
+        :param matching: Optional constraint, such as '>=2,<3'. If given only
+            the versions which satisfy it are returned.
+        :type matching: str
         
         :return: list(int, int, ...) 
         
@@ -960,11 +4413,75 @@ class Factory(object):
         if not self._version:
             return list()
 
-        return sorted(
-            self._get_version(plugin)
-            for plugin in self._plugins
-            if self._get_identifier(plugin) == identifier
+        if matching is None:
+            return self._registry.versions(identifier)
+
+        try:
+            return self._registry.versions(
+                identifier,
+                constraint.Constraint(matching),
+            )
+
+        except ValueError:
+            self._log(str(sys.exc_info()[1]), is_warning=True)
+            return list()
+
+    # --------------------------------------------------------------------------
+    def watch(self, interval=1.0, polling=False):
+        """
+        Starts monitoring all the paths of the factory for plugin files
+        being added, modified or removed. Changes are applied as they
+        happen - only the affected files are scanned - and the ADDED and
+        REMOVED callbacks are called with the plugins which changed.
+
+        On linux inotify is used, otherwise the directories and files are
+        polled for changes.
+
+        :param interval: How often, in seconds, to poll for changes when
+            inotify is not available
+        :type interval: float
+
+        :param polling: If True, polling is always used
+        :type polling: bool
+
+        :return: None
+        """
+        if self._watcher:
+            return
+
+        self._watcher = watcher.create(
+            self._watchable_paths(),
+            self._on_files_changed,
+            interval=interval,
+            match=self._PY_CHECK.match,
+            polling=polling,
+            ignore=self._ignore,
+            max_depth=self._max_depth,
+            prune=self._prune,
         )
+        self._watcher.start()
+
+    # --------------------------------------------------------------------------
+    def unwatch(self):
+        """
+        Stops monitoring the paths of the factory
+
+        :return: None
+        """
+        if not self._watcher:
+            return
+
+        self._watcher.stop()
+        self._watcher = None
+
+    # --------------------------------------------------------------------------
+    def is_watching(self):
+        """
+        Returns True if the factory is monitoring its paths for changes
+
+        :return: bool
+        """
+        return self._watcher is not None
 
 
 # ------------------------------------------------------------------------------
@@ -0,0 +1,424 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module inspects plugin files within a pool of separate processes.
+Each file is given a time budget, and any file which is still being
+imported once its budget is spent has its process terminated. This means
+a file with a slow - or hanging - import cannot hold up the discovery of
+every other plugin.
+
+Only a description of the plugins in each file (the name of each class
+along with its identifier, version and indexed attributes) is passed
+back, which allows the factory to store proxies and only import the file
+if a plugin is requested.
+"""
+import sys
+import time
+import multiprocessing
+
+# -- Waiting on several connections at once is not available in all
+# -- python versions, in which case each connection is polled in turn
+try:
+    from multiprocessing.connection import wait as _wait
+
+except ImportError:
+    _wait = None
+
+
+# -- The interval, in seconds, to poll connections at when they
+# -- cannot be waited on together
+_POLL_INTERVAL = 0.01
+
+
+# ------------------------------------------------------------------------------
+class Result(object):
+    """
+    Describes the outcome of inspecting a single file
+    """
+
+    # -- The plugins of the file were described
+    FOUND = 'found'
+
+    # -- The file could not be imported, or failed during inspection
+    FAILED = 'failed'
+
+    # -- The file was still being inspected when its budget was spent
+    TIMEOUT = 'timeout'
+
+    # -- The file holds plugins whose attributes cannot be passed
+    # -- between processes, so it must be imported directly
+    UNDESCRIBED = 'undescribed'
+
+    __slots__ = (
+        'filepath',
+        'status',
+        'plugins',
+        'mechanism',
+        'failure',
+        'duration',
+        'dependencies',
+    )
+
+    # --------------------------------------------------------------------------
+    def __init__(self,
+                 filepath,
+                 status,
+                 plugins=None,
+                 mechanism=None,
+                 failure=None,
+                 duration=0.0,
+                 dependencies=None):
+        """
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param status: One of FOUND, FAILED, TIMEOUT or UNDESCRIBED
+        :type status: str
+
+        :param plugins: List of (name, attributes) pairs of the plugins
+            found within the file
+        :type plugins: list
+
+        :param mechanism: The mechanism the file was loaded with
+        :type mechanism: int
+
+        :param failure: A description of any failure
+        :type failure: str
+
+        :param duration: The time, in seconds, the file took to inspect
+        :type duration: float
+
+        :param dependencies: The files defining the bases of the classes
+            within the file
+        :type dependencies: list(str, ...)
+        """
+        self.filepath = filepath
+        self.status = status
+        self.plugins = plugins or list()
+        self.mechanism = mechanism
+        self.failure = failure
+        self.duration = duration
+        self.dependencies = dependencies or list()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[Result - {} ({})]'.format(self.filepath, self.status)
+
+
+# ------------------------------------------------------------------------------
+def _describe(factory, filepath, mechanism):
+    """
+    Loads and inspects the given file with the given factory, returning
+    a (status, plugins, mechanism, failure, dependencies) tuple which can
+    be passed between processes.
+    """
+    # -- We have no control over the code being loaded, so anything
+    # -- it raises is reported rather than ending the process
+    # noinspection PyBroadException
+    try:
+        module, used_mechanism = factory._load_module(filepath, mechanism)
+
+        if not module:
+            return Result.FAILED, None, None, 'Could not import or load', None
+
+        plugins = list()
+
+        # -- Only values which could be written to the discovery cache
+        # -- can be passed back
+        found = factory._inspect_module(module)
+
+        for name, plugin in found:
+            attributes = factory._describe(plugin)
+
+            if attributes is None:
+                return Result.UNDESCRIBED, None, used_mechanism, None, None
+
+            plugins.append((name, attributes))
+
+        return (
+            Result.FOUND,
+            plugins,
+            used_mechanism,
+            None,
+            factory._dependencies(module, found),
+        )
+
+    except BaseException:
+        return Result.FAILED, None, None, str(sys.exc_info()[1]), None
+
+
+# ------------------------------------------------------------------------------
+def _serve(connection, abstract, identifier, version, indexed):
+    """
+    This is run within each inspecting process. It inspects each file it
+    is sent until it is sent None, or the connection is closed.
+    """
+    # -- This is imported here as the factory module imports this one
+    from .factory import Factory
+
+    factory = Factory(
+        abstract=abstract,
+        plugin_identifier=identifier,
+        versioning_identifier=version,
+        indexed_attributes=indexed,
+        log_errors=False,
+    )
+
+    while True:
+        try:
+            request = connection.recv()
+
+        except EOFError:
+            return
+
+        if request is None:
+            return
+
+        filepath, mechanism = request
+        connection.send(_describe(factory, filepath, mechanism))
+
+
+# ------------------------------------------------------------------------------
+class _Worker(object):
+    """
+    Wraps an inspecting process along with the connection to it
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, abstract, identifier, version, indexed):
+        self.connection, child = multiprocessing.Pipe()
+
+        self.process = multiprocessing.Process(
+            target=_serve,
+            args=(child, abstract, identifier, version, indexed),
+        )
+        self.process.daemon = True
+        self.process.start()
+
+        # -- Only the process holds the other end of the pipe, so
+        # -- we know if it exits
+        child.close()
+
+        # -- The file being inspected, and when it was sent
+        self.filepath = None
+        self.started = None
+
+    # --------------------------------------------------------------------------
+    def send(self, filepath, mechanism):
+        self.filepath = filepath
+        self.started = time.time()
+
+        self.connection.send((filepath, mechanism))
+
+    # --------------------------------------------------------------------------
+    def stop(self, terminate=False):
+        """
+        Stops the process, terminating it if it is busy or asked to
+        """
+        if not terminate:
+            try:
+                self.connection.send(None)
+                self.process.join(1)
+
+            except (IOError, OSError):
+                pass
+
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+        self.connection.close()
+
+
+# ------------------------------------------------------------------------------
+def _ready(connections, timeout):
+    """
+    Returns the connections which have something to receive, waiting up
+    to the given timeout (or indefinitely if the timeout is None) for at
+    least one of them.
+    """
+    if _wait is not None:
+        return _wait(connections, timeout)
+
+    end_time = None if timeout is None else time.time() + timeout
+
+    while True:
+        ready = [
+            connection
+            for connection in connections
+            if connection.poll()
+        ]
+
+        if ready or (end_time is not None and time.time() >= end_time):
+            return ready
+
+        time.sleep(_POLL_INTERVAL)
+
+
+# ------------------------------------------------------------------------------
+def inspect_files(filepaths,
+                  abstract,
+                  identifier,
+                  version=None,
+                  indexed=None,
+                  mechanism=0,
+                  budget=None,
+                  processes=None):
+    """
+    Inspects each of the given files for plugins within a pool of
+    processes.
+
+    :param filepaths: The absolute paths of the files to inspect
+    :type filepaths: list(str, ...)
+
+    :param abstract: The abstract the plugins inherit from. This must be
+        importable by the inspecting processes.
+    :type abstract: class
+
+    :param identifier: The identifying attribute of the plugins
+    :type identifier: str
+
+    :param version: The versioning attribute of the plugins, if any
+    :type version: str
+
+    :param indexed: The names of any further attributes to describe
+    :type indexed: list(str, ...)
+
+    :param mechanism: The mechanism to load the files with
+    :type mechanism: int
+
+    :param budget: The time, in seconds, each file is given to be
+        inspected. If None, files are given as long as they need.
+    :type budget: float
+
+    :param processes: The number of processes to use. If None, one
+        process is used for each cpu.
+    :type processes: int
+
+    :return: Dictionary of filepaths to Result instances
+    """
+    if not filepaths:
+        return dict()
+
+    processes = min(
+        processes or multiprocessing.cpu_count(),
+        len(filepaths),
+    )
+
+    # -- Files are taken from the end, so reverse them to
+    # -- inspect them in order
+    pending = list(reversed(filepaths))
+    results = dict()
+
+    idle = list()
+    busy = dict()
+
+    def start():
+        return _Worker(abstract, identifier, version, indexed)
+
+    try:
+        for _ in range(processes):
+            idle.append(start())
+
+        while pending or busy:
+
+            while pending and idle:
+                worker = idle.pop()
+                worker.send(pending.pop(), mechanism)
+                busy[worker.connection] = worker
+
+            # -- Wait for a result, but never beyond the point at
+            # -- which the next file's budget is spent
+            timeout = None
+
+            if budget is not None:
+                timeout = max(
+                    0,
+                    min(
+                        worker.started + budget
+                        for worker in busy.values()
+                    ) - time.time(),
+                )
+
+            for connection in _ready(list(busy), timeout):
+                worker = busy.pop(connection)
+                duration = time.time() - worker.started
+
+                try:
+                    status, plugins, used, failure, dependencies = \
+                        connection.recv()
+
+                # -- If the file ended the process there is nothing to
+                # -- receive, and the process must be replaced
+                except (EOFError, IOError, OSError):
+                    results[worker.filepath] = Result(
+                        worker.filepath,
+                        Result.FAILED,
+                        failure='The inspecting process exited',
+                        duration=duration,
+                    )
+
+                    worker.stop(terminate=True)
+                    idle.append(start())
+                    continue
+
+                results[worker.filepath] = Result(
+                    worker.filepath,
+                    status,
+                    plugins=plugins,
+                    mechanism=used,
+                    failure=failure,
+                    duration=duration,
+                    dependencies=dependencies,
+                )
+                idle.append(worker)
+
+            if budget is None:
+                continue
+
+            # -- Any file which has spent its budget has its process
+            # -- terminated, and a fresh process takes its place
+            for connection, worker in list(busy.items()):
+                duration = time.time() - worker.started
+
+                if duration < budget:
+                    continue
+
+                busy.pop(connection)
+                results[worker.filepath] = Result(
+                    worker.filepath,
+                    Result.TIMEOUT,
+                    failure='Exceeded the time budget of {}s'.format(budget),
+                    duration=duration,
+                )
+
+                worker.stop(terminate=True)
+
+                if pending:
+                    idle.append(start())
+
+    finally:
+        for worker in idle:
+            worker.stop()
+
+        for worker in busy.values():
+            worker.stop(terminate=True)
+
+    return results
@@ -0,0 +1,341 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+A manifest is a json file placed within a plugin directory which lists the
+plugins that directory contains - the file each is defined in, the abstract
+it implements and the values of its identifying attributes. When a factory
+finds a manifest which describes its abstract it trusts it entirely, so the
+directory is not walked and only the listed files are imported (or none at
+all when the factory is lazy).
+
+Manifests are intended for released plugin packages and can be generated
+from an existing directory using this module from the command line:
+
+.. code-block:: bash
+
+    python -m factories.manifest /path/to/plugins \\
+        --abstract factories.examples.reader:ReaderPlugin \\
+        --attribute version
+"""
+from . import constants
+
+import os
+import sys
+import json
+import inspect
+import argparse
+import importlib
+
+
+# -- Bump this if the layout of the manifest changes
+FORMAT = 1
+
+
+# ------------------------------------------------------------------------------
+def abstract_name(abstract):
+    """
+    Returns the name an abstract is referred to by within a manifest
+
+    :param abstract: The abstract class
+    :type abstract: class
+
+    :return: str
+    """
+    return '{}.{}'.format(abstract.__module__, abstract.__name__)
+
+
+# ------------------------------------------------------------------------------
+def read(directory):
+    """
+    Reads the manifest within the given directory
+
+    :param directory: Absolute path to the plugin directory
+    :type directory: str
+
+    :return: dict or None if there is no valid manifest
+    """
+    filepath = os.path.join(directory, constants.MANIFEST_FILENAME)
+
+    # noinspection PyBroadException
+    try:
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+
+    except BaseException:
+        return None
+
+    if not isinstance(data, dict) or data.get('format') != FORMAT:
+        return None
+
+    return data
+
+
+# ------------------------------------------------------------------------------
+def plugins_for(data, directory, abstract, attributes):
+    """
+    Returns the plugins listed in the given manifest data for the given
+    abstract.
+
+    :param data: Manifest data, as returned by read
+    :type data: dict
+
+    :param directory: The directory the manifest was read from
+    :type directory: str
+
+    :param abstract: The abstract plugins must implement
+    :type abstract: class
+
+    :param attributes: The attributes the factory requires of each plugin
+    :type attributes: list(str, ...)
+
+    :return: Dictionary of absolute filepaths to lists of (name, attributes)
+        pairs. If the manifest does not describe the abstract - or does not
+        hold all of the required attributes - None is returned, as the
+        manifest cannot be trusted for this abstract.
+    """
+    names = (abstract_name(abstract), abstract.__name__)
+
+    if not any(name in data.get('abstracts', list()) for name in names):
+        return None
+
+    results = dict()
+
+    for entry in data.get('plugins', list()):
+        if entry.get('abstract') not in names:
+            continue
+
+        values = entry.get('attributes', dict())
+
+        if any(attribute not in values for attribute in attributes):
+            return None
+
+        filepath = os.path.join(
+            directory,
+            *entry['module'].split('/')
+        )
+
+        results.setdefault(filepath, list()).append(
+            (
+                entry['name'],
+                dict(
+                    (attribute, values[attribute])
+                    for attribute in attributes
+                ),
+            ),
+        )
+
+    return results
+
+
+# ------------------------------------------------------------------------------
+def _value(plugin, attribute):
+    """
+    Returns the value of an attribute of a plugin, calling it if it is
+    a method.
+    """
+    if attribute == '__name__':
+        return plugin.__name__
+
+    value = getattr(plugin, attribute)
+
+    if inspect.ismethod(value):
+        return value()
+
+    return value
+
+
+# ------------------------------------------------------------------------------
+def generate(directory, abstracts, attributes=None, mechanism=0):
+    """
+    Generates manifest data for the given directory by searching it for
+    implementations of each of the given abstracts.
+
+    :param directory: Absolute path to the plugin directory
+    :type directory: str
+
+    :param abstracts: The abstract classes to search for
+    :type abstracts: list(class, ...)
+
+    :param attributes: The names of the attributes to record for each
+        plugin. These should include the identifier and version attributes
+        used by any factory which will read the manifest. The class name
+        (__name__) is always recorded.
+    :type attributes: list(str, ...)
+
+    :param mechanism: The factory mechanism to load files with
+    :type mechanism: int
+
+    :return: dict
+    """
+    from .factory import Factory
+
+    attributes = ['__name__'] + [
+        attribute
+        for attribute in attributes or list()
+        if attribute != '__name__'
+    ]
+
+    plugins = list()
+
+    for abstract in abstracts:
+
+        factory = Factory(abstract=abstract, log_errors=False)
+
+        # noinspection PyProtectedMember
+        for filepath in factory._collect_files(directory):
+
+            # noinspection PyProtectedMember
+            module, _ = factory._load_module(filepath, mechanism)
+
+            if not module:
+                continue
+
+            relative = os.path.relpath(filepath, directory)
+
+            # noinspection PyProtectedMember
+            for name, plugin in factory._inspect_module(module):
+                values = dict()
+
+                for attribute in attributes:
+
+                    # noinspection PyBroadException
+                    try:
+                        value = _value(plugin, attribute)
+                        json.dumps(value)
+
+                    except BaseException:
+                        continue
+
+                    values[attribute] = value
+
+                plugins.append(
+                    dict(
+                        module=relative.replace(os.sep, '/'),
+                        name=name,
+                        abstract=abstract_name(abstract),
+                        attributes=values,
+                    ),
+                )
+
+    return dict(
+        format=FORMAT,
+        abstracts=[abstract_name(abstract) for abstract in abstracts],
+        plugins=plugins,
+    )
+
+
+# ------------------------------------------------------------------------------
+def write(directory, data, filepath=None):
+    """
+    Writes manifest data into the given directory
+
+    :param directory: Absolute path to the plugin directory
+    :type directory: str
+
+    :param data: The manifest data, as returned by generate
+    :type data: dict
+
+    :param filepath: Optional alternate location to write to
+    :type filepath: str
+
+    :return: The path the manifest was written to
+    """
+    filepath = filepath or os.path.join(directory, constants.MANIFEST_FILENAME)
+
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=4, sort_keys=True)
+
+    return filepath
+
+
+# ------------------------------------------------------------------------------
+def _import_abstract(address):
+    """
+    Imports an abstract from an address in the form of package.module:Class
+    """
+    module_name, _, class_name = address.replace(':', '.').rpartition('.')
+
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# ------------------------------------------------------------------------------
+def main(argv=None):
+    """
+    Command line entry point for generating a manifest
+
+    :param argv: Arguments to parse, defaults to sys.argv
+    :type argv: list(str, ...)
+
+    :return: exit code
+    """
+    parser = argparse.ArgumentParser(
+        description='Generates a factories plugin manifest for a directory',
+    )
+    parser.add_argument(
+        'directory',
+        help='The plugin directory to generate the manifest for',
+    )
+    parser.add_argument(
+        '--abstract',
+        action='append',
+        required=True,
+        help='Abstract to search for, in the form package.module:Class',
+    )
+    parser.add_argument(
+        '--attribute',
+        action='append',
+        default=list(),
+        help='Plugin attribute to record, such as an identifier or version',
+    )
+    parser.add_argument(
+        '--mechanism',
+        choices=['guess', 'load_source', 'importable'],
+        default='guess',
+        help='How plugin files should be loaded',
+    )
+    parser.add_argument(
+        '--output',
+        help='Write the manifest here rather than into the directory',
+    )
+
+    args = parser.parse_args(argv)
+
+    from .factory import Factory
+
+    directory = os.path.abspath(args.directory)
+
+    data = generate(
+        directory,
+        [_import_abstract(address) for address in args.abstract],
+        attributes=args.attribute,
+        mechanism=getattr(Factory, args.mechanism.upper()),
+    )
+
+    filepath = write(directory, data, filepath=args.output)
+
+    sys.stdout.write(
+        'Wrote {} plugins to {}\n'.format(len(data['plugins']), filepath),
+    )
+    return 0
+
+
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.exit(main())
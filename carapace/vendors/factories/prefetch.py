@@ -0,0 +1,236 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module holds the file work which can be performed ahead of executing
+plugin modules - such as stat'ing, reading, parsing and compiling files.
+None of this work has side effects, which means it can safely be spread
+over a pool of threads, which is particularly beneficial when plugins are
+stored on high latency file systems.
+"""
+from . import cache
+from . import scanner
+
+import marshal
+import collections
+
+# -- Thread pools are not available in all python versions, in which
+# -- case files are always prefetched one at a time
+try:
+    from concurrent.futures import ThreadPoolExecutor
+
+except ImportError:
+    ThreadPoolExecutor = None
+
+try:
+    from importlib.util import MAGIC_NUMBER
+
+except ImportError:
+    MAGIC_NUMBER = None
+
+
+# -- The size of the header at the start of a compiled file
+# -- which precedes the marshalled code
+_PYC_HEADER_SIZE = 16
+
+# -- The number of files each worker may have prefetched ahead of the
+# -- file which is being handed over
+_AHEAD = 2
+
+
+# ------------------------------------------------------------------------------
+class Prefetch(object):
+    """
+    Holds the results of the work performed on a file ahead of it being
+    executed.
+    """
+
+    __slots__ = ('filepath', 'stamp', 'classes', 'code')
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filepath, stamp=None, classes=None, code=None):
+        """
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param stamp: The (mtime, size) of the file
+        :type stamp: tuple
+
+        :param classes: The statically parsed classes of the file, if the
+            file was parsed.
+        :type classes: list(scanner.ClassDefinition, ...)
+
+        :param code: The compiled code of the file, if it was compiled
+        :type code: code
+        """
+        self.filepath = filepath
+        self.stamp = stamp
+        self.classes = classes
+        self.code = code
+
+
+# ------------------------------------------------------------------------------
+def _compile(filepath, data):
+    """
+    Returns the code object for the given file data, or None if it
+    cannot be compiled.
+
+    :param filepath: Absolute path to the file the data was read from
+    :type filepath: str
+
+    :param data: The content of the file
+    :type data: bytes
+
+    :return: code or None
+    """
+    # noinspection PyBroadException
+    try:
+        if filepath.endswith('.pyc'):
+
+            # -- We can only use compiled files which were compiled
+            # -- by this version of python
+            if not MAGIC_NUMBER or data[:4] != MAGIC_NUMBER:
+                return None
+
+            return marshal.loads(data[_PYC_HEADER_SIZE:])
+
+        return compile(data, filepath, 'exec', dont_inherit=True)
+
+    # -- Any failure here will be reproduced and reported when the
+    # -- file is loaded through the regular mechanism
+    except BaseException:
+        return None
+
+
+# ------------------------------------------------------------------------------
+def prefetch_file(filepath, parse=False, compile_code=True, skip=None):
+    """
+    Performs all the file work for the given file which can happen prior to
+    it being executed.
+
+    :param filepath: Absolute path to the file
+    :type filepath: str
+
+    :param parse: If True, python source files are statically parsed
+    :type parse: bool
+
+    :param compile_code: If True, the file is compiled to a code object
+    :type compile_code: bool
+
+    :param skip: Optional callable which is given the filepath and its
+        stamp, and returns True if the content of the file is not required.
+    :type skip: callable
+
+    :return: Prefetch
+    """
+    result = Prefetch(filepath, stamp=cache.stamp(filepath))
+
+    if skip and skip(filepath, result.stamp):
+        return result
+
+    if not parse and not compile_code:
+        return result
+
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+    except (OSError, IOError):
+        return result
+
+    if parse and filepath.endswith('.py'):
+        result.classes = scanner.parse_source(data, filepath)
+
+    if compile_code:
+        result.code = _compile(filepath, data)
+
+    return result
+
+
+# ------------------------------------------------------------------------------
+def iter_prefetch(filepaths, workers=None, **kwargs):
+    """
+    Prefetches the given files, yielding the results in the same order as
+    the files were given. If workers is given the work is spread over a
+    thread pool of that size, but only a few files are worked on ahead of
+    the one being yielded. This means results - which may hold compiled
+    code - are handed over as soon as they are ready rather than being
+    held for every file at once.
+
+    :param filepaths: List of absolute file paths
+    :type filepaths: list(str, ...)
+
+    :param workers: The number of threads to use
+    :type workers: int
+
+    :param kwargs: Any arguments to pass to prefetch_file
+
+    :return: generator of Prefetch
+    """
+    if not workers or workers < 2 or not ThreadPoolExecutor or \
+            len(filepaths) < 2:
+        for filepath in filepaths:
+            yield prefetch_file(filepath, **kwargs)
+
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = collections.deque()
+
+    try:
+        for filepath in filepaths:
+            pending.append(
+                executor.submit(prefetch_file, filepath, **kwargs),
+            )
+
+            if len(pending) >= workers * _AHEAD:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    finally:
+        # -- If we are no longer wanted there is no need to
+        # -- finish the files which have not been started
+        for future in pending:
+            future.cancel()
+
+        executor.shutdown(wait=True)
+
+
+# ------------------------------------------------------------------------------
+def prefetch(filepaths, workers=None, **kwargs):
+    """
+    Prefetches all the given files. If workers is given the work is spread
+    over a thread pool of that size.
+
+    :param filepaths: List of absolute file paths
+    :type filepaths: list(str, ...)
+
+    :param workers: The number of threads to use
+    :type workers: int
+
+    :param kwargs: Any arguments to pass to prefetch_file
+
+    :return: Dictionary of filepath to Prefetch
+    """
+    return dict(
+        (result.filepath, result)
+        for result in iter_prefetch(filepaths, workers=workers, **kwargs)
+    )
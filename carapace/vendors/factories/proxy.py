@@ -0,0 +1,184 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import inspect
+
+
+# ------------------------------------------------------------------------------
+class PluginProxy(object):
+    """
+    A PluginProxy is a lightweight stand-in for a plugin class which the
+    factory knows about but has not yet imported. It carries the values
+    of the attributes the factory needs to index the plugin (typically the
+    identifier and version) and only loads the module which defines the
+    real plugin class when something else is asked of it.
+
+    Factories hand out the real plugin class from request(), so in general
+    code never needs to interact with a proxy directly.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, factory, filepath, name, mechanism, attributes=None):
+        """
+        :param factory: The factory this proxy belongs to. This is used to
+            load the module when the proxy is resolved.
+        :type factory: factories.Factory
+
+        :param filepath: Absolute path to the file defining the plugin
+        :type filepath: str
+
+        :param name: Name of the plugin class within its module
+        :type name: str
+
+        :param mechanism: The factory mechanism to load the module with
+        :type mechanism: int
+
+        :param attributes: Dictionary of attribute names and values which
+            can be returned without resolving the plugin.
+        :type attributes: dict
+        """
+        self._factory = factory
+        self._filepath = filepath
+        self._name = name
+        self._mechanism = mechanism
+        self._attributes = attributes or dict()
+        self._plugin = None
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[PluginProxy - {} ({}), Resolved: {}]'.format(
+            self._name,
+            self._filepath,
+            self._plugin is not None,
+        )
+
+    # --------------------------------------------------------------------------
+    def __getattr__(self, name):
+
+        # -- Guard against lookups of our own members before __init__
+        # -- has run (such as during copying or unpickling)
+        if name.startswith('_') and name in (
+                '_factory',
+                '_filepath',
+                '_name',
+                '_mechanism',
+                '_attributes',
+                '_plugin'):
+            raise AttributeError(name)
+
+        # -- If we know the value up front we do not need to
+        # -- load anything
+        if name in self._attributes:
+            return self._attributes[name]
+
+        plugin = self.resolve()
+
+        if plugin is None:
+            raise AttributeError(
+                'Could not resolve plugin {} from {}'.format(
+                    self._name,
+                    self._filepath,
+                ),
+            )
+
+        return getattr(plugin, name)
+
+    # --------------------------------------------------------------------------
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    # --------------------------------------------------------------------------
+    @property
+    def filepath(self):
+        """
+        Returns the path to the file which defines the plugin
+
+        :return: str
+        """
+        return self._filepath
+
+    # --------------------------------------------------------------------------
+    @property
+    def name(self):
+        """
+        Returns the name of the plugin class within its module
+
+        :return: str
+        """
+        return self._name
+
+    # --------------------------------------------------------------------------
+    @property
+    def mechanism(self):
+        """
+        Returns the factory mechanism used to load the plugin module
+
+        :return: int
+        """
+        return self._mechanism
+
+    # --------------------------------------------------------------------------
+    def is_resolved(self):
+        """
+        Returns True if the real plugin class has already been loaded
+
+        :return: bool
+        """
+        return self._plugin is not None
+
+    # --------------------------------------------------------------------------
+    def resolve(self):
+        """
+        Loads the module which defines this plugin and returns the real
+        plugin class. The class is retained, so only the first call incurs
+        any loading cost.
+
+        :return: Plugin class or None if it could not be resolved
+        """
+        if self._plugin is not None:
+            return self._plugin
+
+        # noinspection PyProtectedMember
+        module = self._factory._module_for(self._filepath, self._mechanism)
+
+        if module is None:
+            return None
+
+        plugin = getattr(module, self._name, None)
+
+        # -- Only ever hand back something which genuinely implements
+        # -- the abstract of the factory
+        # noinspection PyProtectedMember
+        if not inspect.isclass(plugin) or \
+                not issubclass(plugin, self._factory._abstract):
+            return None
+
+        self._plugin = plugin
+        return self._plugin
+
+    # --------------------------------------------------------------------------
+    def release(self):
+        """
+        Forgets the real plugin class, if it has been resolved, so that the
+        proxy no longer keeps it alive. Resolving the proxy again will load
+        the module again.
+
+        :return: None
+        """
+        self._plugin = None
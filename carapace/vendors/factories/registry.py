@@ -0,0 +1,868 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import bisect
+
+# -- The abstract mapping classes moved in python 3.3
+try:
+    from collections.abc import MutableMapping
+
+except ImportError:
+    from collections import MutableMapping
+
+
+# ------------------------------------------------------------------------------
+def _copy(container):
+    """
+    Returns a shallow copy of the given list, dict or SharedMap
+    """
+    if isinstance(container, list):
+        return list(container)
+
+    return container.copy()
+
+
+# ------------------------------------------------------------------------------
+class SharedMap(MutableMapping):
+    """
+    A dictionary which shares its contents with its copies. The keys are
+    spread over a number of shards, and copying the map only copies the
+    list of shards. Each shard is then copied the first time it is altered
+    by a map which shares it.
+
+    The number of shards is kept close to the square root of the number
+    of keys, so copying and then altering a map costs roughly the square
+    root of its size rather than the whole of it.
+
+    ..code-block:: python
+
+        >>> original = SharedMap(dict(a=1, b=2))
+        >>> copied = original.copy()
+        >>> copied['c'] = 3
+        >>> 'c' in original
+        False
+    """
+
+    # -- The fewest shards a map is spread over. The number of shards is
+    # -- kept odd, as the hashes of some keys - such as the ids of objects
+    # -- - are all multiples of a power of two
+    _MINIMUM_SHARDS = 7
+
+    # --------------------------------------------------------------------------
+    def __init__(self, items=None):
+        """
+        :param items: Optional mapping or (key, value) pairs to populate
+            the map with
+        """
+        self._shards = [dict() for _ in range(self._MINIMUM_SHARDS)]
+        self._length = 0
+
+        # -- The indices of the shards which are not shared, and can
+        # -- therefore be altered in place
+        self._owned = set(range(self._MINIMUM_SHARDS))
+
+        if items:
+            self.update(items)
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return 'SharedMap({!r})'.format(dict(self.items()))
+
+    # --------------------------------------------------------------------------
+    def __len__(self):
+        return self._length
+
+    # --------------------------------------------------------------------------
+    def __iter__(self):
+        for shard in self._shards:
+            for key in shard:
+                yield key
+
+    # --------------------------------------------------------------------------
+    def __contains__(self, key):
+        return key in self._shards[hash(key) % len(self._shards)]
+
+    # --------------------------------------------------------------------------
+    def __getitem__(self, key):
+        return self._shards[hash(key) % len(self._shards)][key]
+
+    # --------------------------------------------------------------------------
+    def get(self, key, default=None):
+        return self._shards[hash(key) % len(self._shards)].get(key, default)
+
+    # --------------------------------------------------------------------------
+    def __setitem__(self, key, value):
+        shard = self._writable(hash(key) % len(self._shards))
+
+        if key not in shard:
+            self._length += 1
+
+        shard[key] = value
+
+        if self._length > len(self._shards) ** 2:
+            self._reshard()
+
+    # --------------------------------------------------------------------------
+    def __delitem__(self, key):
+        index = hash(key) % len(self._shards)
+
+        if key not in self._shards[index]:
+            raise KeyError(key)
+
+        del self._writable(index)[key]
+        self._length -= 1
+
+    # --------------------------------------------------------------------------
+    def copy(self):
+        """
+        Returns a copy of the map which can be altered without affecting
+        this one. Both maps share every shard until they alter it.
+
+        :return: SharedMap
+        """
+        other = SharedMap.__new__(SharedMap)
+        other._shards = list(self._shards)
+        other._length = self._length
+        other._owned = set()
+
+        self._owned = set()
+
+        return other
+
+    # --------------------------------------------------------------------------
+    def _writable(self, index):
+        """
+        Returns the shard at the given index, copying it first if it may
+        be shared with another map
+
+        :param index: The index of the shard
+        :type index: int
+
+        :return: dict
+        """
+        if index not in self._owned:
+            self._shards[index] = dict(self._shards[index])
+            self._owned.add(index)
+
+        return self._shards[index]
+
+    # --------------------------------------------------------------------------
+    def _reshard(self):
+        """
+        Spreads the keys over twice as many shards. As this happens each
+        time the number of keys quadruples its cost is spread thinly over
+        the changes which caused it.
+
+        :return: None
+        """
+        count = len(self._shards) * 2 + 1
+        shards = [dict() for _ in range(count)]
+
+        for shard in self._shards:
+            for key, value in shard.items():
+                shards[hash(key) % count][key] = value
+
+        self._shards = shards
+        self._owned = set(range(count))
+
+
+# ------------------------------------------------------------------------------
+class Registry(object):
+    """
+    The Registry holds the plugins of a factory along with an index of
+    identifier to version to plugin. The index is updated as plugins are
+    added and removed, meaning lookups never need to visit every plugin.
+
+    The registry also tracks the source of each plugin which was found by
+    searching a path - in the form of the path, the file and the stamp of
+    the file when it was scanned. This allows the plugins of a single path
+    or file to be removed or refreshed without affecting any others.
+
+    A file may be reached through more than one path - such as a parent and
+    child path both being searched, or through a symlink. The registry
+    records every path and file which refers to the same physical file,
+    with only the first (the owner) holding the plugins. When the owner is
+    forgotten its plugins are handed to the next path which refers to the
+    file, so they remain available until no path refers to it.
+
+    Where multiple plugins share an identifier and version the most recently
+    added plugin is indexed. If the registry is not versioned then the first
+    plugin added for an identifier is indexed, and all plugins are stored
+    under a version of None.
+
+    Plugins can also be indexed by the values of other attributes, allowing
+    the plugins with a given value to be found without visiting every
+    plugin. Where such a value is a list or tuple, the plugin is indexed
+    under each of the values within it.
+
+    Copying a registry is cheap, as the copy shares all its containers with
+    the original. A container is only copied the first time it is altered
+    after that, and only the containers along the way to the change are
+    copied - such as the shard of the mapping and the bucket of the
+    identifier being added to - with everything else remaining shared. The
+    list of plugins is shared in the same way, with each registry only
+    reading as far along it as the plugins it holds.
+    """
+
+    # -- The types of value which are indexed per element
+    _SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+    # -- The attributes holding the contents of the registry, which are
+    # -- shared between a registry and its copies
+    _CONTAINERS = (
+        '_plugins',
+        '_count',
+        'buckets',
+        'index',
+        'ordered',
+        'latest',
+        'sources',
+        'provenance',
+        '_physical',
+        'attributes',
+        '_entries',
+    )
+
+    # --------------------------------------------------------------------------
+    def __init__(self, versioned=False, indexed=None):
+        """
+        :param versioned: Whether plugins are differentiated by version
+        :type versioned: bool
+
+        :param indexed: The names of the attributes to index plugins by
+        :type indexed: list(str, ...)
+        """
+        self.versioned = versioned
+
+        # -- All plugins, in the order they were added. Copies of the
+        # -- registry append to the same list, so only the first _count
+        # -- plugins within it belong to this registry
+        self._plugins = list()
+        self._count = 0
+
+        # -- The (version, plugin) pairs for each identifier, in
+        # -- the order they were added
+        self.buckets = SharedMap()
+
+        # -- identifier -> {version: plugin}
+        self.index = SharedMap()
+
+        # -- identifier -> [version, ...] in ascending order, allowing
+        # -- versions to be looked up by bisection
+        self.ordered = SharedMap()
+
+        # -- identifier -> plugin with the highest version
+        self.latest = SharedMap()
+
+        # -- path -> {filepath: (stamp, [plugin, ...])}
+        self.sources = SharedMap()
+
+        # -- physical file -> [(path, filepath), ...] of everything
+        # -- which refers to it, the first being its owner
+        self.provenance = SharedMap()
+
+        # -- filepath -> the physical file it refers to
+        self._physical = SharedMap()
+
+        # -- attribute -> {value: [plugin, ...]}
+        self.attributes = dict(
+            (attribute, SharedMap())
+            for attribute in indexed or list()
+        )
+
+        # -- id(plugin) -> the (attribute, value) pairs the plugin was
+        # -- indexed under, for each time it was added
+        self._entries = SharedMap()
+
+        # -- The containers this registry can alter in place, each given
+        # -- as the attribute name followed by the keys leading to it.
+        # -- Any other container may be shared with another registry.
+        self._owned = set()
+
+    # --------------------------------------------------------------------------
+    def __len__(self):
+        return self._count
+
+    # --------------------------------------------------------------------------
+    @property
+    def plugins(self):
+        """
+        All the plugins within the registry, in the order they were added
+
+        :return: list
+        """
+        return self._plugins[:self._count]
+
+    # --------------------------------------------------------------------------
+    def copy(self):
+        """
+        Returns a copy of the registry which can be altered without
+        affecting this one. The plugins themselves are not copied, and
+        the containers of the registry are only copied once they are
+        altered by either registry.
+
+        :return: Registry
+        """
+        other = Registry.__new__(Registry)
+        other.versioned = self.versioned
+        other._owned = set()
+
+        for name in self._CONTAINERS:
+            setattr(other, name, getattr(self, name))
+
+        # -- Everything is now shared, so neither registry may alter
+        # -- any container in place - other than appending to the list
+        # -- of plugins, which the other registry does not read beyond
+        # -- its own plugins
+        self._owned = set()
+
+        return other
+
+    # --------------------------------------------------------------------------
+    def _writable(self, name, keys=(), factory=dict):
+        """
+        Returns the container reached by following the given keys from the
+        named attribute, ready to be altered in place. Any container on the
+        way which may be shared with another registry is copied first, and
+        a missing container is created. A SharedMap is copied by sharing
+        its shards, so only the shards which are altered are ever copied.
+
+        :param name: The attribute of the registry holding the container
+        :type name: str
+
+        :param keys: The keys leading to the container from the attribute
+        :type keys: list
+
+        :param factory: Creates the last container if it is missing. Any
+            other missing container is created as a SharedMap.
+
+        :return: list or dict
+        """
+        owned = (name,)
+
+        if owned not in self._owned:
+            setattr(self, name, _copy(getattr(self, name)))
+            self._owned.add(owned)
+
+        container = getattr(self, name)
+
+        for position, key in enumerate(keys):
+            owned += (key,)
+            value = container.get(key)
+
+            if value is None:
+                last = position == len(keys) - 1
+                value = factory() if last else SharedMap()
+                container[key] = value
+                self._owned.add(owned)
+
+            elif owned not in self._owned:
+                value = _copy(value)
+                container[key] = value
+                self._owned.add(owned)
+
+            container = value
+
+        return container
+
+    # --------------------------------------------------------------------------
+    def _discard(self, name, key):
+        """
+        Removes the given key from the named attribute if it is present
+
+        :param name: The attribute of the registry holding the key
+        :type name: str
+
+        :param key: The key to remove
+
+        :return: None
+        """
+        if key in getattr(self, name):
+            del self._writable(name)[key]
+
+    # --------------------------------------------------------------------------
+    def _index_bucket(self, identifier):
+        """
+        Rebuilds the index entries for the given identifier from its bucket
+
+        :param identifier: Identifier to rebuild
+        :type identifier: str
+
+        :return: None
+        """
+        bucket = self.buckets.get(identifier)
+
+        if not bucket:
+            for name in ('buckets', 'index', 'ordered', 'latest'):
+                self._discard(name, identifier)
+            return
+
+        versions = dict()
+
+        for version, plugin in bucket:
+            if self.versioned:
+                versions[version] = plugin
+
+            else:
+                versions.setdefault(None, plugin)
+
+        self._writable('index')[identifier] = versions
+
+        if not self.versioned:
+            self._writable('latest')[identifier] = versions[None]
+            return
+
+        ordered = sorted(versions.keys())
+
+        self._writable('ordered')[identifier] = ordered
+        self._writable('latest')[identifier] = versions[ordered[-1]]
+
+    # --------------------------------------------------------------------------
+    def _index_attributes(self, plugin, attributes):
+        """
+        Indexes the given plugin by the values of its indexed attributes
+
+        :param plugin: The plugin being added
+        :param attributes: Dictionary of attribute names to values
+
+        :return: None
+        """
+        entries = list()
+
+        for attribute, value in attributes.items():
+            if attribute not in self.attributes:
+                continue
+
+            if not isinstance(value, self._SEQUENCE_TYPES):
+                value = [value]
+
+            for item in value:
+
+                # -- Values which cannot be hashed cannot be indexed
+                try:
+                    self._writable(
+                        'attributes',
+                        [attribute, item],
+                        list,
+                    ).append(plugin)
+
+                except TypeError:
+                    continue
+
+                entries.append((attribute, item))
+
+        self._writable('_entries', [id(plugin)], list).append(entries)
+
+    # --------------------------------------------------------------------------
+    def _unindex_attributes(self, plugin):
+        """
+        Removes one occurrence of the given plugin from the attribute index
+
+        :param plugin: The plugin being removed
+
+        :return: None
+        """
+        if not self._entries.get(id(plugin)):
+            return
+
+        added = self._writable('_entries', [id(plugin)], list)
+
+        for attribute, item in added.pop():
+            plugins = self._writable('attributes', [attribute, item], list)
+
+            for index, candidate in enumerate(plugins):
+                if candidate is plugin:
+                    del plugins[index]
+                    break
+
+            if not plugins:
+                del self.attributes[attribute][item]
+
+        if not added:
+            del self._entries[id(plugin)]
+
+    # --------------------------------------------------------------------------
+    def add(self, plugin, identifier, version=None, attributes=None):
+        """
+        Adds a plugin to the registry
+
+        :param plugin: The plugin to add
+        :param identifier: The identifier of the plugin
+        :param version: The version of the plugin, if the registry is
+            versioned.
+        :param attributes: Dictionary of the values of the plugin's indexed
+            attributes. Any attribute which is not given is not indexed.
+
+        Note: A TypeError is raised if the version cannot be compared with
+        the versions already held for the identifier (such as a str where
+        the others are int). The registry is left unaltered when this is
+        the case.
+
+        :return: None
+        """
+        if not self.versioned:
+            version = None
+
+        # -- Ensure the version can be ordered amongst the others before
+        # -- anything is altered, so the plugin is either added entirely
+        # -- or not at all
+        elif version not in self.index.get(identifier, dict()):
+            bisect.bisect(self.ordered.get(identifier, list()), version)
+
+        # -- Another registry sharing the list may have appended its own
+        # -- plugins, in which case this registry takes its own copy
+        if len(self._plugins) != self._count:
+            self._plugins = self._plugins[:self._count]
+
+        self._plugins.append(plugin)
+        self._count += 1
+
+        self._index_attributes(plugin, attributes or dict())
+        self._writable('buckets', [identifier], list).append((version, plugin))
+
+        versions = self._writable('index', [identifier])
+
+        if not self.versioned:
+            if None not in versions:
+                versions[None] = plugin
+                self._writable('latest')[identifier] = plugin
+            return
+
+        ordered = self._writable('ordered', [identifier], list)
+
+        if version not in versions:
+            bisect.insort(ordered, version)
+
+        versions[version] = plugin
+
+        # -- Keep track of the highest version. Equal versions replace
+        # -- the latest as the most recently added plugin wins
+        if version == ordered[-1]:
+            self._writable('latest')[identifier] = plugin
+
+    # --------------------------------------------------------------------------
+    def remove(self, plugins):
+        """
+        Removes the given plugins from the registry. Each plugin given
+        removes one occurrence of that plugin, so a plugin which was added
+        twice will remain available if it is only removed once.
+
+        :param plugins: The plugins to remove
+        :type plugins: list
+
+        :return: List of the identifiers affected
+        """
+        counts = dict()
+
+        for plugin in plugins:
+            counts[id(plugin)] = counts.get(id(plugin), 0) + 1
+
+        if not counts:
+            return list()
+
+        for plugin in plugins:
+            self._unindex_attributes(plugin)
+
+        def keep(candidate):
+            count = counts.get(id(candidate))
+
+            if not count:
+                return True
+
+            counts[id(candidate)] = count - 1
+            return False
+
+        remaining = counts.copy()
+        self._plugins = [plugin for plugin in self.plugins if keep(plugin)]
+        self._count = len(self._plugins)
+
+        # -- Now apply the same removals to the buckets, rebuilding
+        # -- only the identifiers which were affected
+        counts = remaining
+        affected = list()
+
+        for identifier, bucket in list(self.buckets.items()):
+            if not any(id(plugin) in counts for _, plugin in bucket):
+                continue
+
+            filtered = [
+                (version, plugin)
+                for version, plugin in bucket
+                if keep(plugin)
+            ]
+
+            if len(filtered) == len(bucket):
+                continue
+
+            self._writable('buckets')[identifier] = filtered
+            self._index_bucket(identifier)
+            affected.append(identifier)
+
+        return affected
+
+    # --------------------------------------------------------------------------
+    def versions(self, identifier, constraint=None):
+        """
+        Returns the versions of the given identifier, in ascending order
+
+        :param identifier: The identifier of the plugin
+        :type identifier: str
+
+        :param constraint: If given, only the versions which satisfy the
+            constraint are returned
+        :type constraint: constraint.Constraint
+
+        :return: list
+        """
+        versions = self.ordered.get(identifier, list())
+
+        if constraint is None:
+            return list(versions)
+
+        return constraint.select(versions)
+
+    # --------------------------------------------------------------------------
+    def find(self, criteria):
+        """
+        Returns the plugins whose indexed attributes hold all the given
+        values, in the order they were added. Every version of a plugin
+        is considered.
+
+        :param criteria: Dictionary of indexed attribute names to the
+            value required of each.
+        :type criteria: dict
+
+        :return: list
+        """
+        if not criteria:
+            return list(self.plugins)
+
+        buckets = sorted(
+            [
+                self.attributes[attribute].get(value, list())
+                for attribute, value in criteria.items()
+            ],
+            key=len,
+        )
+
+        # -- Walk the smallest set of candidates, checking each against
+        # -- the others
+        others = [
+            set(id(plugin) for plugin in bucket)
+            for bucket in buckets[1:]
+        ]
+
+        found = list()
+        seen = set()
+
+        for plugin in buckets[0]:
+            if id(plugin) in seen:
+                continue
+
+            seen.add(id(plugin))
+
+            if all(id(plugin) in other for other in others):
+                found.append(plugin)
+
+        return found
+
+    # --------------------------------------------------------------------------
+    def record(self, path, filepath, stamp, plugins, canonical=None):
+        """
+        Records the plugins which were found within a file as part of
+        searching the given path.
+
+        :param path: The path which was being searched
+        :type path: str
+
+        :param filepath: Absolute path to the file the plugins came from
+        :type filepath: str
+
+        :param stamp: The (mtime, size) of the file when it was scanned
+        :type stamp: tuple
+
+        :param plugins: The plugins which were added from the file. This
+            should be empty if the plugins are shared from the owner of
+            the file.
+        :type plugins: list
+
+        :param canonical: The physical file the filepath refers to. If
+            not given, the filepath is taken to be the physical file.
+        :type canonical: str
+
+        :return: None
+        """
+        canonical = canonical or filepath
+
+        self._writable('sources', [path], SharedMap)[filepath] = (
+            stamp,
+            plugins,
+        )
+        self._writable('_physical')[filepath] = canonical
+
+        holders = self._writable('provenance', [canonical], list)
+
+        if (path, filepath) not in holders:
+            holders.append((path, filepath))
+
+    # --------------------------------------------------------------------------
+    def canonical(self, filepath):
+        """
+        Returns the physical file the given filepath was recorded as
+        referring to.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: str
+        """
+        return self._physical.get(filepath, filepath)
+
+    # --------------------------------------------------------------------------
+    def owner(self, canonical):
+        """
+        Returns the path and file which hold the plugins of the given
+        physical file, along with the stamp they were recorded with and
+        the plugins themselves.
+
+        :param canonical: The physical file
+        :type canonical: str
+
+        :return: tuple(path, filepath, stamp, plugins) or None if nothing
+            refers to the physical file
+        """
+        holders = self.provenance.get(canonical)
+
+        if not holders:
+            return None
+
+        path, filepath = holders[0]
+        stamp, plugins = self.sources[path][filepath]
+
+        return path, filepath, stamp, plugins
+
+    # --------------------------------------------------------------------------
+    def _release(self, path, filepath, stamp, plugins):
+        """
+        Removes the given path and file from the holders of its physical
+        file. If the file held plugins and another holder only shares them
+        then the plugins are handed to that holder.
+
+        :return: True if the plugins were handed on
+        """
+        canonical = self._physical.get(filepath, filepath)
+        holders = list()
+
+        if canonical in self.provenance:
+            holders = self._writable('provenance', [canonical], list)
+
+        if (path, filepath) in holders:
+            holders.remove((path, filepath))
+
+        if not holders:
+            self._discard('provenance', canonical)
+
+        if not any(held == filepath for _, held in holders):
+            self._discard('_physical', filepath)
+
+        if not plugins:
+            return False
+
+        for other_path, other_filepath in holders:
+            other_stamp, shared = self.sources[other_path][other_filepath]
+
+            # -- Only a holder recorded against the same version of the
+            # -- file can take on its plugins
+            if shared or other_stamp != stamp:
+                continue
+
+            # -- The new owner is moved to the front of the holders
+            holders.remove((other_path, other_filepath))
+            holders.insert(0, (other_path, other_filepath))
+
+            self._writable('sources', [other_path])[other_filepath] = (
+                other_stamp,
+                plugins,
+            )
+            return True
+
+        return False
+
+    # --------------------------------------------------------------------------
+    def forget(self, path, filepaths=None):
+        """
+        Removes all the plugins which were found in the given files as part
+        of searching the given path. If no files are given, all the plugins
+        found within the path are removed.
+
+        :param path: The path which was searched
+        :type path: str
+
+        :param filepaths: The files to forget
+        :type filepaths: list(str, ...)
+
+        :return: List of the plugins which were removed
+        """
+        if not self.sources.get(path):
+            self._discard('sources', path)
+            return list()
+
+        sources = self._writable('sources', [path])
+
+        if filepaths is None:
+            filepaths = list(sources.keys())
+
+        plugins = list()
+
+        for filepath in filepaths:
+            if filepath not in sources:
+                continue
+
+            stamp, file_plugins = sources.pop(filepath)
+
+            # -- Plugins still referred to by another path are kept
+            if self._release(path, filepath, stamp, file_plugins):
+                continue
+
+            plugins.extend(file_plugins)
+
+        if not sources:
+            self._discard('sources', path)
+
+        self.remove(plugins)
+        return plugins
+
+    # --------------------------------------------------------------------------
+    def is_sourced(self, filepath):
+        """
+        Returns True if any path holds plugins from the given file, or
+        from the physical file it refers to
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: bool
+        """
+        if self.provenance.get(self._physical.get(filepath, filepath)):
+            return True
+
+        return any(
+            filepath in sources
+            for sources in self.sources.values()
+        )
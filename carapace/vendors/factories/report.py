@@ -0,0 +1,553 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module holds the load report of a factory, which records how each
+file was dealt with during discovery and how long it took. This makes it
+possible to find the individual plugin files which are slow to load.
+
+It also holds the unload report, which describes what was freed when
+plugins were removed from a factory, and the runtime statistics of a
+factory.
+"""
+from .constants import log
+
+import gc
+import io
+import sys
+import csv
+import json
+import weakref
+import threading
+
+
+# ------------------------------------------------------------------------------
+class FileRecord(object):
+    """
+    Describes how a single file was scanned for plugins
+    """
+
+    # -- The fields which are exported, in the order they are exported
+    FIELDS = (
+        'filepath',
+        'path',
+        'method',
+        'mechanism',
+        'walk_time',
+        'import_time',
+        'inspect_time',
+        'total_time',
+        'plugins',
+        'failure',
+    )
+
+    # -- The ways in which the plugins of a file can be determined
+    IMPORTED = 'imported'
+    CACHED = 'cached'
+    DEFERRED = 'deferred'
+    ISOLATED = 'isolated'
+    SKIPPED = 'skipped'
+    SHARED = 'shared'
+
+    __slots__ = (
+        'filepath',
+        'path',
+        'method',
+        'mechanism',
+        'walk_time',
+        'import_time',
+        'inspect_time',
+        'plugins',
+        'failure',
+    )
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filepath, path=None):
+        """
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :param path: The path which was being searched when the file
+            was found
+        :type path: str
+        """
+        self.filepath = filepath
+        self.path = path
+
+        # -- How the plugins were determined, one of IMPORTED, CACHED,
+        # -- DEFERRED, ISOLATED, SKIPPED (for files known to fail) or
+        # -- SHARED (for files already scanned through another path),
+        # -- along with the name of the mechanism used
+        self.method = None
+        self.mechanism = None
+
+        # -- The time, in seconds, spent finding and stat'ing the file,
+        # -- executing it and then inspecting it for plugins
+        self.walk_time = 0.0
+        self.import_time = 0.0
+        self.inspect_time = 0.0
+
+        # -- The names of the plugins found, and a description of
+        # -- any failure
+        self.plugins = list()
+        self.failure = None
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[FileRecord - {} ({}s, {} plugins)]'.format(
+            self.filepath,
+            round(self.total_time, 4),
+            len(self.plugins),
+        )
+
+    # --------------------------------------------------------------------------
+    @property
+    def total_time(self):
+        """
+        The total time spent on this file
+
+        :return: float
+        """
+        return self.walk_time + self.import_time + self.inspect_time
+
+    # --------------------------------------------------------------------------
+    def as_dict(self):
+        """
+        Returns the record as a dictionary
+
+        :return: dict
+        """
+        return dict(
+            (field, getattr(self, field))
+            for field in self.FIELDS
+        )
+
+
+# ------------------------------------------------------------------------------
+class LoadReport(object):
+    """
+    Holds a FileRecord for every file a factory has scanned, along with the
+    time taken to walk each path. If a file is scanned again its record is
+    replaced.
+
+    .. code-block:: python
+
+        >>> from factories.examples.reader import DataReader
+        >>>
+        >>> reader = DataReader()
+        >>>
+        >>> for record in reader.factory.load_report().slowest(5):
+        ...     print(record.filepath, record.total_time)
+        >>>
+        >>> reader.factory.load_report().to_csv('/tmp/report.csv')
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self):
+
+        # -- filepath -> FileRecord
+        self.records = dict()
+
+        # -- path -> seconds spent walking the path
+        self.walks = dict()
+
+    # --------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.records)
+
+    # --------------------------------------------------------------------------
+    def __iter__(self):
+        return iter(list(self.records.values()))
+
+    # --------------------------------------------------------------------------
+    def add(self, record):
+        """
+        Adds the given record, replacing any previous record of the
+        same file.
+
+        :param record: The record to add
+        :type record: FileRecord
+
+        :return: None
+        """
+        self.records[record.filepath] = record
+
+    # --------------------------------------------------------------------------
+    def discard(self, filepath):
+        """
+        Removes the record of the given file, if there is one
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: None
+        """
+        self.records.pop(filepath, None)
+
+    # --------------------------------------------------------------------------
+    def get(self, filepath):
+        """
+        Returns the record of the given file
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: FileRecord or None
+        """
+        return self.records.get(filepath)
+
+    # --------------------------------------------------------------------------
+    def failures(self):
+        """
+        Returns the records of all the files which failed
+
+        :return: list(FileRecord, ...)
+        """
+        return [
+            record
+            for record in self
+            if record.failure
+        ]
+
+    # --------------------------------------------------------------------------
+    def slowest(self, count=10):
+        """
+        Returns the records of the slowest files, slowest first
+
+        :param count: The number of records to return
+        :type count: int
+
+        :return: list(FileRecord, ...)
+        """
+        return sorted(
+            self,
+            key=lambda record: record.total_time,
+            reverse=True,
+        )[:count]
+
+    # --------------------------------------------------------------------------
+    def total_time(self):
+        """
+        Returns the total time spent walking paths and scanning files
+
+        :return: float
+        """
+        return sum(self.walks.values()) + sum(
+            record.import_time + record.inspect_time
+            for record in self
+        )
+
+    # --------------------------------------------------------------------------
+    def as_dict(self):
+        """
+        Returns the report as a dictionary
+
+        :return: dict
+        """
+        return dict(
+            walks=self.walks.copy(),
+            files=[record.as_dict() for record in self],
+        )
+
+    # --------------------------------------------------------------------------
+    def to_json(self, filepath=None):
+        """
+        Returns the report as json, optionally writing it to a file
+
+        :param filepath: Optional path to write the json to
+        :type filepath: str
+
+        :return: str
+        """
+        data = json.dumps(
+            self.as_dict(),
+            indent=4,
+            sort_keys=True,
+            default=str,
+        )
+
+        if filepath:
+            with open(filepath, 'w') as f:
+                f.write(data)
+
+        return data
+
+    # --------------------------------------------------------------------------
+    def to_csv(self, filepath=None):
+        """
+        Returns the file records as csv, optionally writing them to a file.
+        The plugin names of each file are separated by a semicolon.
+
+        :param filepath: Optional path to write the csv to
+        :type filepath: str
+
+        :return: str
+        """
+        stream = io.StringIO()
+        writer = csv.writer(stream, lineterminator='\n')
+
+        writer.writerow(FileRecord.FIELDS)
+
+        for record in self:
+            row = record.as_dict()
+            row['plugins'] = ';'.join(str(name) for name in row['plugins'])
+
+            writer.writerow(
+                [
+                    '' if row[field] is None else row[field]
+                    for field in FileRecord.FIELDS
+                ],
+            )
+
+        data = stream.getvalue()
+
+        if filepath:
+            with open(filepath, 'w') as f:
+                f.write(data)
+
+        return data
+
+
+# ------------------------------------------------------------------------------
+class UnloadReport(object):
+    """
+    Describes what was freed when plugins were removed from a factory,
+    being the identifiers of the plugins removed along with the names of
+    the modules which were removed from sys.modules.
+
+    Modules which were imported by name (rather than loaded directly) are
+    never removed, as other code may rely on them, so plugins from them
+    are not expected to be freed.
+
+    .. code-block:: python
+
+        >>> from factories.examples.reader import DataReader
+        >>>
+        >>> reader = DataReader()
+        >>>
+        >>> unloaded = reader.factory.clear()
+        >>> print(unloaded.modules)
+        >>>
+        >>> # -- Anything still holding onto a plugin class or module
+        >>> # -- will stop it from being freed
+        >>> print(unloaded.leak_check())
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self):
+
+        # -- The identifiers of the plugins which were removed
+        self.plugins = list()
+
+        # -- The names of the modules removed from sys.modules, and the
+        # -- files they were loaded from
+        self.modules = list()
+        self.filepaths = list()
+
+        # -- (description, weakref) pairs of the plugin classes and
+        # -- modules which are expected to be freed
+        self._references = list()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[UnloadReport - {} plugins, {} modules]'.format(
+            len(self.plugins),
+            len(self.modules),
+        )
+
+    # --------------------------------------------------------------------------
+    def track(self, item, description=None):
+        """
+        Records the given item as one which is expected to be freed
+
+        :param item: Plugin class or module
+        :type item: object
+
+        :param description: How the item is described by leak_check. If
+            not given the repr of the item is used.
+        :type description: str
+
+        :return: None
+        """
+        try:
+            reference = weakref.ref(item)
+
+        except TypeError:
+            return
+
+        self._references.append((description or repr(item), reference))
+
+    # --------------------------------------------------------------------------
+    def leak_check(self):
+        """
+        Runs the garbage collector and returns the descriptions of any
+        plugin classes or modules which were unloaded but are still alive.
+        An empty list means everything unloaded was freed.
+
+        :return: list(str, ...)
+        """
+        gc.collect()
+
+        return [
+            description
+            for description, reference in self._references
+            if reference() is not None
+        ]
+
+    # --------------------------------------------------------------------------
+    def as_dict(self):
+        """
+        Returns the report as a dictionary
+
+        :return: dict
+        """
+        return dict(
+            plugins=list(self.plugins),
+            modules=list(self.modules),
+            filepaths=list(self.filepaths),
+        )
+
+
+# ------------------------------------------------------------------------------
+class Stats(object):
+    """
+    Holds the counters and cumulative timings of a factory over its
+    lifetime. This makes it possible to tell whether time is being spent
+    discovering plugins or looking them up.
+
+    A hook can be given which is called with the name of the counter (or
+    timing) and the amount it changed by each time it changes, allowing the
+    statistics to be pushed into an external metrics system.
+
+    .. code-block:: python
+
+        >>> from factories.examples.reader import DataReader
+        >>>
+        >>> reader = DataReader()
+        >>> reader.factory.request('JSONReader')
+        >>>
+        >>> print(reader.factory.stats()['hits'])
+        1
+    """
+
+    # -- The counters
+    REQUESTS = 'requests'
+    HITS = 'hits'
+    MISSES = 'misses'
+    UNKNOWN_IDENTIFIERS = 'unknown_identifiers'
+    VERSION_MISSES = 'version_misses'
+    FILES_SCANNED = 'files_scanned'
+    FILES_FAILED = 'files_failed'
+
+    # -- The cumulative timings, in seconds
+    DISCOVERY_TIME = 'discovery_time'
+    REQUEST_TIME = 'request_time'
+
+    COUNTERS = (
+        REQUESTS,
+        HITS,
+        MISSES,
+        UNKNOWN_IDENTIFIERS,
+        VERSION_MISSES,
+        FILES_SCANNED,
+        FILES_FAILED,
+    )
+
+    TIMINGS = (
+        DISCOVERY_TIME,
+        REQUEST_TIME,
+    )
+
+    # --------------------------------------------------------------------------
+    def __init__(self, hook=None):
+        """
+        :param hook: Optional callable which is given the name and the
+            change in value of each counter or timing as it changes
+        :type hook: callable
+        """
+        self.hook = hook
+
+        self._lock = threading.Lock()
+        self._values = dict()
+
+        self.reset()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[Stats - {} requests, {} files scanned]'.format(
+            self._values[self.REQUESTS],
+            self._values[self.FILES_SCANNED],
+        )
+
+    # --------------------------------------------------------------------------
+    def reset(self):
+        """
+        Sets all the counters and timings back to zero
+
+        :return: None
+        """
+        with self._lock:
+            for name in self.COUNTERS:
+                self._values[name] = 0
+
+            for name in self.TIMINGS:
+                self._values[name] = 0.0
+
+    # --------------------------------------------------------------------------
+    def increment(self, name, amount=1):
+        """
+        Adds the given amount to a counter or timing, passing the change
+        on to the hook if there is one.
+
+        :param name: The name of the counter or timing
+        :type name: str
+
+        :param amount: The amount to add
+        :type amount: int or float
+
+        :return: None
+        """
+        with self._lock:
+            self._values[name] += amount
+
+        if not self.hook:
+            return
+
+        # -- A failing hook must never affect the factory itself
+        # noinspection PyBroadException
+        try:
+            self.hook(name, amount)
+
+        except BaseException:
+            log.warning(
+                'Metrics hook failed for {} : {}'.format(
+                    name,
+                    sys.exc_info()[1],
+                ),
+            )
+
+    # --------------------------------------------------------------------------
+    def as_dict(self):
+        """
+        Returns the current value of each counter and timing
+
+        :return: dict
+        """
+        with self._lock:
+            return dict(self._values)
@@ -0,0 +1,198 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module determines the name a file can be imported by. Rather than
+attempting to import progressively longer names, the package structure
+around the file is examined and matched against the sys.path, and the
+resulting name is only imported once the import system confirms that it
+refers to the file.
+"""
+import os
+import sys
+import importlib
+
+try:
+    from importlib.util import find_spec
+
+except ImportError:
+    find_spec = None
+
+
+# -- The files which mark a directory as a package
+_PACKAGE_MARKERS = ('__init__.py', '__init__.pyc')
+
+
+# ------------------------------------------------------------------------------
+def _normalise(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+# ------------------------------------------------------------------------------
+class ModuleResolver(object):
+    """
+    Resolves the module names of files. The sys.path is read when the
+    resolver is created, and each directory is only examined once, so a
+    resolver should be created for each scan of a path.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self):
+
+        # -- The locations on the sys.path. An empty entry refers to
+        # -- the current working directory
+        self._sys_paths = set(
+            _normalise(path or os.getcwd())
+            for path in sys.path
+            if isinstance(path, str)
+        )
+
+        # -- directory -> (base, [package, ...]) where base is the first
+        # -- ancestor which is not a package
+        self._packages = dict()
+
+    # --------------------------------------------------------------------------
+    def _package_path(self, directory):
+        """
+        Returns the first ancestor of the given directory which is not a
+        package, along with the names of the packages from that ancestor
+        down to the directory.
+
+        :param directory: Absolute path to a directory
+        :type directory: str
+
+        :return: tuple(str, list(str, ...))
+        """
+        if directory in self._packages:
+            return self._packages[directory]
+
+        is_package = any(
+            os.path.isfile(os.path.join(directory, marker))
+            for marker in _PACKAGE_MARKERS
+        )
+
+        parent = os.path.dirname(directory)
+
+        if is_package and parent != directory:
+            base, parts = self._package_path(parent)
+            result = (base, parts + [os.path.basename(directory)])
+
+        else:
+            result = (directory, list())
+
+        self._packages[directory] = result
+        return result
+
+    # --------------------------------------------------------------------------
+    def candidates(self, filepath):
+        """
+        Returns the names the given file could be imported by, based on
+        the packages around it and the sys.path. The most qualified name
+        is given first.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: list(str, ...)
+        """
+        base, parts = self._package_path(os.path.dirname(filepath))
+
+        module = os.path.splitext(os.path.basename(filepath))[0]
+        module = [] if module == '__init__' else [module]
+
+        names = list()
+
+        for index in range(len(parts) + 1):
+            anchor = os.path.join(base, *parts[:index])
+
+            if _normalise(anchor) not in self._sys_paths:
+                continue
+
+            name = '.'.join(parts[index:] + module)
+
+            if name:
+                names.append(name)
+
+        return names
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def _is_file(cls, origin, filepath):
+        """
+        Returns True if the given module origin refers to the given file
+        """
+        if not origin:
+            return False
+
+        return _normalise(origin) == _normalise(filepath)
+
+    # --------------------------------------------------------------------------
+    def _origin(self, name):
+        """
+        Returns the file the import system would load for the given name,
+        without executing the module itself.
+        """
+        if name in sys.modules:
+            return getattr(sys.modules[name], '__file__', None)
+
+        if find_spec is None:
+            return None
+
+        # -- Finding the spec of a submodule imports its parent
+        # -- packages, but never the module itself
+        # noinspection PyBroadException
+        try:
+            spec = find_spec(name)
+
+        except BaseException:
+            return None
+
+        return spec.origin if spec else None
+
+    # --------------------------------------------------------------------------
+    def resolve(self, filepath):
+        """
+        Returns the name of the module for the given file, importing it if
+        it has not already been imported. If the file cannot be imported
+        then None is returned.
+
+        :param filepath: Absolute path to the file
+        :type filepath: str
+
+        :return: str or None
+        """
+        for name in self.candidates(filepath):
+
+            # -- Without find_spec we have no way to check the name
+            # -- other than to import it
+            if find_spec is not None and \
+                    not self._is_file(self._origin(name), filepath):
+                continue
+
+            # noinspection PyBroadException
+            try:
+                module = importlib.import_module(name)
+
+            except BaseException:
+                return None
+
+            if self._is_file(getattr(module, '__file__', None), filepath):
+                return name
+
+        return None
@@ -0,0 +1,445 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module performs static inspection of python source files. It is used
+by factories running in lazy mode to determine which files define plugins -
+and the identifiers and versions of those plugins - without executing them.
+"""
+import ast
+import inspect
+
+try:
+    import builtins
+
+except ImportError:
+    # noinspection PyUnresolvedReferences
+    import __builtin__ as builtins
+
+
+# -- Sentinels used when resolving attribute values. MISSING means the
+# -- class does not define the attribute, UNKNOWN means it does but we
+# -- cannot determine its value without executing the code
+MISSING = object()
+UNKNOWN = object()
+
+# -- Whether a class derives from the abstract. UNDETERMINED means a base
+# -- of the class (or of one of its bases) is defined outside the files
+# -- being inspected, such as in an installed library, so only importing
+# -- the file can tell
+PLUGIN = 'plugin'
+NOT_PLUGIN = 'not plugin'
+UNDETERMINED = 'undetermined'
+
+# -- The names of the builtin classes, which we know are not plugins
+_BUILTIN_CLASSES = frozenset(
+    name
+    for name, value in vars(builtins).items()
+    if inspect.isclass(value)
+)
+
+
+# ------------------------------------------------------------------------------
+class ClassDefinition(object):
+    """
+    Describes a class statement found at the top level of a module
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, name, bases, attributes):
+        """
+        :param name: Name of the class
+        :type name: str
+
+        :param bases: The names of the base classes. Any base which is not
+            a simple name or attribute lookup is represented as None.
+        :type bases: list(str, ...)
+
+        :param attributes: Dictionary of attributes defined in the class
+            body. Values which are not literals are represented by UNKNOWN
+        :type attributes: dict
+        """
+        self.name = name
+        self.bases = bases
+        self.attributes = attributes
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[ClassDefinition - {}({})]'.format(
+            self.name,
+            ', '.join(str(base) for base in self.bases),
+        )
+
+
+# ------------------------------------------------------------------------------
+def _base_name(node):
+    """
+    Returns the name which a base class expression refers to
+
+    :param node: ast node of the base expression
+
+    :return: str or None
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+
+    if isinstance(node, ast.Attribute):
+        return node.attr
+
+    return None
+
+
+# ------------------------------------------------------------------------------
+def _literal(node):
+    """
+    Returns the literal value of the given node, or UNKNOWN if the node
+    is not a literal.
+
+    :param node: ast node of the value
+
+    :return: value or UNKNOWN
+    """
+    # noinspection PyBroadException
+    try:
+        return ast.literal_eval(node)
+
+    except BaseException:
+        return UNKNOWN
+
+
+# ------------------------------------------------------------------------------
+def _class_definition(node):
+    """
+    Builds a ClassDefinition from the given class node
+
+    :param node: ast.ClassDef
+
+    :return: ClassDefinition
+    """
+    attributes = dict()
+
+    for statement in node.body:
+
+        # -- Simple assignments, such as: version = 2
+        if isinstance(statement, ast.Assign):
+            value = _literal(statement.value)
+
+            for target in statement.targets:
+                if isinstance(target, ast.Name):
+                    attributes[target.id] = value
+
+        # -- Annotated assignments, such as: version: int = 2
+        elif getattr(ast, 'AnnAssign', None) and \
+                isinstance(statement, ast.AnnAssign):
+            if isinstance(statement.target, ast.Name) and statement.value:
+                attributes[statement.target.id] = _literal(statement.value)
+
+        # -- Anything which is defined as a method we cannot evaluate
+        # -- without running it
+        elif isinstance(statement, (ast.FunctionDef, ast.ClassDef)) or (
+                getattr(ast, 'AsyncFunctionDef', None) and
+                isinstance(statement, ast.AsyncFunctionDef)):
+            attributes[statement.name] = UNKNOWN
+
+    return ClassDefinition(
+        name=node.name,
+        bases=[_base_name(base) for base in node.bases],
+        attributes=attributes,
+    )
+
+
+# ------------------------------------------------------------------------------
+def parse_source(source, filepath='<unknown>'):
+    """
+    Parses the given source code and returns the classes defined at the
+    top level of it.
+
+    :param source: Python source code
+    :type source: str or bytes
+
+    :param filepath: The path the source was read from, used for reporting
+    :type filepath: str
+
+    :return: list(ClassDefinition, ...) or None if the source cannot be parsed
+    """
+    # noinspection PyBroadException
+    try:
+        tree = ast.parse(source, filename=filepath)
+
+    except BaseException:
+        return None
+
+    return [
+        _class_definition(node)
+        for node in tree.body
+        if isinstance(node, ast.ClassDef)
+    ]
+
+
+# ------------------------------------------------------------------------------
+def parse_file(filepath):
+    """
+    Reads and parses the given python file, returning the classes defined
+    at the top level of it.
+
+    :param filepath: Absolute path to a .py file
+    :type filepath: str
+
+    :return: list(ClassDefinition, ...) or None if the file cannot be parsed
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            source = f.read()
+
+    except (OSError, IOError):
+        return None
+
+    return parse_source(source, filepath)
+
+
+# ------------------------------------------------------------------------------
+def _resolve(definition, attribute, scope, abstract, visited):
+    """
+    Resolves the value of an attribute for the given class definition,
+    following its bases in the same order python would.
+
+    :param definition: The class definition to resolve the attribute for
+    :type definition: ClassDefinition
+
+    :param attribute: Name of the attribute to resolve
+    :type attribute: str
+
+    :param scope: Function which takes the definition and the name of a
+        base and returns the definition of that base (or None)
+    :type scope: callable
+
+    :param abstract: The abstract class plugins inherit from
+    :type abstract: class
+
+    :param visited: Definitions which have already been visited
+    :type visited: set
+
+    :return: value, MISSING or UNKNOWN
+    """
+    if attribute == '__name__':
+        return definition.name
+
+    # -- Guard against cyclic (or self referencing) inheritance
+    if id(definition) in visited:
+        return UNKNOWN
+
+    visited = visited | {id(definition)}
+
+    if attribute in definition.attributes:
+        return definition.attributes[attribute]
+
+    for base in definition.bases:
+
+        base_definition = scope(definition, base)
+
+        if base_definition is not None:
+            value = _resolve(
+                base_definition,
+                attribute,
+                scope,
+                abstract,
+                visited,
+            )
+
+        elif base == abstract.__name__:
+            value = getattr(abstract, attribute, MISSING)
+
+            # -- If the abstract implements this as a method we
+            # -- cannot know what the subclass would return
+            if inspect.ismethod(value) or inspect.isfunction(value):
+                return UNKNOWN
+
+        else:
+            return UNKNOWN
+
+        if value is not MISSING:
+            return value
+
+    return MISSING
+
+
+# ------------------------------------------------------------------------------
+def find_plugins(parsed, abstract, attributes):
+    """
+    Given the parse results of a set of files this will determine which
+    classes implement the abstract, and the values of the requested
+    attributes for each.
+
+    Classes are matched by the names of their bases, and inheritance is
+    followed across all the given files, so a class which inherits from
+    a plugin defined in another file is also considered a plugin. A class
+    with a base which is not defined in any of the given files - such as
+    one imported from a library - may still derive from the abstract, so
+    the plugins of its file are reported as undetermined.
+
+    :param parsed: Dictionary of filepaths to the result of parse_file
+    :type parsed: dict
+
+    :param abstract: The abstract class plugins must inherit from
+    :type abstract: class
+
+    :param attributes: The names of the attributes to determine
+    :type attributes: list(str, ...)
+
+    :return: Dictionary of filepaths to a list of (class name, attributes)
+        for the plugins defined within that file. If the plugins in a file
+        cannot be fully determined statically the value will be None, and
+        the file should be imported. Files which define no plugins are not
+        included.
+    """
+    # -- Classes of the same name may be defined in several files, so
+    # -- each definition is keyed by the file and name which define it
+    definitions = dict()
+    named = dict()
+    file_classes = dict()
+
+    for filepath, classes in parsed.items():
+        if not classes:
+            continue
+
+        file_classes[filepath] = classes
+
+        for definition in classes:
+            definitions[(filepath, definition.name)] = definition
+            named.setdefault(definition.name, list()).append(definition)
+
+    owners = dict(
+        (id(definition), filepath)
+        for filepath, classes in file_classes.items()
+        for definition in classes
+    )
+
+    # -- Bases are resolved against the file which defines the class
+    # -- first, and then against every other file. Where several other
+    # -- files define a class of that name we cannot know which is meant
+    def scope(definition, name):
+        local = definitions.get((owners[id(definition)], name))
+
+        # -- A class cannot be its own base, so a base of the same name
+        # -- must come from elsewhere
+        if local is not None and local is not definition:
+            return local
+
+        candidates = [
+            candidate
+            for candidate in named.get(name, list())
+            if candidate is not definition
+        ]
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        return None
+
+    statuses = dict()
+
+    def status(definition, visiting):
+        key = id(definition)
+
+        if key in statuses:
+            return statuses[key]
+
+        # -- Cyclic inheritance cannot be understood statically
+        if key in visiting:
+            return UNDETERMINED
+
+        visiting = visiting | {key}
+        result = NOT_PLUGIN
+
+        if definition.name == abstract.__name__:
+            statuses[key] = result
+            return result
+
+        for base in definition.bases:
+            if base == abstract.__name__:
+                result = PLUGIN
+                break
+
+            base_definition = scope(definition, base)
+
+            if base_definition is not None:
+                base_status = status(base_definition, visiting)
+
+            elif base in _BUILTIN_CLASSES:
+                base_status = NOT_PLUGIN
+
+            else:
+                base_status = UNDETERMINED
+
+            if base_status == PLUGIN:
+                result = PLUGIN
+                break
+
+            if base_status == UNDETERMINED:
+                result = UNDETERMINED
+
+        statuses[key] = result
+        return result
+
+    results = dict()
+
+    for filepath, classes in file_classes.items():
+        plugins = list()
+
+        for definition in classes:
+            definition_status = status(definition, frozenset())
+
+            # -- A class we cannot place may be a plugin, so the file
+            # -- must be imported to find out
+            if definition_status == UNDETERMINED:
+                plugins = None
+                break
+
+            if definition_status == NOT_PLUGIN:
+                continue
+
+            values = dict()
+
+            for attribute in attributes:
+                value = _resolve(
+                    definition,
+                    attribute,
+                    scope,
+                    abstract,
+                    set(),
+                )
+
+                if value is MISSING or value is UNKNOWN:
+                    values = None
+                    break
+
+                values[attribute] = value
+
+            # -- If any plugin in the file cannot be determined we
+            # -- cannot trust any of it, so the file must be imported
+            if values is None:
+                plugins = None
+                break
+
+            plugins.append((definition.name, values))
+
+        if plugins is None or plugins:
+            results[filepath] = plugins
+
+    return results
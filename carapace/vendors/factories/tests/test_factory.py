@@ -1,14 +1,184 @@
 from factories.examples.zoo import Zoo
 from factories.examples.reader import DataReader
+from factories.examples.reader import ReaderPlugin
 
 import os
 import sys
+import time
+import json
+import shutil
+import pickle
+import zipfile
+import tempfile
+import threading
 import factories
+import factories.factory
+import factories.manifest
+import factories.prefetch
+import factories.watcher
 import factories.examples.zoo
 
 import unittest
 
 
+# ------------------------------------------------------------------------------
+# -- This is the content of the plugin files which are written out to disk
+# -- during tests. Each import of the file is recorded in a log file next to
+# -- it so we can test whether the file was imported.
+_TEMP_PLUGIN = '''
+from factories.examples.zoo import Animal
+
+with open(__file__ + '.log', 'a') as f:
+    f.write('imported\\n')
+
+
+class {name}(Animal):
+    species = '{species}'
+'''
+
+
+# ------------------------------------------------------------------------------
+def _write_plugin(directory, filename, name, species):
+    filepath = os.path.join(directory, filename)
+
+    with open(filepath, 'w') as f:
+        f.write(_TEMP_PLUGIN.format(name=name, species=species))
+
+    return filepath
+
+
+# ------------------------------------------------------------------------------
+def _write_archive(filepath, plugins):
+    """
+    Writes a zip archive holding a package with a module for each of
+    the given (name, species) pairs.
+    """
+    with zipfile.ZipFile(filepath, 'w') as bundle:
+        bundle.writestr('zipped_animals/__init__.py', '')
+
+        for name, species in plugins:
+            bundle.writestr(
+                'zipped_animals/{}.py'.format(name.lower()),
+                (
+                    'from factories.examples.zoo import Animal\n\n\n'
+                    'class {}(Animal):\n'
+                    '    species = \'{}\'\n'
+                ).format(name, species),
+            )
+
+    return filepath
+
+
+# ------------------------------------------------------------------------------
+def _import_count(filepath):
+    if not os.path.exists(filepath + '.log'):
+        return 0
+
+    with open(filepath + '.log', 'r') as f:
+        return len(f.readlines())
+
+
+# ------------------------------------------------------------------------------
+# -- How long, in seconds, a test waits on something happening in the
+# -- background before failing. This is deliberately generous, as tests
+# -- only wait this long when they are going to fail.
+_TIMEOUT = 30.0
+
+
+# ------------------------------------------------------------------------------
+def _wait_for(condition, timeout=_TIMEOUT):
+    """
+    Waits for the given callable to return True, returning whether it did
+    so within the timeout.
+    """
+    end = time.time() + timeout
+
+    while time.time() < end:
+        if condition():
+            return True
+
+        time.sleep(0.05)
+
+    return False
+
+
+# ------------------------------------------------------------------------------
+def _finishes(function, timeout=_TIMEOUT):
+    """
+    Calls the given function on a separate thread, returning whether it
+    finished within the timeout. This allows a test to ensure a call does
+    not block without asserting how long the call takes.
+    """
+    errors = list()
+
+    def run():
+        try:
+            function()
+
+        except BaseException:
+            errors.append(sys.exc_info()[1])
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+
+    if errors:
+        raise errors[0]
+
+    return not thread.is_alive()
+
+
+# ------------------------------------------------------------------------------
+def _touch(filepath, offset=10):
+    """
+    Moves the modification time of a file forward, ensuring it is seen as
+    changed even on file systems with a coarse mtime resolution.
+    """
+    stat = os.stat(filepath)
+    os.utime(filepath, (stat.st_atime, stat.st_mtime + offset))
+
+
+# ------------------------------------------------------------------------------
+class PluginDirectoryTestCase(unittest.TestCase):
+    """
+    Base for the tests which write plugins into a temporary directory and
+    build factories over it. The directory is available as self.directory
+    and is removed once the test has run.
+    """
+
+    # -- Keyword arguments given to every factory built through _factory,
+    # -- which are overridden by those given in the call itself
+    factory_kwargs = dict()
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        self.directory = self._mkdtemp()
+
+    # --------------------------------------------------------------------------
+    def _mkdtemp(self):
+        """
+        Creates a temporary directory which is removed once the test
+        has run.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        return directory
+
+    # --------------------------------------------------------------------------
+    def _factory(self, **kwargs):
+        options = dict(
+            abstract=factories.examples.zoo.Animal,
+            plugin_identifier='species',
+            paths=[self.directory],
+            mechanism=factories.Factory.LOAD_SOURCE,
+        )
+        options.update(self.factory_kwargs)
+        options.update(kwargs)
+
+        return factories.Factory(**options)
+
+
 # ------------------------------------------------------------------------------
 class FactoryTests(unittest.TestCase):
     """
@@ -583,6 +753,3323 @@ class FactoryTests(unittest.TestCase):
             'rabbits!',
         )
 
+
+# ------------------------------------------------------------------------------
+class IndexTests(unittest.TestCase):
+    """
+    Tests the identifier and version index held by the factory
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        self.factory = factories.Factory(
+            abstract=ReaderPlugin,
+            versioning_identifier='version',
+        )
+
+        # -- Register versions out of order to ensure the latest is
+        # -- always tracked
+        for version in [1, 3, 2]:
+            self.factory.register(
+                type('YAMLReader', (ReaderPlugin,), dict(version=version)),
+            )
+
+    # --------------------------------------------------------------------------
+    def test_latest_version_is_indexed(self):
+        """
+        Ensures the highest version is returned regardless of the order
+        plugins were registered in
+
+        :return:
+        """
+        self.assertEqual(
+            self.factory.request('YAMLReader').version,
+            3,
+        )
+
+        self.assertEqual(
+            self.factory.request('YAMLReader', version=2).version,
+            2,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_versions_and_plugins_from_index(self):
+        """
+        Ensures versions and plugins are drawn correctly from the index
+
+        :return:
+        """
+        self.assertEqual(
+            self.factory.versions('YAMLReader'),
+            [1, 2, 3],
+        )
+
+        self.assertEqual(
+            [plugin.version for plugin in self.factory.plugins()],
+            [3],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_registration_result(self):
+        """
+        Ensures register reports whether the plugin was accepted
+
+        :return:
+        """
+        self.assertTrue(
+            self.factory.register(
+                type('TOMLReader', (ReaderPlugin,), dict()),
+            ),
+        )
+
+        self.assertFalse(
+            self.factory.register(object),
+        )
+
+        self.assertIn(
+            'TOMLReader',
+            self.factory.identifiers(),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_incomparable_version(self):
+        """
+        Ensures a plugin whose version cannot be compared with the other
+        versions of its identifier is rejected without being partially
+        stored
+
+        :return:
+        """
+        self.assertFalse(
+            self.factory.register(
+                type('YAMLReader', (ReaderPlugin,), dict(version='four')),
+            ),
+        )
+
+        self.assertEqual(
+            self.factory.versions('YAMLReader'),
+            [1, 2, 3],
+        )
+
+        self.assertEqual(
+            len(self.factory._registry.plugins),
+            3,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_incomparable_version_from_path(self):
+        """
+        Ensures a file holding a plugin with an incomparable version does
+        not leave anything behind once its path is removed
+
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+
+        for filename, version in [('a.py', '1'), ('b.py', '\'two\'')]:
+            with open(os.path.join(directory, filename), 'w') as f:
+                f.write(
+                    'from factories.examples.reader import ReaderPlugin\n\n\n'
+                    'class INIReader(ReaderPlugin):\n'
+                    '    version = {}\n'.format(version)
+                )
+
+        factory = factories.Factory(
+            abstract=ReaderPlugin,
+            versioning_identifier='version',
+            paths=[directory],
+            mechanism=factories.Factory.LOAD_SOURCE,
+        )
+
+        self.assertEqual(factory.versions('INIReader'), [1])
+
+        factory.remove_path(directory)
+
+        self.assertEqual(factory.identifiers(), set())
+        self.assertEqual(len(factory._registry.plugins), 0)
+
+
+# ------------------------------------------------------------------------------
+class DiscoveryCacheTests(PluginDirectoryTestCase):
+    """
+    Tests the persistent discovery cache
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(DiscoveryCacheTests, self).setUp()
+        self.plugin_directory = os.path.join(self.directory, 'plugins')
+        self.cache_path = os.path.join(self.directory, 'cache.json')
+
+        os.makedirs(self.plugin_directory)
+
+        self.filepath = _write_plugin(
+            self.plugin_directory,
+            'cached_animals.py',
+            'Lemur',
+            'lemur',
+        )
+
+    # --------------------------------------------------------------------------
+    def _factory(self):
+        return super(DiscoveryCacheTests, self)._factory(
+            paths=[self.plugin_directory],
+            cache_path=self.cache_path,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_cache_is_written(self):
+        """
+        Ensures that a cold scan writes the cache file
+
+        :return:
+        """
+        self._factory()
+
+        self.assertTrue(
+            os.path.exists(self.cache_path),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_warm_start_does_not_import(self):
+        """
+        Ensures that unchanged files are not imported when the cache is warm,
+        and are only imported when the plugin is requested.
+
+        :return:
+        """
+        self._factory()
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+        factory = self._factory()
+
+        self.assertIn(
+            'lemur',
+            factory.identifiers(),
+        )
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+        plugin = factory.request('lemur')
+
+        self.assertEqual(
+            plugin.__name__,
+            'Lemur',
+        )
+
+        self.assertTrue(
+            issubclass(plugin, factories.examples.zoo.Animal),
+        )
+
+        # -- The file has not changed, so the module which was loaded
+        # -- by the first factory is shared rather than executed again
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_cache_invalidates_on_change(self):
+        """
+        Ensures that a file which changes after being cached is inspected
+        again.
+
+        :return:
+        """
+        self._factory()
+
+        _write_plugin(
+            self.plugin_directory,
+            'cached_animals.py',
+            'RingTailedLemur',
+            'ring tailed lemur',
+        )
+
+        # -- Ensure the mtime differs even on coarse filesystems
+        _touch(self.filepath)
+
+        factory = self._factory()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'ring tailed lemur'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_cache_forgets_deleted_files(self):
+        """
+        Ensures that files removed since the cache was written are no longer
+        reported.
+
+        :return:
+        """
+        self._factory()
+
+        os.remove(self.filepath)
+
+        factory = self._factory()
+
+        self.assertEqual(
+            len(factory.identifiers()),
+            0,
+        )
+
+    # --------------------------------------------------------------------------
+    def _new_session(self):
+        """
+        Forgets the modules loaded from the plugin directory, as a new
+        session would not hold them
+
+        :return:
+        """
+        loaded = factories.factory._loaded_modules
+
+        for filepath in list(loaded):
+            if filepath.startswith(self.plugin_directory):
+                sys.modules.pop(loaded.pop(filepath), None)
+
+        sys.modules.pop('cached_bases', None)
+
+    # --------------------------------------------------------------------------
+    def _write_indri(self, base=None):
+        """
+        Writes a plugin which derives from a class within another file,
+        along with that other file if a base for the class is given.
+
+        :return:
+        """
+        # -- Each factory is treated as a fresh session, so the module
+        # -- holding the base is imported again by each
+        sys.path.insert(0, self.plugin_directory)
+        self.addCleanup(sys.path.remove, self.plugin_directory)
+        self.addCleanup(sys.modules.pop, 'cached_bases', None)
+
+        sys.modules.pop('cached_bases', None)
+
+        with open(os.path.join(self.plugin_directory, 'indri.py'), 'w') as f:
+            f.write(
+                'from cached_bases import Primate\n\n\n'
+                'class Indri(Primate):\n'
+                '    species = \'indri\'\n'
+            )
+
+        if base:
+            self._write_base(base)
+
+    # --------------------------------------------------------------------------
+    def _write_base(self, base):
+        filepath = os.path.join(self.plugin_directory, 'cached_bases.py')
+        existed = os.path.exists(filepath)
+
+        with open(filepath, 'w') as f:
+            f.write(
+                'from factories.examples.zoo import Animal\n\n\n'
+                'class Primate({}):\n'
+                '    pass\n'.format(base)
+            )
+
+        if existed:
+            _touch(filepath)
+
+        self._new_session()
+
+    # --------------------------------------------------------------------------
+    def test_cache_invalidates_on_base_change(self):
+        """
+        Ensures that a file whose base class changes within another file
+        is inspected again, even though the file itself has not changed
+
+        :return:
+        """
+        self._write_indri(base='object')
+
+        self.assertNotIn('indri', self._factory().identifiers())
+
+        self._write_base('Animal')
+
+        self.assertIn('indri', self._factory().identifiers())
+
+    # --------------------------------------------------------------------------
+    def test_cache_invalidates_on_added_file(self):
+        """
+        Ensures that a file which failed to load is inspected again once a
+        file it relies upon is added
+
+        :return:
+        """
+        self._write_indri()
+
+        self.assertNotIn('indri', self._factory().identifiers())
+
+        self._write_base('Animal')
+
+        # -- Ensure the directory is seen to change on coarse filesystems
+        _touch(self.plugin_directory)
+
+        self.assertIn('indri', self._factory().identifiers())
+
+    # --------------------------------------------------------------------------
+    def test_change_only_imports_changed_file(self):
+        """
+        Ensures that when one file changes only that file is imported
+        again, rather than every file which was cached alongside it
+
+        :return:
+        """
+        filepaths = [self.filepath] + [
+            _write_plugin(
+                self.plugin_directory,
+                'cached_{}.py'.format(name.lower()),
+                name,
+                name.lower(),
+            )
+            for name in ['AyeAye', 'Tarsier']
+        ]
+
+        self._factory()
+
+        _touch(filepaths[1])
+        self._new_session()
+
+        factory = self._factory()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'lemur', 'ayeaye', 'tarsier'},
+        )
+
+        self.assertEqual(
+            [_import_count(filepath) for filepath in filepaths],
+            [1, 2, 1],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_cache_is_trusted_when_unchanged(self):
+        """
+        Ensures that recording the files the cache was learned from does
+        not stop an unchanged tree from being read from the cache
+
+        :return:
+        """
+        self._write_indri(base='Animal')
+
+        self._factory()
+        factory = self._factory()
+
+        self.assertIn('indri', factory.identifiers())
+        self.assertEqual(_import_count(self.filepath), 1)
+
+
+# ------------------------------------------------------------------------------
+class LazyDiscoveryTests(PluginDirectoryTestCase):
+    """
+    Tests the static inspection of plugins when a factory is lazy
+    """
+
+    factory_kwargs = dict(lazy=True)
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(LazyDiscoveryTests, self).setUp()
+
+        self.filepath = _write_plugin(
+            self.directory,
+            'lazy_animals.py',
+            'Sloth',
+            'sloth',
+        )
+
+    # --------------------------------------------------------------------------
+    def test_plugins_are_imported_on_request(self):
+        """
+        Ensures a lazy factory knows about plugins without importing them,
+        and only imports them when they are requested.
+
+        :return:
+        """
+        factory = self._factory()
+
+        self.assertIn(
+            'sloth',
+            factory.identifiers(),
+        )
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            0,
+        )
+
+        self.assertEqual(
+            factory.request('sloth').__name__,
+            'Sloth',
+        )
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_plugins_are_imported(self):
+        """
+        Ensures that listing the plugins of a lazy factory imports them,
+        as the plugins are given as classes
+
+        :return:
+        """
+        factory = self._factory()
+
+        self.assertEqual(
+            [plugin.__name__ for plugin in factory.plugins()],
+            ['Sloth'],
+        )
+
+        self.assertTrue(
+            issubclass(factory.plugins()[0], factories.examples.zoo.Animal),
+        )
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_plugins_without_resolving(self):
+        """
+        Ensures the plugins of a lazy factory can be listed without
+        importing them
+
+        :return:
+        """
+        factory = self._factory()
+
+        plugins = factory.plugins(resolve=False)
+
+        self.assertEqual(len(plugins), 1)
+        self.assertIsInstance(plugins[0], factories.PluginProxy)
+        self.assertEqual(plugins[0].species, 'sloth')
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            0,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_files_without_plugins_are_not_imported(self):
+        """
+        Ensures that files which do not define any plugins are never
+        imported by a lazy factory.
+
+        :return:
+        """
+        filepath = os.path.join(self.directory, 'not_a_plugin.py')
+
+        with open(filepath, 'w') as f:
+            f.write('raise Exception(\'This should never be imported\')\n')
+
+        factory = self._factory()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'sloth'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_library_bases_are_imported(self):
+        """
+        Ensures that a plugin whose base is imported from outside the
+        searched path is found, by importing its file
+
+        :return:
+        """
+        with open(os.path.join(self.directory, 'hybrids.py'), 'w') as f:
+            f.write(
+                'from factories.examples.zoo.animals.carnivores '
+                'import Tiger\n\n\n'
+                'class Tigon(Tiger):\n'
+                '    species = \'tigon\'\n'
+            )
+
+        factory = self._factory()
+
+        self.assertIn('tigon', factory.identifiers())
+        self.assertEqual(factory.request('tigon').__name__, 'Tigon')
+
+    # --------------------------------------------------------------------------
+    def test_classes_sharing_a_name(self):
+        """
+        Ensures that classes of the same name in different files are
+        not mistaken for one another
+
+        :return:
+        """
+        import factories.scanner
+
+        parsed = dict(
+            one=factories.scanner.parse_source(
+                'class Helper(object):\n'
+                '    pass\n\n\n'
+                'class Koala(Helper):\n'
+                '    species = \'koala\'\n'
+            ),
+            two=factories.scanner.parse_source(
+                'class Helper(Animal):\n'
+                '    species = \'helper\'\n'
+            ),
+        )
+
+        self.assertEqual(
+            factories.scanner.find_plugins(
+                parsed,
+                factories.examples.zoo.Animal,
+                ['species'],
+            ),
+            dict(two=[('Helper', dict(species='helper'))]),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_lazy_matches_eager_discovery(self):
+        """
+        Ensures that lazy discovery finds the same plugins and versions as
+        importing does - including plugins whose versions are methods and
+        therefore must be imported.
+
+        :return:
+        """
+        test_plugins = os.path.join(
+            os.path.dirname(__file__),
+            'test_plugins',
+        )
+
+        eager = DataReader()
+        eager.factory.add_path(test_plugins)
+
+        lazy = DataReader()
+        lazy.factory.add_path(test_plugins, lazy=True)
+
+        self.assertEqual(
+            eager.factory.identifiers(),
+            lazy.factory.identifiers(),
+        )
+
+        self.assertEqual(
+            lazy.factory.versions('JSONReader'),
+            [1, 2],
+        )
+
+        self.assertEqual(
+            lazy.factory.request('JSONReader').version,
+            2,
+        )
+
+        self.assertIsNotNone(
+            lazy.factory.request('MethodVersionReader', version=1),
+        )
+
+
+# ------------------------------------------------------------------------------
+class WorkerTests(unittest.TestCase):
+    """
+    Tests the prefetching of files over a pool of threads
+    """
+
+    # --------------------------------------------------------------------------
+    def test_workers_match_serial_discovery(self):
+        """
+        Ensures that using workers results in the same plugins being
+        registered in the same order.
+
+        :return:
+        """
+        test_plugins = os.path.join(
+            os.path.dirname(__file__),
+            'test_plugins',
+        )
+
+        serial = DataReader()
+        serial.factory.add_path(test_plugins)
+
+        threaded = DataReader()
+        threaded.factory.add_path(test_plugins, workers=4)
+
+        self.assertEqual(
+            [plugin.__name__ for plugin in serial.factory.plugins()],
+            [plugin.__name__ for plugin in threaded.factory.plugins()],
+        )
+
+        self.assertEqual(
+            threaded.factory.versions('JSONReader'),
+            [1, 2],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_workers_with_direct_loading(self):
+        """
+        Ensures files which are compiled ahead of time are executed
+        correctly when loaded directly.
+
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+
+        try:
+            for index in range(10):
+                _write_plugin(
+                    directory,
+                    'animal_{}.py'.format(index),
+                    'Animal{}'.format(index),
+                    'animal {}'.format(index),
+                )
+
+            factory = factories.Factory(
+                abstract=factories.examples.zoo.Animal,
+                plugin_identifier='species',
+                paths=[directory],
+                mechanism=factories.Factory.LOAD_SOURCE,
+                workers=4,
+            )
+
+            self.assertEqual(
+                len(factory.identifiers()),
+                10,
+            )
+
+            self.assertEqual(
+                factory.request('animal 3').__name__,
+                'Animal3',
+            )
+
+        finally:
+            shutil.rmtree(directory)
+
+    # --------------------------------------------------------------------------
+    def _count_compiles(self):
+        """
+        Counts the files compiled ahead of time until the test ends
+
+        :return:
+        """
+        compiled = list()
+        compile_file = factories.prefetch._compile
+
+        def counted(filepath, data):
+            compiled.append(filepath)
+            return compile_file(filepath, data)
+
+        factories.prefetch._compile = counted
+        self.addCleanup(setattr, factories.prefetch, '_compile', compile_file)
+
+        return compiled
+
+    # --------------------------------------------------------------------------
+    def test_workers_only_compile_for_direct_loading(self):
+        """
+        Ensures files are only compiled ahead of time when they are going
+        to be loaded directly, as importing discards the code.
+
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+
+        try:
+            for index in range(10):
+                _write_plugin(
+                    directory,
+                    'animal_{}.py'.format(index),
+                    'Animal{}'.format(index),
+                    'animal {}'.format(index),
+                )
+
+            compiled = self._count_compiles()
+
+            for mechanism in [factories.Factory.GUESS,
+                              factories.Factory.IMPORTABLE]:
+                factories.Factory(
+                    abstract=factories.examples.zoo.Animal,
+                    plugin_identifier='species',
+                    paths=[directory],
+                    mechanism=mechanism,
+                    workers=4,
+                )
+
+            self.assertEqual(len(compiled), 0)
+
+            factories.Factory(
+                abstract=factories.examples.zoo.Animal,
+                plugin_identifier='species',
+                paths=[directory],
+                mechanism=factories.Factory.LOAD_SOURCE,
+                workers=4,
+            )
+
+            self.assertEqual(len(compiled), 10)
+
+        finally:
+            shutil.rmtree(directory)
+
+    # --------------------------------------------------------------------------
+    def test_prefetching_is_handed_over(self):
+        """
+        Ensures that files are only prefetched a little ahead of the file
+        being handed over, rather than all being held at once.
+
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+
+        try:
+            filepaths = [
+                _write_plugin(
+                    directory,
+                    'animal_{}.py'.format(index),
+                    'Animal{}'.format(index),
+                    'animal {}'.format(index),
+                )
+                for index in range(50)
+            ]
+
+            compiled = self._count_compiles()
+
+            fetching = factories.prefetch.iter_prefetch(filepaths, workers=2)
+            first = next(fetching)
+
+            self.assertEqual(first.filepath, filepaths[0])
+            self.assertIsNotNone(first.code)
+            self.assertLessEqual(
+                len(compiled),
+                2 * factories.prefetch._AHEAD + 2,
+            )
+
+            self.assertEqual(
+                [result.filepath for result in fetching],
+                filepaths[1:],
+            )
+
+        finally:
+            shutil.rmtree(directory)
+
+
+# ------------------------------------------------------------------------------
+class IncrementalTests(PluginDirectoryTestCase):
+    """
+    Tests the incremental reloading and removal of paths
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(IncrementalTests, self).setUp()
+
+        self.path_a = os.path.join(self.directory, 'a')
+        self.path_b = os.path.join(self.directory, 'b')
+
+        os.makedirs(self.path_a)
+        os.makedirs(self.path_b)
+
+        self.panda = _write_plugin(self.path_a, 'panda.py', 'Panda', 'panda')
+        self.okapi = _write_plugin(self.path_a, 'okapi.py', 'Okapi', 'okapi')
+        self.tapir = _write_plugin(self.path_b, 'tapir.py', 'Tapir', 'tapir')
+
+        self.factory = self._factory(paths=[self.path_a, self.path_b])
+
+    # --------------------------------------------------------------------------
+    def test_reload_without_changes(self):
+        """
+        Ensures that reloading does not import files which have not changed
+
+        :return:
+        """
+        self.factory.reload()
+
+        self.assertEqual(
+            self.factory.identifiers(),
+            {'panda', 'okapi', 'tapir'},
+        )
+
+        for filepath in [self.panda, self.okapi, self.tapir]:
+            self.assertEqual(_import_count(filepath), 1)
+
+    # --------------------------------------------------------------------------
+    def test_reload_modified_file(self):
+        """
+        Ensures that only modified files are imported during a reload
+
+        :return:
+        """
+        _write_plugin(self.path_a, 'panda.py', 'RedPanda', 'red panda')
+        _touch(self.panda)
+
+        self.factory.reload()
+
+        self.assertEqual(
+            self.factory.identifiers(),
+            {'red panda', 'okapi', 'tapir'},
+        )
+
+        self.assertEqual(_import_count(self.panda), 2)
+        self.assertEqual(_import_count(self.okapi), 1)
+
+    # --------------------------------------------------------------------------
+    def test_reload_added_and_deleted_files(self):
+        """
+        Ensures that new files are found and removed files are forgotten
+
+        :return:
+        """
+        os.remove(self.okapi)
+        _write_plugin(self.path_b, 'quokka.py', 'Quokka', 'quokka')
+
+        self.factory.reload()
+
+        self.assertEqual(
+            self.factory.identifiers(),
+            {'panda', 'tapir', 'quokka'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_full_reload(self):
+        """
+        Ensures a full reload searches every file again, without executing
+        files which have not changed
+
+        :return:
+        """
+        self.factory.reload(full=True)
+
+        self.assertEqual(
+            len(self.factory.identifiers()),
+            3,
+        )
+
+        self.assertEqual(_import_count(self.tapir), 1)
+
+    # --------------------------------------------------------------------------
+    def test_modules_are_shared(self):
+        """
+        Ensures that factories loading the same unchanged files share the
+        modules rather than executing the files again
+
+        :return:
+        """
+        factory = factories.Factory(
+            abstract=factories.examples.zoo.Animal,
+            plugin_identifier='species',
+            paths=[self.path_a],
+            mechanism=factories.Factory.LOAD_SOURCE,
+        )
+
+        self.assertIs(
+            factory.request('panda'),
+            self.factory.request('panda'),
+        )
+
+        self.assertEqual(_import_count(self.panda), 1)
+
+    # --------------------------------------------------------------------------
+    def test_changed_module_is_replaced(self):
+        """
+        Ensures that the module of a changed file is replaced in sys.modules
+
+        :return:
+        """
+        previous = self.factory.request('panda').__module__
+
+        _write_plugin(self.path_a, 'panda.py', 'Panda', 'red_panda')
+        _touch(self.panda)
+
+        self.factory.reload()
+
+        self.assertNotEqual(
+            self.factory.request('red_panda').__module__,
+            previous,
+        )
+
+        self.assertNotIn(
+            previous,
+            sys.modules,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_remove_path_keeps_other_paths(self):
+        """
+        Ensures removing a path only removes its own plugins, and does not
+        search the remaining paths again.
+
+        :return:
+        """
+        self.factory.remove_path(self.path_a)
+
+        self.assertEqual(
+            self.factory.identifiers(),
+            {'tapir'},
+        )
+
+        self.assertEqual(_import_count(self.tapir), 1)
+
+
+# ------------------------------------------------------------------------------
+class WatchTests(PluginDirectoryTestCase):
+    """
+    Tests the callbacks and file watching of a factory
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(WatchTests, self).setUp()
+
+        _write_plugin(self.directory, 'ibis.py', 'Ibis', 'ibis')
+
+        self.factory = self._factory()
+
+        self.added = list()
+        self.removed = list()
+
+        self.factory.add_callback(
+            self.factory.ADDED,
+            lambda plugins: self.added.extend(p.species for p in plugins),
+        )
+
+        self.factory.add_callback(
+            self.factory.REMOVED,
+            lambda plugins: self.removed.extend(p.species for p in plugins),
+        )
+
+    # --------------------------------------------------------------------------
+    def tearDown(self):
+        self.factory.unwatch()
+
+    # --------------------------------------------------------------------------
+    def test_reload_calls_callbacks(self):
+        """
+        Ensures callbacks are given the plugins which changed on reload
+
+        :return:
+        """
+        os.remove(os.path.join(self.directory, 'ibis.py'))
+        _write_plugin(self.directory, 'hoopoe.py', 'Hoopoe', 'hoopoe')
+
+        self.factory.reload()
+
+        self.assertEqual(self.added, ['hoopoe'])
+        self.assertEqual(self.removed, ['ibis'])
+
+    # --------------------------------------------------------------------------
+    def test_full_reload_callbacks_alter_factory(self):
+        """
+        Ensures callbacks called by a full reload are free to alter the
+        factory, including from other threads
+
+        :return:
+        """
+        from factories.examples.zoo.animals.carnivores import Tiger
+
+        threads = list()
+
+        def register(plugins):
+            if threads:
+                return
+
+            thread = threading.Thread(
+                target=self.factory.register,
+                args=(Tiger,),
+            )
+            threads.append(thread)
+
+            thread.start()
+            thread.join(5)
+
+        self.factory.add_callback(self.factory.ADDED, register)
+        self.factory.reload(full=True)
+
+        self.assertTrue(threads)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertIs(self.factory.request('tiger'), Tiger)
+
+    # --------------------------------------------------------------------------
+    def _test_watching(self, polling):
+        self.factory.watch(interval=0.1, polling=polling)
+
+        self.assertTrue(
+            self.factory.is_watching(),
+        )
+
+        # noinspection PyProtectedMember
+        self.assertTrue(
+            self.factory._watcher.wait_until_ready(_TIMEOUT),
+        )
+
+        _write_plugin(self.directory, 'stork.py', 'Stork', 'stork')
+
+        self.assertTrue(
+            _wait_for(lambda: 'stork' in self.factory.identifiers()),
+        )
+
+        os.remove(os.path.join(self.directory, 'ibis.py'))
+
+        self.assertTrue(
+            _wait_for(lambda: 'ibis' not in self.factory.identifiers()),
+        )
+
+        self.assertIn('stork', self.added)
+        self.assertIn('ibis', self.removed)
+
+        self.factory.unwatch()
+
+        self.assertFalse(
+            self.factory.is_watching(),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_watching_by_polling(self):
+        """
+        Ensures changes are applied when watching by polling
+
+        :return:
+        """
+        self._test_watching(polling=True)
+
+    # --------------------------------------------------------------------------
+    def test_watching(self):
+        """
+        Ensures changes are applied when watching with the best available
+        watcher for the platform
+
+        :return:
+        """
+        self._test_watching(polling=False)
+
+    # --------------------------------------------------------------------------
+    def _test_changing_paths(self, polling):
+        self.factory.watch(interval=0.1, polling=polling)
+
+        # noinspection PyProtectedMember
+        watching = self.factory._watcher
+
+        self.assertTrue(
+            watching.wait_until_ready(_TIMEOUT),
+        )
+
+        paths = list()
+
+        for index in range(4):
+            paths.append(self._mkdtemp())
+            self.factory.add_path(paths[-1])
+
+        self.factory.remove_path(paths[0])
+
+        # noinspection PyProtectedMember
+        self.assertIs(self.factory._watcher, watching)
+        self.assertEqual(watching.paths(), [self.directory] + paths[1:])
+
+        # -- Changes within both the new and the original paths are seen
+        _write_plugin(paths[1], 'stork.py', 'Stork', 'stork')
+
+        self.assertTrue(
+            _wait_for(lambda: 'stork' in self.factory.identifiers()),
+        )
+
+        os.remove(os.path.join(self.directory, 'ibis.py'))
+
+        self.assertTrue(
+            _wait_for(lambda: 'ibis' not in self.factory.identifiers()),
+        )
+
+    # --------------------------------------------------------------------------
+    def _test_not_waiting_on_watcher(self, polling):
+
+        # -- A watcher only checks whether it has been stopped (and a
+        # -- polling watcher only polls) every interval. This is far longer
+        # -- than we wait, so any call which waits on the watcher fails
+        self.factory.watch(interval=_TIMEOUT * 10, polling=polling)
+
+        # noinspection PyProtectedMember
+        self.assertTrue(
+            self.factory._watcher.wait_until_ready(_TIMEOUT),
+        )
+
+        def alter_paths():
+            path = self._mkdtemp()
+
+            self.factory.add_path(path)
+            self.factory.remove_path(path)
+
+        self.assertTrue(
+            _finishes(alter_paths),
+        )
+
+        # -- Stopping wakes the watcher rather than waiting for it
+        self.assertTrue(
+            _finishes(self.factory.unwatch),
+        )
+
+        self.assertFalse(
+            self.factory.is_watching(),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_changing_paths_by_polling(self):
+        """
+        Ensures the paths of a polling watcher are altered without the
+        watcher being restarted
+
+        :return:
+        """
+        self._test_changing_paths(polling=True)
+
+    # --------------------------------------------------------------------------
+    def test_changing_paths(self):
+        """
+        Ensures the paths of the best available watcher are altered
+        without the watcher being restarted
+
+        :return:
+        """
+        self._test_changing_paths(polling=False)
+
+    # --------------------------------------------------------------------------
+    def test_not_waiting_on_watcher_by_polling(self):
+        """
+        Ensures altering the paths of a polling watcher, and stopping it,
+        does not wait for the watcher to next poll
+
+        :return:
+        """
+        self._test_not_waiting_on_watcher(polling=True)
+
+    # --------------------------------------------------------------------------
+    def test_not_waiting_on_watcher(self):
+        """
+        Ensures altering the paths of the best available watcher, and
+        stopping it, does not wait for the watcher to wake
+
+        :return:
+        """
+        self._test_not_waiting_on_watcher(polling=False)
+
+
+# ------------------------------------------------------------------------------
+class ManifestTests(PluginDirectoryTestCase):
+    """
+    Tests the discovery of plugins through a manifest
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(ManifestTests, self).setUp()
+
+        self.filepath = _write_plugin(
+            self.directory,
+            'manifest_animals.py',
+            'Quokka',
+            'quokka',
+        )
+
+        factories.manifest.write(
+            self.directory,
+            dict(
+                format=factories.manifest.FORMAT,
+                abstracts=['factories.examples.zoo.zoo.Animal'],
+                plugins=[
+                    dict(
+                        module='manifest_animals.py',
+                        name='Quokka',
+                        abstract='factories.examples.zoo.zoo.Animal',
+                        attributes=dict(__name__='Quokka', species='quokka'),
+                    ),
+                ],
+            ),
+        )
+
+        # -- This file is not in the manifest, and would fail if
+        # -- it were ever imported
+        with open(os.path.join(self.directory, 'unlisted.py'), 'w') as f:
+            f.write('raise Exception(\'This should never be imported\')\n')
+
+    # --------------------------------------------------------------------------
+    def test_only_listed_files_are_imported(self):
+        """
+        Ensures that only the files listed in a manifest are imported
+
+        :return:
+        """
+        factory = self._factory(plugin_identifier='species')
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'quokka'},
+        )
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_lazy_factories_import_nothing(self):
+        """
+        Ensures that a lazy factory registers the plugins of a manifest
+        without importing anything until a plugin is requested
+
+        :return:
+        """
+        factory = self._factory(plugin_identifier='species', lazy=True)
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            0,
+        )
+
+        self.assertEqual(
+            factory.request('quokka').__name__,
+            'Quokka',
+        )
+
+    # --------------------------------------------------------------------------
+    def test_mismatched_manifest_is_ignored(self):
+        """
+        Ensures that a manifest which does not hold the attributes a
+        factory requires is ignored, and the directory searched instead
+
+        :return:
+        """
+        factory = self._factory(plugin_identifier='max_age', log_errors=False)
+
+        self.assertEqual(
+            _import_count(self.filepath),
+            1,
+        )
+
+        self.assertEqual(
+            len(factory.plugins()),
+            1,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_command_line(self):
+        """
+        Ensures the manifest can be generated from the command line
+
+        :return:
+        """
+        output = os.path.join(self.directory, 'generated.json')
+
+        factories.manifest.main(
+            [
+                self.directory,
+                '--abstract', 'factories.examples.zoo:Animal',
+                '--attribute', 'species',
+                '--mechanism', 'load_source',
+                '--output', output,
+            ],
+        )
+
+        self.assertTrue(os.path.exists(output))
+
+
+# ------------------------------------------------------------------------------
+class ArchiveTests(PluginDirectoryTestCase):
+    """
+    Tests the loading of plugins from zip archives
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(ArchiveTests, self).setUp()
+
+        self.filepath = _write_archive(
+            os.path.join(self.directory, 'animals.zip'),
+            [('Wombat', 'wombat'), ('Numbat', 'numbat')],
+        )
+
+    # --------------------------------------------------------------------------
+    def tearDown(self):
+        if self.filepath in sys.path:
+            sys.path.remove(self.filepath)
+
+        for name in list(sys.modules.keys()):
+            if name.startswith('zipped_animals'):
+                sys.modules.pop(name)
+
+    # --------------------------------------------------------------------------
+    def _factory(self, mechanism, **kwargs):
+        return super(ArchiveTests, self)._factory(
+            paths=[self.filepath],
+            mechanism=mechanism,
+            **kwargs
+        )
+
+    # --------------------------------------------------------------------------
+    def test_loading_from_archive(self):
+        """
+        Ensures plugins can be loaded from an archive which is not
+        on the sys.path
+
+        :return:
+        """
+        factory = self._factory(factories.Factory.GUESS)
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'wombat', 'numbat'},
+        )
+
+        self.assertEqual(
+            sys.modules[factory.request('wombat').__module__].__file__,
+            os.path.join(self.filepath, 'zipped_animals', 'wombat.py'),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_importing_from_archive(self):
+        """
+        Ensures plugins are imported through zipimport when the archive
+        is on the sys.path
+
+        :return:
+        """
+        sys.path.append(self.filepath)
+
+        factory = self._factory(factories.Factory.IMPORTABLE)
+
+        self.assertEqual(
+            factory.request('numbat').__module__,
+            'zipped_animals.numbat',
+        )
+
+    # --------------------------------------------------------------------------
+    def test_lazy_loading_from_archive(self):
+        """
+        Ensures a lazy factory inspects the archive without loading any
+        of its files
+
+        :return:
+        """
+        factory = self._factory(factories.Factory.LOAD_SOURCE, lazy=True)
+
+        # noinspection PyProtectedMember
+        self.assertEqual(
+            len(factory._modules),
+            0,
+        )
+
+        self.assertEqual(
+            factory.request('wombat').__name__,
+            'Wombat',
+        )
+
+    # --------------------------------------------------------------------------
+    def test_reload_rewritten_archive(self):
+        """
+        Ensures that reloading picks up the changes to an archive
+
+        :return:
+        """
+        factory = self._factory(factories.Factory.LOAD_SOURCE)
+
+        _write_archive(self.filepath, [('Dingo', 'dingo')])
+        _touch(self.filepath)
+
+        factory.reload()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'dingo'},
+        )
+
+
+# ------------------------------------------------------------------------------
+class LoadReportTests(PluginDirectoryTestCase):
+    """
+    Tests the load report of a factory
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(LoadReportTests, self).setUp()
+
+        self.gecko = _write_plugin(self.directory, 'gecko.py', 'Gecko', 'gecko')
+        self.slow = os.path.join(self.directory, 'slow.py')
+        self.broken = os.path.join(self.directory, 'broken.py')
+
+        with open(self.slow, 'w') as f:
+            f.write(
+                'import time\n'
+                'from factories.examples.zoo import Animal\n'
+                'time.sleep(0.05)\n\n\n'
+                'class Sloth(Animal):\n'
+                '    species = \'sloth\'\n'
+            )
+
+        with open(self.broken, 'w') as f:
+            f.write('raise Exception(\'This file cannot be loaded\')\n')
+
+        self.factory = self._factory(log_errors=False)
+
+    # --------------------------------------------------------------------------
+    def test_files_are_recorded(self):
+        """
+        Ensures every scanned file has a record of how it was scanned
+
+        :return:
+        """
+        load_report = self.factory.load_report()
+
+        self.assertEqual(
+            len(load_report),
+            3,
+        )
+
+        record = load_report.get(self.gecko)
+
+        self.assertEqual(record.method, record.IMPORTED)
+        self.assertEqual(record.mechanism, 'LOAD_SOURCE')
+        self.assertEqual(record.plugins, ['gecko'])
+        self.assertIsNone(record.failure)
+
+        self.assertIn(
+            self.directory,
+            load_report.walks,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_failures_are_recorded(self):
+        """
+        Ensures files which fail to load are reported
+
+        :return:
+        """
+        failures = self.factory.load_report().failures()
+
+        self.assertEqual(
+            [record.filepath for record in failures],
+            [self.broken],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_slowest(self):
+        """
+        Ensures the slowest files are reported first
+
+        :return:
+        """
+        self.assertEqual(
+            self.factory.load_report().slowest(1)[0].filepath,
+            self.slow,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_export(self):
+        """
+        Ensures the report can be exported as json and csv
+
+        :return:
+        """
+        import csv
+        import json
+
+        load_report = self.factory.load_report()
+
+        data = json.loads(load_report.to_json())
+
+        self.assertEqual(
+            len(data['files']),
+            3,
+        )
+
+        filepath = os.path.join(self.directory, 'report.csv')
+        load_report.to_csv(filepath)
+
+        with open(filepath, 'r') as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual(
+            sorted(row['plugins'] for row in rows),
+            ['', 'gecko', 'sloth'],
+        )
+
+
+# ------------------------------------------------------------------------------
+class BenchmarkTests(unittest.TestCase):
+    """
+    Tests the benchmark suite runs against a small tree
+    """
+
+    # --------------------------------------------------------------------------
+    def test_benchmark(self):
+        """
+        Ensures every operation is measured
+
+        :return:
+        """
+        import factories.benchmark
+
+        results = factories.benchmark.run(sizes=[20], repeat=1)
+
+        self.assertEqual(
+            set(result['operation'] for result in results['results']),
+            {
+                'add_path[GUESS]',
+                'add_path[IMPORTABLE]',
+                'add_path[LOAD_SOURCE]',
+                'request',
+                'versions',
+                'plugins',
+                'identifiers',
+                'reload',
+                'reload[full]',
+                'remove_path',
+            },
+        )
+
+    # --------------------------------------------------------------------------
+    def test_compare(self):
+        """
+        Ensures only the operations which slowed by more than the
+        threshold are reported as regressions. Fixed timings are used,
+        as measured ones vary from run to run.
+
+        :return:
+        """
+        import factories.benchmark
+
+        baseline = dict(
+            results=[
+                dict(operation='request', plugins=20, best=1.0),
+                dict(operation='reload', plugins=20, best=1.0),
+                dict(operation='plugins', plugins=20, best=1.0),
+                dict(operation='versions', plugins=20, best=0.0),
+            ],
+        )
+
+        current = dict(
+            results=[
+                dict(operation='request', plugins=20, best=2.0),
+                dict(operation='reload', plugins=20, best=1.05),
+                dict(operation='plugins', plugins=20, best=0.5),
+                dict(operation='versions', plugins=20, best=1.0),
+                dict(operation='identifiers', plugins=20, best=1.0),
+            ],
+        )
+
+        self.assertEqual(
+            factories.benchmark.compare(baseline, current),
+            [dict(operation='request', plugins=20, ratio=2.0)],
+        )
+
+
+# ------------------------------------------------------------------------------
+class ModuleResolverTests(unittest.TestCase):
+    """
+    Tests the resolution of module names from files
+    """
+
+    # --------------------------------------------------------------------------
+    def test_resolve_package_module(self):
+        """
+        Ensures a module within a package on the sys.path is resolved to
+        its fully qualified name
+
+        :return:
+        """
+        import factories.resolver
+
+        filepath = os.path.join(
+            os.path.dirname(factories.examples.zoo.__file__),
+            'zoo.py',
+        )
+
+        self.assertEqual(
+            factories.resolver.ModuleResolver().resolve(filepath),
+            'factories.examples.zoo.zoo',
+        )
+
+    # --------------------------------------------------------------------------
+    def test_no_speculative_imports(self):
+        """
+        Ensures that a file outside of the sys.path which shares its name
+        with an unrelated module does not cause that module to be imported
+
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+
+        try:
+            _write_plugin(directory, 'colorsys.py', 'Ibis', 'ibis')
+            sys.modules.pop('colorsys', None)
+
+            factory = factories.Factory(
+                abstract=factories.examples.zoo.Animal,
+                plugin_identifier='species',
+                paths=[directory],
+            )
+
+            self.assertIn('ibis', factory.identifiers())
+            self.assertNotIn('colorsys', sys.modules)
+
+        finally:
+            shutil.rmtree(directory)
+
+
+# ------------------------------------------------------------------------------
+class IgnoreTests(PluginDirectoryTestCase):
+    """
+    Tests the ignore rules and walk limits of a factory
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(IgnoreTests, self).setUp()
+
+        for subdirectory in ['tests', 'vendor', os.path.join('a', 'b', 'c')]:
+            os.makedirs(os.path.join(self.directory, subdirectory))
+
+        _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        _write_plugin(
+            os.path.join(self.directory, 'tests'),
+            'emu.py',
+            'Emu',
+            'emu',
+        )
+        _write_plugin(
+            os.path.join(self.directory, 'a', 'b', 'c'),
+            'kiwi.py',
+            'Kiwi',
+            'kiwi',
+        )
+
+        # -- This file would fail if it were ever imported
+        with open(os.path.join(self.directory, 'vendor', 'lib.py'), 'w') as f:
+            f.write('raise Exception(\'This should never be imported\')\n')
+
+    # --------------------------------------------------------------------------
+    def test_ignore_patterns(self):
+        """
+        Ensures ignore patterns given to the factory are not searched
+
+        :return:
+        """
+        factory = self._factory(ignore=['tests', 'vendor/'])
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'kiwi'},
+        )
+
+        self.assertEqual(
+            len(factory.load_report().failures()),
+            0,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_ignore_file(self):
+        """
+        Ensures the patterns of a .factoryignore file are not searched
+
+        :return:
+        """
+        filepath = os.path.join(self.directory, '.factoryignore')
+
+        with open(filepath, 'w') as f:
+            f.write('# -- Third party code\nvendor/\na/b\n')
+
+        factory = self._factory()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'emu'},
+        )
+
+        self.assertEqual(
+            len(factory.load_report().failures()),
+            0,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_max_depth(self):
+        """
+        Ensures directories beyond the maximum depth are not searched
+
+        :return:
+        """
+        factory = self._factory(max_depth=1, ignore=['vendor'])
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'emu'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_prune(self):
+        """
+        Ensures directories which are pruned are not searched
+
+        :return:
+        """
+        factory = self._factory(
+            prune=lambda directory: os.path.basename(directory) != 'tests',
+        )
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'emu'},
+        )
+
+    # --------------------------------------------------------------------------
+    def _watched_directories(self, polling):
+        factory = self._factory(ignore=['vendor', 'build'], max_depth=1)
+        factory.watch(interval=0.1, polling=polling)
+        self.addCleanup(factory.unwatch)
+
+        # noinspection PyProtectedMember
+        watching = factory._watcher
+
+        def watched():
+            with watching._lock:
+                if polling:
+                    directories = list(watching._directories.keys())
+
+                else:
+                    directories = list(watching._watches.values())
+
+            return set(
+                os.path.relpath(directory, self.directory)
+                for directory in directories
+            )
+
+        # -- Once the watcher is running, add some directories whilst it
+        # -- is watching, waiting for them to be seen
+        self.assertTrue(
+            watching.wait_until_ready(_TIMEOUT),
+        )
+
+        os.mkdir(os.path.join(self.directory, 'build'))
+        os.mkdir(os.path.join(self.directory, 'fresh'))
+
+        self.assertTrue(
+            _wait_for(lambda: 'fresh' in watched()),
+        )
+
+        return watched()
+
+    # --------------------------------------------------------------------------
+    def test_watching_by_polling(self):
+        """
+        Ensures a polling watcher does not poll the directories which
+        are excluded from the walk
+
+        :return:
+        """
+        self.assertEqual(
+            self._watched_directories(polling=True),
+            {'.', 'tests', 'a', 'fresh'},
+        )
+
+    # --------------------------------------------------------------------------
+    @unittest.skipIf(
+        not factories.watcher.InotifyWatcher.is_available(),
+        'Requires inotify',
+    )
+    def test_watching_with_inotify(self):
+        """
+        Ensures an inotify watcher does not watch the directories which
+        are excluded from the walk
+
+        :return:
+        """
+        self.assertEqual(
+            self._watched_directories(polling=False),
+            {'.', 'tests', 'a', 'fresh'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_trailing_separator(self):
+        """
+        Ensures a path given with a trailing separator is walked with the
+        same rules and depth as one without
+
+        :return:
+        """
+        factory = self._factory(
+            paths=[self.directory + os.sep],
+            max_depth=1,
+            ignore=['vendor'],
+        )
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'emu'},
+        )
+
+    # --------------------------------------------------------------------------
+    def test_ignored_changes(self):
+        """
+        Ensures that reloading does not pick up files within ignored
+        directories
+
+        :return:
+        """
+        factory = self._factory(ignore=['tests', 'vendor'])
+
+        _write_plugin(
+            os.path.join(self.directory, 'tests'),
+            'wallaby.py',
+            'Wallaby',
+            'wallaby',
+        )
+
+        factory.reload()
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'kiwi'},
+        )
+
+
+# ------------------------------------------------------------------------------
+class StreamingTests(PluginDirectoryTestCase):
+    """
+    Tests the streaming and asynchronous ways of adding paths
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(StreamingTests, self).setUp()
+
+        _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        _write_plugin(self.directory, 'emu.py', 'Emu', 'emu')
+        _write_plugin(self.directory, 'kiwi.py', 'Kiwi', 'kiwi')
+
+        self.factory = self._factory(
+            paths=None,
+            mechanism=factories.Factory.GUESS,
+        )
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path(self):
+        """
+        Ensures each plugin is stored by the time it is yielded
+
+        :return:
+        """
+        species = list()
+
+        for plugin in self.factory.iter_add_path(self.directory):
+            self.assertIn(plugin.species, self.factory.identifiers())
+            species.append(plugin.species)
+
+        self.assertEqual(
+            sorted(species),
+            ['emu', 'kiwi', 'koala'],
+        )
+
+        self.assertEqual(
+            self.factory.paths(),
+            [self.directory],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path_publishes_in_batches(self):
+        """
+        Ensures the plugins streamed from a path are made readable in
+        batches of files rather than after every file
+
+        :return:
+        """
+        for index in range(247):
+            _write_plugin(
+                self.directory,
+                'animal_{}.py'.format(index),
+                'Animal{}'.format(index),
+                'animal_{}'.format(index),
+            )
+
+        published = list()
+
+        # -- Only batch by the number of files
+        self.factory._PUBLISH_INTERVAL = 60
+
+        for plugin in self.factory.iter_add_path(self.directory):
+            self.assertIs(self.factory.request(plugin.species), plugin)
+
+            readable = len(self.factory._registry)
+
+            if not published or published[-1] != readable:
+                published.append(readable)
+
+        self.assertEqual(published, [100, 200, 250])
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path_callbacks(self):
+        """
+        Ensures the added callbacks are only called once the stream
+        has been exhausted
+
+        :return:
+        """
+        added = list()
+
+        self.factory.add_callback(self.factory.ADDED, added.extend)
+
+        stream = self.factory.iter_add_path(self.directory)
+        next(stream)
+
+        self.assertEqual(len(added), 0)
+
+        list(stream)
+
+        self.assertEqual(len(added), 3)
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path_closed(self):
+        """
+        Ensures that closing the stream early stops the search
+
+        :return:
+        """
+        # -- Give out the plugins of each file as soon as it is scanned
+        self.factory._PUBLISH_FILES = 1
+
+        stream = self.factory.iter_add_path(self.directory)
+        next(stream)
+        stream.close()
+
+        self.assertEqual(len(self.factory.identifiers()), 1)
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path_altered_whilst_consumed(self):
+        """
+        Ensures the factory can be altered by the consumer of a stream,
+        with those changes being readable straight away
+
+        :return:
+        """
+        from factories.examples.zoo.animals.carnivores import Tiger
+
+        self.factory._PUBLISH_FILES = 1
+
+        for plugin in self.factory.iter_add_path(self.directory):
+            if not self.factory.request('tiger'):
+                self.factory.register(Tiger)
+
+            self.assertIs(self.factory.request('tiger'), Tiger)
+
+        self.assertEqual(
+            sorted(self.factory.identifiers()),
+            ['emu', 'kiwi', 'koala', 'tiger'],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_iter_add_path_paused(self):
+        """
+        Ensures other threads are free to alter the factory whilst
+        a stream is not being consumed
+
+        :return:
+        """
+        from factories.examples.zoo.animals.carnivores import Tiger
+
+        self.factory._PUBLISH_FILES = 1
+
+        stream = self.factory.iter_add_path(self.directory)
+        next(stream)
+
+        thread = threading.Thread(
+            target=self.factory.register,
+            args=(Tiger,),
+        )
+        thread.start()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertIs(self.factory.request('tiger'), Tiger)
+
+        list(stream)
+
+        self.assertEqual(len(self.factory.identifiers()), 4)
+
+    # --------------------------------------------------------------------------
+    @unittest.skipIf(sys.version_info < (3, 4), 'Requires asyncio')
+    def test_add_path_async(self):
+        """
+        Ensures a path can be added through an event loop
+
+        :return:
+        """
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            count = loop.run_until_complete(
+                self.factory.add_path_async(self.directory, loop=loop),
+            )
+
+        finally:
+            loop.close()
+
+        self.assertEqual(count, 3)
+
+        self.assertEqual(
+            self.factory.identifiers(),
+            {'emu', 'kiwi', 'koala'},
+        )
+
+
+# ------------------------------------------------------------------------------
+class IsolationTests(PluginDirectoryTestCase):
+    """
+    Tests the inspection of files within separate processes
+    """
+
+    factory_kwargs = dict(isolate=True, budget=2, workers=2)
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(IsolationTests, self).setUp()
+
+        self.koala = _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        _write_plugin(self.directory, 'emu.py', 'Emu', 'emu')
+
+        # -- This file takes far longer to import than it is allowed, and
+        # -- longer than any test waits for
+        with open(os.path.join(self.directory, 'slow.py'), 'w') as f:
+            f.write(
+                (
+                    'import time\n'
+                    'from factories.examples.zoo import Animal\n'
+                    'time.sleep({})\n\n\n'
+                    'class Sloth(Animal):\n'
+                    '    species = \'sloth\'\n'
+                ).format(_TIMEOUT * 10),
+            )
+
+    # --------------------------------------------------------------------------
+    def test_budget(self):
+        """
+        Ensures a file which exceeds its budget is reported and skipped
+        without holding up the others
+
+        :return:
+        """
+        built = list()
+
+        self.assertTrue(
+            _finishes(lambda: built.append(self._factory())),
+        )
+
+        factory = built[0]
+
+        self.assertEqual(
+            factory.identifiers(),
+            {'koala', 'emu'},
+        )
+
+        record = factory.load_report().get(
+            os.path.join(self.directory, 'slow.py'),
+        )
+
+        self.assertEqual(record.method, record.ISOLATED)
+        self.assertIn('budget', record.failure)
+
+    # --------------------------------------------------------------------------
+    def test_deferred_import(self):
+        """
+        Ensures isolated plugins are only imported by this process
+        when they are requested
+
+        :return:
+        """
+        factory = self._factory()
+
+        # -- The file is imported once, by the inspecting process
+        self.assertEqual(_import_count(self.koala), 1)
+
+        plugin = factory.request('koala')
+
+        self.assertEqual(plugin.__name__, 'Koala')
+        self.assertEqual(_import_count(self.koala), 2)
+
+
+# ------------------------------------------------------------------------------
+class UnloadTests(PluginDirectoryTestCase):
+    """
+    Tests the unloading of modules when plugins are removed
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(UnloadTests, self).setUp()
+
+        _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        _write_plugin(self.directory, 'emu.py', 'Emu', 'emu')
+
+    # --------------------------------------------------------------------------
+    def test_remove_path(self):
+        """
+        Ensures removing a path removes its modules from sys.modules and
+        that the plugins are freed
+
+        :return:
+        """
+        factory = self._factory()
+
+        unloaded = factory.remove_path(self.directory)
+
+        self.assertEqual(len(unloaded.modules), 2)
+        self.assertEqual(sorted(unloaded.plugins), ['emu', 'koala'])
+
+        for module_name in unloaded.modules:
+            self.assertNotIn(module_name, sys.modules)
+
+        self.assertEqual(unloaded.leak_check(), [])
+
+    # --------------------------------------------------------------------------
+    def test_clear(self):
+        """
+        Ensures clearing a factory unloads its modules
+
+        :return:
+        """
+        factory = self._factory()
+
+        unloaded = factory.clear()
+
+        self.assertEqual(len(unloaded.modules), 2)
+        self.assertEqual(unloaded.leak_check(), [])
+
+    # --------------------------------------------------------------------------
+    def test_shared_modules(self):
+        """
+        Ensures modules held by another factory are not unloaded
+
+        :return:
+        """
+        factory = self._factory()
+        other = self._factory()
+
+        unloaded = factory.clear()
+
+        self.assertEqual(unloaded.modules, [])
+        self.assertEqual(other.request('koala').__name__, 'Koala')
+
+    # --------------------------------------------------------------------------
+    def test_leak_check(self):
+        """
+        Ensures the leak check reports plugins which are still referenced
+
+        :return:
+        """
+        factory = self._factory()
+        plugin = factory.request('koala')
+
+        unloaded = factory.clear()
+
+        self.assertEqual(unloaded.leak_check(), [repr(plugin)])
+
+        del plugin
+        self.assertEqual(unloaded.leak_check(), [])
+
+
+# ------------------------------------------------------------------------------
+class FindTests(PluginDirectoryTestCase):
+    """
+    Tests the finding of plugins by their attribute values
+    """
+
+    factory_kwargs = dict(indexed_attributes=['habitats'])
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(FindTests, self).setUp()
+
+        for name, habitats in [('Koala', ['forest']),
+                               ('Emu', ['desert', 'forest']),
+                               ('Kiwi', ['forest', 'island'])]:
+            with open(os.path.join(self.directory, name + '.py'), 'w') as f:
+                f.write(
+                    'from factories.examples.zoo import Animal\n\n\n'
+                    'class {}(Animal):\n'
+                    '    species = \'{}\'\n'
+                    '    habitats = {}\n'.format(
+                        name,
+                        name.lower(),
+                        habitats,
+                    )
+                )
+
+    # --------------------------------------------------------------------------
+    def test_find(self):
+        """
+        Ensures plugins are found by each element of a list attribute
+
+        :return:
+        """
+        factory = self._factory()
+
+        self.assertEqual(
+            sorted(plugin.species for plugin in factory.find(
+                habitats='forest',
+            )),
+            ['emu', 'kiwi', 'koala'],
+        )
+
+        self.assertEqual(
+            [plugin.species for plugin in factory.find(habitats='island')],
+            ['kiwi'],
+        )
+
+        self.assertEqual(factory.find(habitats='ocean'), [])
+
+    # --------------------------------------------------------------------------
+    def test_find_unindexed(self):
+        """
+        Ensures criteria which are not indexed are still checked
+
+        :return:
+        """
+        factory = self._factory()
+
+        self.assertEqual(
+            [
+                plugin.species
+                for plugin in factory.find(habitats='forest', species='emu')
+            ],
+            ['emu'],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_index_is_updated(self):
+        """
+        Ensures removed plugins are no longer found
+
+        :return:
+        """
+        factory = self._factory()
+
+        os.remove(os.path.join(self.directory, 'Kiwi.py'))
+        factory.reload()
+
+        self.assertEqual(factory.find(habitats='island'), [])
+
+    # --------------------------------------------------------------------------
+    def test_lazy_find(self):
+        """
+        Ensures literal attributes are indexed without importing plugins
+
+        :return:
+        """
+        factory = self._factory(lazy=True)
+
+        self.assertEqual(
+            len(factory._registry.find({'habitats': 'forest'})),
+            3,
+        )
+
+        for plugin in factory._registry.plugins:
+            self.assertFalse(plugin.is_resolved())
+
+    # --------------------------------------------------------------------------
+    def test_zoo(self):
+        """
+        Ensures the zoo finds the animals appropriate to its climate
+
+        :return:
+        """
+        zoo = Zoo(climate='tropical')
+
+        self.assertEqual(
+            sorted(zoo.appropriate_animals()),
+            sorted(
+                animal.species
+                for animal in zoo.factory.plugins()
+                if animal.required_climate() == 'tropical'
+            ),
+        )
+
+
+# ------------------------------------------------------------------------------
+class FailureTests(PluginDirectoryTestCase):
+    """
+    Tests that files which fail to load are not retried until they change
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(FailureTests, self).setUp()
+        self.cache_path = os.path.join(self._mkdtemp(), 'cache.json')
+
+        _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+
+        # -- This file records each import before failing
+        self.broken = os.path.join(self.directory, 'broken.py')
+
+        with open(self.broken, 'w') as f:
+            f.write(
+                'with open(__file__ + \'.log\', \'a\') as f:\n'
+                '    f.write(\'imported\\n\')\n\n'
+                'raise ValueError(\'This plugin is broken\')\n'
+            )
+
+    # --------------------------------------------------------------------------
+    def test_failures(self):
+        """
+        Ensures failures are listed along with their traceback
+
+        :return:
+        """
+        factory = self._factory()
+
+        failures = factory.failures()
+
+        self.assertEqual(list(failures.keys()), [self.broken])
+        self.assertIn('This plugin is broken', failures[self.broken])
+        self.assertIn('Traceback', failures[self.broken])
+
+    # --------------------------------------------------------------------------
+    @unittest.skipIf(sys.version_info < (3, 4), 'Requires assertLogs')
+    def test_failures_are_logged(self):
+        """
+        Ensures the warning for a file which could not be loaded describes
+        why it could not be loaded
+
+        :return:
+        """
+        with self.assertLogs('factories', level='WARNING') as logs:
+            self._factory()
+
+        warnings = '\n'.join(
+            message
+            for message in logs.output
+            if self.broken in message
+        )
+
+        self.assertIn('This plugin is broken', warnings)
+        self.assertNotIn('(None, None, None)', warnings)
+
+    # --------------------------------------------------------------------------
+    def test_inspection_failure(self):
+        """
+        Ensures a file which fails whilst being inspected (rather than
+        whilst being imported) is recorded as a failure, keeping none of
+        the plugins it gave
+
+        :return:
+        """
+        filepath = os.path.join(self.directory, 'indescribable.py')
+
+        with open(filepath, 'w') as f:
+            f.write(
+                'from factories.examples.zoo import Animal\n\n\n'
+                'class Indescribable(type):\n'
+                '    def __repr__(cls):\n'
+                '        raise RuntimeError(\'This plugin is indescribable\')\n'
+                '\n\n'
+                'Wombat = Indescribable(\'Wombat\', (Animal,), {})\n'
+                'Wombat.species = \'wombat\'\n'
+            )
+
+        factory = self._factory()
+
+        self.assertEqual(factory.identifiers(), {'koala'})
+        self.assertIn(
+            'This plugin is indescribable',
+            factory.failures()[filepath],
+        )
+
+        factory.reload(full=True)
+
+        record = factory.load_report().get(filepath)
+        self.assertEqual(record.method, record.SKIPPED)
+        self.assertEqual(factory.identifiers(), {'koala'})
+
+    # --------------------------------------------------------------------------
+    def test_not_retried(self):
+        """
+        Ensures a failing file is not loaded again until it changes
+
+        :return:
+        """
+        factory = self._factory()
+
+        factory.add_path(self.directory, mechanism=factory.LOAD_SOURCE)
+        factory.reload(full=True)
+
+        self.assertEqual(_import_count(self.broken), 1)
+
+        record = factory.load_report().get(self.broken)
+        self.assertEqual(record.method, record.SKIPPED)
+
+        _touch(self.broken)
+        factory.reload()
+
+        self.assertEqual(_import_count(self.broken), 2)
+
+    # --------------------------------------------------------------------------
+    def test_clear_failures(self):
+        """
+        Ensures cleared failures are loaded again
+
+        :return:
+        """
+        factory = self._factory()
+        factory.clear_failures()
+
+        factory.add_path(self.directory, mechanism=factory.LOAD_SOURCE)
+
+        self.assertEqual(_import_count(self.broken), 2)
+
+    # --------------------------------------------------------------------------
+    def test_persisted(self):
+        """
+        Ensures failures are remembered between sessions through the
+        discovery cache
+
+        :return:
+        """
+        self._factory(cache_path=self.cache_path)
+        factory = self._factory(cache_path=self.cache_path)
+
+        self.assertEqual(_import_count(self.broken), 1)
+        self.assertIn('This plugin is broken', factory.failures()[self.broken])
+        self.assertEqual(factory.identifiers(), {'koala'})
+
+
+# ------------------------------------------------------------------------------
+class ConcurrencyTests(PluginDirectoryTestCase):
+    """
+    Tests that the factory can be read whilst it is altered on another
+    thread
+    """
+
+    factory_kwargs = dict(mechanism=factories.Factory.GUESS)
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(ConcurrencyTests, self).setUp()
+
+        for index in range(10):
+            _write_plugin(
+                self.directory,
+                'animal_{}.py'.format(index),
+                'Animal{}'.format(index),
+                'animal_{}'.format(index),
+            )
+
+    # --------------------------------------------------------------------------
+    def test_reload_never_empty(self):
+        """
+        Ensures a reader never sees the factory empty during a full reload
+
+        :return:
+        """
+        factory = self._factory()
+        counts = set()
+
+        reloading = threading.Thread(
+            target=lambda: [factory.reload(full=True) for _ in range(5)],
+        )
+        reloading.start()
+
+        while reloading.is_alive():
+            counts.add(len(factory.identifiers()))
+            counts.add(int(factory.request('animal_0') is not None))
+
+        reloading.join()
+
+        self.assertEqual(counts, {10, 1})
+
+    # --------------------------------------------------------------------------
+    def test_clear_is_atomic(self):
+        """
+        Ensures clearing swaps in an empty registry rather than emptying
+        the one being read
+
+        :return:
+        """
+        factory = self._factory()
+
+        # noinspection PyProtectedMember
+        registry = factory._registry
+
+        factory.clear()
+
+        self.assertEqual(len(registry), 10)
+        self.assertEqual(factory.identifiers(), set())
+
+    # --------------------------------------------------------------------------
+    def test_writers_serialised(self):
+        """
+        Ensures paths added from several threads are all stored
+
+        :return:
+        """
+        factory = self._factory()
+        directories = list()
+
+        for index in range(4):
+            directory = tempfile.mkdtemp()
+            directories.append(directory)
+
+            _write_plugin(
+                directory,
+                'extra.py',
+                'Extra{}'.format(index),
+                'extra_{}'.format(index),
+            )
+
+        try:
+            threads = [
+                threading.Thread(target=factory.add_path, args=(directory,))
+                for directory in directories
+            ]
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(factory.identifiers()), 14)
+            self.assertEqual(len(factory.paths()), 5)
+
+        finally:
+            for directory in directories:
+                shutil.rmtree(directory)
+
+    # --------------------------------------------------------------------------
+    def test_streaming_publishes(self):
+        """
+        Ensures plugins yielded by iter_add_path can be requested straight
+        away
+
+        :return:
+        """
+        factory = factories.Factory(
+            abstract=factories.examples.zoo.Animal,
+            plugin_identifier='species',
+        )
+
+        for plugin in factory.iter_add_path(self.directory):
+            self.assertIs(factory.request(plugin.species), plugin)
+
+    # --------------------------------------------------------------------------
+    def test_registry_copy(self):
+        """
+        Ensures a copy of a registry can be altered independently
+
+        :return:
+        """
+        factory = self._factory()
+
+        # noinspection PyProtectedMember
+        registry = factory._registry
+        other = registry.copy()
+
+        other.forget(self.directory)
+
+        self.assertEqual(len(registry), 10)
+        self.assertEqual(len(other), 0)
+        self.assertEqual(len(registry.sources[self.directory]), 10)
+
+    # --------------------------------------------------------------------------
+    def test_registry_copies_diverge(self):
+        """
+        Ensures a registry and its copy can both be added to after the
+        copy is made, without either seeing the plugins of the other
+
+        :return:
+        """
+        factory = self._factory()
+
+        # noinspection PyProtectedMember
+        registry = factory._registry
+        other = registry.copy()
+
+        koala = type('Koala', (factories.examples.zoo.Animal,), dict())
+        emu = type('Emu', (factories.examples.zoo.Animal,), dict())
+
+        other.add(koala, 'koala')
+        registry.add(emu, 'emu')
+
+        self.assertEqual(len(registry), 11)
+        self.assertEqual(len(other), 11)
+
+        self.assertIs(registry.plugins[-1], emu)
+        self.assertIs(other.plugins[-1], koala)
+
+        self.assertNotIn('koala', registry.index)
+        self.assertNotIn('emu', other.index)
+
+
+# ------------------------------------------------------------------------------
+class OverlapTests(PluginDirectoryTestCase):
+    """
+    Tests that files reached through several paths are only scanned once
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(OverlapTests, self).setUp()
+        self.child = os.path.join(self.directory, 'child')
+        os.mkdir(self.child)
+
+        self.koala = _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        self.emu = _write_plugin(self.child, 'emu.py', 'Emu', 'emu')
+
+        # -- A second route to the same directory
+        self.link = os.path.join(self._mkdtemp(), 'link')
+        os.symlink(self.directory, self.link)
+
+    # --------------------------------------------------------------------------
+    def test_parent_and_child(self):
+        """
+        Ensures a file within two registered paths is stored once
+
+        :return:
+        """
+        factory = self._factory(paths=[self.directory, self.child])
+
+        # noinspection PyProtectedMember
+        self.assertEqual(len(factory._registry), 2)
+        self.assertEqual(_import_count(self.emu), 1)
+
+        record = factory.load_report().get(self.emu)
+        self.assertEqual(record.method, record.IMPORTED)
+
+    # --------------------------------------------------------------------------
+    def test_symlink(self):
+        """
+        Ensures a directory reached through a symlink is not imported
+        again
+
+        :return:
+        """
+        factory = self._factory(paths=[self.directory, self.link])
+
+        # noinspection PyProtectedMember
+        self.assertEqual(len(factory._registry), 2)
+        self.assertEqual(_import_count(self.koala), 1)
+        self.assertEqual(_import_count(self.emu), 1)
+
+        record = factory.load_report().get(
+            os.path.join(self.link, 'koala.py'),
+        )
+        self.assertEqual(record.method, record.SHARED)
+
+    # --------------------------------------------------------------------------
+    def test_remove_owner(self):
+        """
+        Ensures the plugins remain whilst another path refers to them
+
+        :return:
+        """
+        factory = self._factory(paths=[self.directory, self.link])
+        emu = factory.request('emu')
+
+        factory.remove_path(self.directory)
+
+        self.assertIs(factory.request('emu'), emu)
+        self.assertEqual(factory.identifiers(), {'koala', 'emu'})
+
+        factory.remove_path(self.link)
+
+        self.assertEqual(factory.identifiers(), set())
+
+    # --------------------------------------------------------------------------
+    def test_changed_shared_file(self):
+        """
+        Ensures a changed file is scanned again through each path
+
+        :return:
+        """
+        factory = self._factory(paths=[self.directory, self.link])
+
+        _write_plugin(self.directory, 'koala.py', 'Koala', 'wombat')
+        _touch(self.koala)
+
+        factory.reload()
+
+        self.assertEqual(factory.identifiers(), {'wombat', 'emu'})
+        self.assertEqual(_import_count(self.koala), 2)
+
+        # noinspection PyProtectedMember
+        self.assertEqual(len(factory._registry), 2)
+
+
+# ------------------------------------------------------------------------------
+class ConstraintTests(unittest.TestCase):
+    """
+    Tests that plugins can be requested by version constraints
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        self.factory = factories.Factory(
+            abstract=factories.examples.zoo.Animal,
+            plugin_identifier='species',
+            versioning_identifier='version',
+        )
+
+        self.plugins = dict()
+
+        for version in [3, 1, 2.5, 2, 10, 2.1]:
+            plugin = type(
+                'Tortoise',
+                (factories.examples.zoo.Animal,),
+                dict(species='tortoise', version=version),
+            )
+            self.factory.register(plugin)
+            self.plugins[version] = plugin
+
+    # --------------------------------------------------------------------------
+    def test_versions_ordered(self):
+        """
+        Ensures the versions are kept in order as plugins are added
+
+        :return:
+        """
+        self.assertEqual(
+            self.factory.versions('tortoise'),
+            [1, 2, 2.1, 2.5, 3, 10],
+        )
+        self.assertIs(self.factory.request('tortoise'), self.plugins[10])
+
+    # --------------------------------------------------------------------------
+    def test_range(self):
+        """
+        Ensures the highest version within a range is given
+
+        :return:
+        """
+        self.assertIs(
+            self.factory.request('tortoise', version='>=2,<3'),
+            self.plugins[2.5],
+        )
+        self.assertIs(
+            self.factory.request('tortoise', version='>2,<=2.1'),
+            self.plugins[2.1],
+        )
+        self.assertEqual(
+            self.factory.versions('tortoise', matching='>1,<10,!=2.5'),
+            [2, 2.1, 3],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_wildcard(self):
+        """
+        Ensures wildcards match every version starting with the same value
+
+        :return:
+        """
+        self.assertIs(
+            self.factory.request('tortoise', version='2.x'),
+            self.plugins[2.5],
+        )
+        self.assertIs(
+            self.factory.request('tortoise', version='*'),
+            self.plugins[10],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_no_match(self):
+        """
+        Ensures None is given when nothing satisfies a constraint
+
+        :return:
+        """
+        self.assertIsNone(self.factory.request('tortoise', version='>=11'))
+        self.assertIsNone(self.factory.request('tortoise', version='>=a'))
+
+    # --------------------------------------------------------------------------
+    def test_incomparable_versions(self):
+        """
+        Ensures versions which cannot be compared with the others are
+        skipped, leaving constraints to be applied to the rest
+
+        :return:
+        """
+        for version in ['2.7', None]:
+            self.assertFalse(
+                self.factory.register(
+                    type(
+                        'Tortoise',
+                        (factories.examples.zoo.Animal,),
+                        dict(species='tortoise', version=version),
+                    ),
+                ),
+            )
+
+        self.assertIs(
+            self.factory.request('tortoise', version='>=2,<3'),
+            self.plugins[2.5],
+        )
+        self.assertEqual(
+            self.factory.versions('tortoise', matching='2.x'),
+            [2, 2.1, 2.5],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_unconstrainable_versions(self):
+        """
+        Ensures constraining versions which cannot be constrained matches
+        nothing rather than raising
+
+        :return:
+        """
+        self.factory.register(
+            type(
+                'Terrapin',
+                (factories.examples.zoo.Animal,),
+                dict(species='terrapin', version=None),
+            ),
+        )
+
+        self.assertIsNone(self.factory.request('terrapin', version='>=1'))
+        self.assertEqual(
+            self.factory.versions('terrapin', matching='>=1'),
+            [],
+        )
+
+    # --------------------------------------------------------------------------
+    def test_removed_versions(self):
+        """
+        Ensures the ordered versions are maintained as plugins are removed
+
+        :return:
+        """
+        # noinspection PyProtectedMember
+        self.factory._registry.remove([self.plugins[10], self.plugins[2.5]])
+
+        self.assertEqual(self.factory.versions('tortoise'), [1, 2, 2.1, 3])
+        self.assertIs(
+            self.factory.request('tortoise', version='2.x'),
+            self.plugins[2.1],
+        )
+        self.assertIs(self.factory.request('tortoise'), self.plugins[3])
+
+    # --------------------------------------------------------------------------
+    def test_tuple_versions(self):
+        """
+        Ensures constraints are applied to tuple versions
+
+        :return:
+        """
+        factory = factories.Factory(
+            abstract=factories.examples.zoo.Animal,
+            plugin_identifier='species',
+            versioning_identifier='version',
+        )
+
+        for version in [(1, 0), (1, 4, 2), (2, 0)]:
+            factory.register(
+                type(
+                    'Tortoise',
+                    (factories.examples.zoo.Animal,),
+                    dict(species='tortoise', version=version),
+                ),
+            )
+
+        self.assertEqual(
+            factory.request('tortoise', version='1.x').version,
+            (1, 4, 2),
+        )
+
+
+# ------------------------------------------------------------------------------
+class StatsTests(PluginDirectoryTestCase):
+    """
+    Tests the runtime counters of the factory
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(StatsTests, self).setUp()
+        self.metrics = list()
+
+        filepath = _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+
+        with open(filepath, 'a') as f:
+            f.write('    version = 1\n')
+
+        with open(os.path.join(self.directory, 'broken.py'), 'w') as f:
+            f.write('raise ValueError(\'This plugin is broken\')\n')
+
+        self.factory = self._factory(
+            versioning_identifier='version',
+            metrics_hook=lambda name, amount: self.metrics.append(name),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_discovery(self):
+        """
+        Ensures the scanning of files is counted
+
+        :return:
+        """
+        stats = self.factory.stats()
+
+        self.assertEqual(stats['files_scanned'], 2)
+        self.assertEqual(stats['files_failed'], 1)
+        self.assertEqual(stats['plugins'], 1)
+        self.assertGreater(stats['discovery_time'], 0)
+
+    # --------------------------------------------------------------------------
+    def test_requests(self):
+        """
+        Ensures hits and the different kinds of miss are counted
+
+        :return:
+        """
+        self.factory.request('koala')
+        self.factory.request('koala', version=5)
+        self.factory.request('platypus')
+
+        stats = self.factory.stats()
+
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['unknown_identifiers'], 1)
+        self.assertEqual(stats['version_misses'], 1)
+
+    # --------------------------------------------------------------------------
+    def test_reset(self):
+        """
+        Ensures the counters can be reset once read
+
+        :return:
+        """
+        self.factory.request('koala')
+
+        self.assertEqual(self.factory.stats(reset=True)['hits'], 1)
+        self.assertEqual(self.factory.stats()['hits'], 0)
+
+    # --------------------------------------------------------------------------
+    def test_hook(self):
+        """
+        Ensures changes are pushed to the metrics hook, and that a failing
+        hook does not affect the factory
+
+        :return:
+        """
+        self.assertIn('files_scanned', self.metrics)
+
+        self.factory.request('koala')
+        self.assertIn('hits', self.metrics)
+
+        def broken(name, amount):
+            raise RuntimeError('Metrics are down')
+
+        self.factory.set_metrics_hook(broken)
+        self.assertIsNotNone(self.factory.request('koala'))
+
+
+# ------------------------------------------------------------------------------
+class SnapshotTests(PluginDirectoryTestCase):
+    """
+    Tests that a factory can be rebuilt from a snapshot
+    """
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(SnapshotTests, self).setUp()
+
+        self.koala = _write_plugin(self.directory, 'koala.py', 'Koala', 'koala')
+        self.emu = _write_plugin(self.directory, 'emu.py', 'Emu', 'emu')
+
+        self.factory = self._factory(mechanism=factories.Factory.GUESS)
+
+    # --------------------------------------------------------------------------
+    def _restore(self):
+        data = json.loads(json.dumps(self.factory.snapshot()))
+        return factories.Factory.from_snapshot(data)
+
+    # --------------------------------------------------------------------------
+    def test_restore(self):
+        """
+        Ensures the restored factory holds the same plugins without
+        importing any of them
+
+        :return:
+        """
+        factory = self._restore()
+
+        self.assertEqual(factory.identifiers(), self.factory.identifiers())
+        self.assertEqual(factory.paths(), [self.directory])
+
+        record = factory.load_report().get(self.koala)
+        self.assertEqual(record.method, record.DEFERRED)
+
+        # noinspection PyProtectedMember
+        for plugin in factory._registry.plugins:
+            self.assertIsInstance(plugin, factories.PluginProxy)
+            self.assertFalse(plugin.is_resolved())
+
+        self.assertEqual(factory.request('koala').species, 'koala')
+
+    # --------------------------------------------------------------------------
+    def test_pickle(self):
+        """
+        Ensures a snapshot can be pickled
+
+        :return:
+        """
+        data = pickle.loads(pickle.dumps(self.factory.snapshot()))
+        factory = factories.Factory.from_snapshot(data)
+
+        self.assertEqual(factory.request('emu').species, 'emu')
+
+    # --------------------------------------------------------------------------
+    def test_registered(self):
+        """
+        Ensures directly registered plugins are included
+
+        :return:
+        """
+        from factories.examples.zoo.animals.carnivores import Tiger
+
+        self.factory.register(Tiger)
+
+        factory = self._restore()
+
+        self.assertIs(factory.request('tiger'), Tiger)
+
+    # --------------------------------------------------------------------------
+    def test_reload(self):
+        """
+        Ensures a restored factory picks up files which changed after the
+        snapshot was taken
+
+        :return:
+        """
+        data = self.factory.snapshot()
+
+        _write_plugin(self.directory, 'emu.py', 'Emu', 'cassowary')
+        _touch(self.emu)
+
+        factory = factories.Factory.from_snapshot(data)
+        factory.reload()
+
+        self.assertEqual(factory.identifiers(), {'koala', 'cassowary'})
+        self.assertEqual(_import_count(self.koala), 1)
+
+    # --------------------------------------------------------------------------
+    def test_format(self):
+        """
+        Ensures snapshots of an unknown format are refused
+
+        :return:
+        """
+        data = self.factory.snapshot()
+        data['format'] = 0
+
+        with self.assertRaises(ValueError):
+            factories.Factory.from_snapshot(data)
+
+
+# ------------------------------------------------------------------------------
+@unittest.skipIf(
+    factories.factory._metadata is None,
+    'importlib.metadata is not available',
+)
+class EntryPointTests(PluginDirectoryTestCase):
+    """
+    Tests that plugins can be registered from entry points
+    """
+
+    factory_kwargs = dict(paths=None, entry_points='zoo.test_animals')
+
+    # --------------------------------------------------------------------------
+    def setUp(self):
+        super(EntryPointTests, self).setUp()
+
+        # -- An installed distribution advertising a single plugin and
+        # -- a module of plugins
+        _write_plugin(self.directory, 'ep_koala.py', 'Koala', 'koala')
+
+        with open(os.path.join(self.directory, 'ep_birds.py'), 'w') as f:
+            f.write(
+                'from factories.examples.zoo import Animal\n\n\n'
+                'class Emu(Animal):\n'
+                '    species = \'emu\'\n\n\n'
+                'class Kiwi(Animal):\n'
+                '    species = \'kiwi\'\n'
+            )
+
+        self.dist_info = os.path.join(
+            self.directory,
+            'zoo_extras-1.0.dist-info',
+        )
+        os.mkdir(self.dist_info)
+
+        with open(os.path.join(self.dist_info, 'METADATA'), 'w') as f:
+            f.write('Metadata-Version: 2.1\nName: zoo-extras\nVersion: 1.0\n')
+
+        self._write_entry_points(
+            'koala = ep_koala:Koala',
+            'birds = ep_birds',
+            'broken = ep_missing:Nothing',
+        )
+
+        sys.path.insert(0, self.directory)
+
+    # --------------------------------------------------------------------------
+    def tearDown(self):
+        sys.path.remove(self.directory)
+
+        for name in ('ep_koala', 'ep_birds'):
+            sys.modules.pop(name, None)
+
+    # --------------------------------------------------------------------------
+    def _write_entry_points(self, *lines):
+        with open(os.path.join(self.dist_info, 'entry_points.txt'), 'w') as f:
+            f.write('[zoo.test_animals]\n' + '\n'.join(lines) + '\n')
+
+    # --------------------------------------------------------------------------
+    def test_entry_points(self):
+        """
+        Ensures plugins and modules of plugins are registered
+
+        :return:
+        """
+        factory = self._factory()
+
+        self.assertEqual(factory.identifiers(), {'koala', 'emu', 'kiwi'})
+        self.assertEqual(factory.paths(), [])
+
+        record = factory.load_report().get('ep_missing:Nothing')
+        self.assertIsNotNone(record.failure)
+
+    # --------------------------------------------------------------------------
+    def test_reload(self):
+        """
+        Ensures entry points are read again on reload
+
+        :return:
+        """
+        factory = self._factory()
+
+        self._write_entry_points('koala = ep_koala:Koala')
+        factory.reload()
+
+        self.assertEqual(factory.identifiers(), {'koala'})
+
+        factory.reload(full=True)
+
+        self.assertEqual(factory.identifiers(), {'koala'})
+
+
+# ------------------------------------------------------------------------------
+class ScalingTests(PluginDirectoryTestCase):
+    """
+    Tests that the cost of the factory grows linearly with the number of
+    plugins it holds
+    """
+
+    # -- The two sizes compared, and how much slower than linear the larger
+    # -- is allowed to be to absorb timing noise
+    SIZES = (100, 400)
+    TOLERANCE = 3.0
+
+    # --------------------------------------------------------------------------
+    def _assert_linear(self, measure, sizes=None):
+        """
+        Calls measure with each size, taking the best of a few runs, and
+        ensures the larger size costs no more than a linear amount.
+        """
+        sizes = sizes or self.SIZES
+
+        timings = [
+            min(measure(size) for _ in range(3))
+            for size in sizes
+        ]
+
+        ratio = float(sizes[1]) / sizes[0]
+
+        self.assertLess(
+            timings[1],
+            max(timings[0], 0.001) * ratio * self.TOLERANCE,
+            'Scaling from {} to {} took {:.4f}s to {:.4f}s'.format(
+                sizes[0],
+                sizes[1],
+                timings[0],
+                timings[1],
+            ),
+        )
+
+    # --------------------------------------------------------------------------
+    def test_add_path_is_linear(self):
+        """
+        Ensures that adding a path of plugins takes linear time in the
+        number of files within it
+
+        :return:
+        """
+        directories = dict()
+
+        for size in self.SIZES:
+            directories[size] = self._mkdtemp()
+
+            for index in range(size):
+                _write_plugin(
+                    directories[size],
+                    'animal_{}.py'.format(index),
+                    'Animal{}'.format(index),
+                    'animal_{}'.format(index),
+                )
+
+        def measure(size):
+            factory = self._factory(paths=None)
+
+            start = time.time()
+            factory.add_path(directories[size])
+            elapsed = time.time() - start
+
+            self.assertEqual(len(factory.identifiers()), size)
+            return elapsed
+
+        self._assert_linear(measure)
+
+    # --------------------------------------------------------------------------
+    def test_register_is_linear(self):
+        """
+        Ensures that registering plugins one at a time takes linear time
+        in the number of plugins, as each registration only copies the
+        parts of the registry which it alters
+
+        :return:
+        """
+        plugins = [
+            type(
+                'Animal{}'.format(index),
+                (factories.examples.zoo.Animal,),
+                dict(species='animal_{}'.format(index)),
+            )
+            for index in range(2000)
+        ]
+
+        def measure(size):
+            factory = self._factory(paths=None)
+
+            start = time.time()
+
+            for plugin in plugins[:size]:
+                factory.register(plugin)
+
+            elapsed = time.time() - start
+
+            self.assertEqual(len(factory.identifiers()), size)
+            return elapsed
+
+        self._assert_linear(measure, sizes=(500, 2000))
+
+
 # ------------------------------------------------------------------------------
 if __name__ == '__main__':
     unittest.main(verbosity=1)
@@ -0,0 +1,324 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module walks plugin paths whilst applying ignore rules, a maximum
+depth and prune callbacks. Directories which are excluded are removed
+from the walk before it descends into them, so nothing beneath them is
+ever listed or stat'ed.
+
+Ignore rules are glob patterns. They can be given to the factory, in which
+case they apply to every path, or written one per line into a
+.factoryignore file, in which case they apply to the directory holding the
+file and everything beneath it:
+
+.. code-block:: text
+
+    # -- Blank lines and lines starting with a # are skipped
+    tests
+    vendor/
+    test_*.py
+    examples/legacy
+
+A pattern without a / is matched against the name of each file and
+directory. A pattern containing a / is matched against the path relative
+to the directory the pattern was given for. A pattern ending in / only
+matches directories.
+"""
+from . import constants
+
+import os
+import fnmatch
+
+
+# ------------------------------------------------------------------------------
+class IgnoreRules(object):
+    """
+    Holds a set of ignore patterns, each relative to the directory it
+    was given for.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self, rules=None):
+        """
+        :param rules: List of (directory, pattern, directories_only)
+        :type rules: list
+        """
+        self.rules = list(rules or list())
+
+    # --------------------------------------------------------------------------
+    def __bool__(self):
+        return bool(self.rules)
+
+    # -- Python 2 compatibility
+    __nonzero__ = __bool__
+
+    # --------------------------------------------------------------------------
+    def extend(self, directory, patterns):
+        """
+        Returns a new set of rules holding these rules along with the given
+        patterns, relative to the given directory.
+
+        :param directory: The directory the patterns are relative to
+        :type directory: str
+
+        :param patterns: Glob patterns
+        :type patterns: list(str, ...)
+
+        :return: IgnoreRules
+        """
+        rules = list(self.rules)
+
+        for pattern in patterns:
+            pattern = pattern.strip()
+
+            if not pattern or pattern.startswith('#'):
+                continue
+
+            directories_only = pattern.endswith('/')
+            pattern = pattern.strip('/')
+
+            if pattern:
+                rules.append((directory, pattern, directories_only))
+
+        return IgnoreRules(rules)
+
+    # --------------------------------------------------------------------------
+    def read(self, directory):
+        """
+        Returns these rules extended by the .factoryignore file within the
+        given directory, if there is one.
+
+        :param directory: Absolute path to the directory
+        :type directory: str
+
+        :return: IgnoreRules
+        """
+        filepath = os.path.join(directory, constants.IGNORE_FILENAME)
+
+        try:
+            with open(filepath, 'r') as f:
+                return self.extend(directory, f.readlines())
+
+        except (OSError, IOError):
+            return self
+
+    # --------------------------------------------------------------------------
+    def is_ignored(self, location, is_directory=False):
+        """
+        Returns True if the given location matches any of the rules
+
+        :param location: Absolute path to a file or directory
+        :type location: str
+
+        :param is_directory: Whether the location is a directory
+        :type is_directory: bool
+
+        :return: bool
+        """
+        name = os.path.basename(location)
+
+        for directory, pattern, directories_only in self.rules:
+
+            if directories_only and not is_directory:
+                continue
+
+            if '/' not in pattern:
+                if fnmatch.fnmatch(name, pattern):
+                    return True
+
+                continue
+
+            relative = os.path.relpath(location, directory)
+
+            if fnmatch.fnmatch(relative.replace(os.sep, '/'), pattern):
+                return True
+
+        return False
+
+
+# ------------------------------------------------------------------------------
+def _chain(path, location):
+    """
+    Returns the directories from the path down to the given location, or
+    None if the location is not within the path. Both are normalised, so
+    a trailing separator on either does not affect the result.
+    """
+    path = os.path.normpath(path)
+
+    chain = list()
+    current = os.path.normpath(location)
+
+    while True:
+        chain.insert(0, current)
+
+        if current == path:
+            return chain
+
+        parent = os.path.dirname(current)
+
+        if parent == current:
+            return None
+
+        current = parent
+
+
+# ------------------------------------------------------------------------------
+def _rules(path, directory, patterns):
+    """
+    Returns the rules which apply within the given directory, being the
+    given patterns and the ignore files of the path and any directories
+    between the path and the given directory (but not of the directory
+    itself).
+    """
+    rules = IgnoreRules().extend(path, patterns or list())
+
+    for current in (_chain(path, directory) or [directory])[:-1]:
+        rules = rules.read(current)
+
+    return rules
+
+
+# ------------------------------------------------------------------------------
+def walk(path, patterns=None, max_depth=None, prune=None, root=None):
+    """
+    Walks the given path in the same way as os.walk (top down), excluding
+    any files and directories which are ignored. The directories list
+    yielded may be altered to prevent the walk descending into them.
+
+    :param path: Absolute path to walk
+    :type path: str
+
+    :param patterns: Ignore patterns which apply to the whole path
+    :type patterns: list(str, ...)
+
+    :param max_depth: If given, directories deeper than this are not
+        walked. A depth of 0 only walks the path itself.
+    :type max_depth: int
+
+    :param prune: Optional callable which is given the absolute path of
+        each directory and returns True if it should not be walked
+    :type prune: callable
+
+    :param root: If the path is a directory within a larger path, this
+        should be the larger path. The patterns, ignore files and depth
+        are then all applied relative to the root.
+    :type root: str
+
+    :return: generator of (root, directories, files)
+    """
+    root = root or path
+
+    rules = dict()
+    base = _rules(root, path, patterns)
+    offset = len(_chain(root, path) or [path]) - 1
+
+    for current, directories, files in os.walk(path):
+
+        # -- Each directory inherits the rules of its parent, along
+        # -- with any ignore file of its own
+        inherited = rules.pop(current, base)
+
+        if constants.IGNORE_FILENAME in files:
+            inherited = inherited.read(current)
+
+        depth = offset + len(_chain(path, current)) - 1
+
+        kept = list()
+
+        for directory in directories:
+            location = os.path.join(current, directory)
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            if inherited.is_ignored(location, is_directory=True):
+                continue
+
+            if prune and prune(location):
+                continue
+
+            kept.append(directory)
+            rules[location] = inherited
+
+        directories[:] = kept
+
+        if inherited:
+            files[:] = [
+                filename
+                for filename in files
+                if not inherited.is_ignored(os.path.join(current, filename))
+            ]
+
+        yield current, directories, files
+
+
+# ------------------------------------------------------------------------------
+def is_excluded(path, location, patterns=None, max_depth=None, prune=None):
+    """
+    Returns True if the given location - which is within the given path -
+    would be excluded by walking the path with the same arguments. This is
+    used when a single location needs to be examined without walking the
+    entire path.
+
+    :param path: The path which would be walked
+    :type path: str
+
+    :param location: Absolute path to a file or directory within the path
+    :type location: str
+
+    :param patterns: Ignore patterns which apply to the whole path
+    :type patterns: list(str, ...)
+
+    :param max_depth: The maximum depth of the walk
+    :type max_depth: int
+
+    :param prune: The prune callback of the walk
+    :type prune: callable
+
+    :return: bool
+    """
+    is_directory = os.path.isdir(location)
+    directory = location if is_directory else os.path.dirname(location)
+
+    chain = _chain(path, directory)
+
+    if chain is None:
+        return False
+
+    rules = IgnoreRules().extend(path, patterns or list())
+
+    for index, current in enumerate(chain):
+
+        if index:
+            if max_depth is not None and index > max_depth:
+                return True
+
+            if rules.is_ignored(current, is_directory=True):
+                return True
+
+            if prune and prune(current):
+                return True
+
+        rules = rules.read(current)
+
+    if not is_directory:
+        return rules.is_ignored(location)
+
+    return False
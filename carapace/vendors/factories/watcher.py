@@ -0,0 +1,899 @@
+"""
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module holds the file system watchers which allow a factory to keep
+itself up to date as plugin files are added, modified or removed. On linux
+inotify is used directly, and on all other platforms (or where inotify is
+not available) directories and files are polled for changes.
+"""
+from . import walk
+from . import cache
+from .constants import log
+
+import os
+import sys
+import time
+import select
+import struct
+import threading
+
+try:
+    import ctypes
+    import ctypes.util
+
+except ImportError:
+    ctypes = None
+
+
+# -- inotify event masks, as defined in sys/inotify.h
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_MODIFY |
+    _IN_CLOSE_WRITE |
+    _IN_MOVED_FROM |
+    _IN_MOVED_TO |
+    _IN_CREATE |
+    _IN_DELETE |
+    _IN_DELETE_SELF |
+    _IN_MOVE_SELF
+)
+
+# -- The layout of the fixed portion of an inotify event
+_EVENT_STRUCT = struct.Struct('iIII')
+
+
+# ------------------------------------------------------------------------------
+def _within(location, path):
+    """
+    Returns True if the given location is the path, or is beneath it
+
+    :return: bool
+    """
+    path = path.rstrip(os.sep)
+    return location == path or location.startswith(path + os.sep)
+
+
+# ------------------------------------------------------------------------------
+class Watcher(object):
+    """
+    Base class for all watchers. A watcher monitors a set of directories on
+    a background thread, and calls the given callback with the set of
+    locations (files or directories) which have changed.
+
+    Changes are gathered over a short settling period before the callback
+    is called, so that a single save (which may consist of several file
+    system events) results in a single call.
+
+    The paths being watched can be changed whilst the watcher is running
+    through set_paths, without losing what the watcher knows of the paths
+    which remain.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self,
+                 paths,
+                 callback,
+                 interval=1.0,
+                 settle=0.2,
+                 ignore=None,
+                 max_depth=None,
+                 prune=None):
+        """
+        :param paths: The directories to watch
+        :type paths: list(str, ...)
+
+        :param callback: Callable which is given a set of changed locations
+        :type callback: callable
+
+        :param interval: How often, in seconds, the watcher checks whether
+            it has been stopped (and for polling watchers, how often the
+            file system is polled)
+        :type interval: float
+
+        :param settle: Time, in seconds, to gather changes for before
+            calling the callback
+        :type settle: float
+
+        :param ignore: Ignore patterns which apply to every path, see the
+            walk module. Directories which are ignored are not watched.
+        :type ignore: list(str, ...)
+
+        :param max_depth: If given, directories deeper than this within
+            a path are not watched
+        :type max_depth: int
+
+        :param prune: Optional callable which is given the absolute path
+            of each directory and returns True if it should not be watched
+        :type prune: callable
+        """
+        self._paths = [path for path in paths if path]
+        self._callback = callback
+        self._interval = interval
+        self._settle = settle
+        self._ignore = ignore
+        self._max_depth = max_depth
+        self._prune = prune
+        self._stop = threading.Event()
+        self._thread = None
+
+        # -- Set once the watcher has taken in the paths it watches, from
+        # -- which point any change within them is seen
+        self._ready = threading.Event()
+
+        # -- Guards the paths, along with anything a watcher knows of
+        # -- them, as they can be changed from any thread
+        self._lock = threading.RLock()
+
+    # --------------------------------------------------------------------------
+    def __repr__(self):
+        return '[{} - Paths: {}, Running: {}]'.format(
+            self.__class__.__name__,
+            len(self._paths),
+            self.is_running(),
+        )
+
+    # --------------------------------------------------------------------------
+    def _notify(self, locations):
+        """
+        Calls the callback with the given changes, protecting the watcher
+        from any failure within the callback.
+
+        :param locations: The changed locations
+        :type locations: set
+
+        :return: None
+        """
+        if not locations:
+            return
+
+        # noinspection PyBroadException
+        try:
+            self._callback(locations)
+
+        except BaseException:
+            log.warning(
+                'Failed to process file changes : {}'.format(sys.exc_info()),
+            )
+
+    # --------------------------------------------------------------------------
+    def _run(self):
+        """
+        This is the body of the watcher thread and should be re-implemented
+        """
+        raise NotImplementedError
+
+    # --------------------------------------------------------------------------
+    def _paths_changed(self, added, removed):
+        """
+        This is called when the watched paths change, and should be
+        re-implemented to start and stop watching the given paths.
+
+        :param added: The paths which are now watched
+        :type added: list(str, ...)
+
+        :param removed: The paths which are no longer watched
+        :type removed: list(str, ...)
+
+        :return: None
+        """
+        pass
+
+    # --------------------------------------------------------------------------
+    def _wake(self):
+        """
+        This is called when the watcher thread needs to act straight away -
+        such as when it is stopped - and can be re-implemented by watchers
+        which block for long periods.
+
+        :return: None
+        """
+        pass
+
+    # --------------------------------------------------------------------------
+    def _is_watched(self, location):
+        """
+        Returns True if the given location is within any watched path
+
+        :return: bool
+        """
+        return any(_within(location, path) for path in self._paths)
+
+    # --------------------------------------------------------------------------
+    def _root(self, location):
+        """
+        Returns the watched path which the given location is within
+
+        :return: str or None
+        """
+        for path in self._paths:
+            if _within(location, path):
+                return path
+
+        return None
+
+    # --------------------------------------------------------------------------
+    def _walk(self, directory, root):
+        """
+        Walks the given directory - which is within the given watched path -
+        in the same way as os.walk, but skipping the directories which are
+        excluded by the ignore rules, maximum depth or prune callback.
+
+        :return: generator of (root, directories, files)
+        """
+        if walk.is_excluded(
+                root,
+                directory,
+                patterns=self._ignore,
+                max_depth=self._max_depth,
+                prune=self._prune):
+            return iter(list())
+
+        return walk.walk(
+            directory,
+            patterns=self._ignore,
+            max_depth=self._max_depth,
+            prune=self._prune,
+            root=root,
+        )
+
+    # --------------------------------------------------------------------------
+    def paths(self):
+        """
+        Returns the directories being watched
+
+        :return: list(str, ...)
+        """
+        return list(self._paths)
+
+    # --------------------------------------------------------------------------
+    def set_paths(self, paths):
+        """
+        Changes the directories being watched. This can be called whilst
+        the watcher is running, and only the paths which are added or
+        removed are affected.
+
+        :param paths: The directories to watch
+        :type paths: list(str, ...)
+
+        :return: None
+        """
+        paths = [path for path in paths if path]
+
+        with self._lock:
+            added = [path for path in paths if path not in self._paths]
+            removed = [path for path in self._paths if path not in paths]
+
+            self._paths = paths
+
+            if added or removed:
+                self._paths_changed(added, removed)
+
+    # --------------------------------------------------------------------------
+    def is_running(self):
+        """
+        Returns True if the watcher is currently running
+
+        :return: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    # --------------------------------------------------------------------------
+    def wait_until_ready(self, timeout=None):
+        """
+        Waits for the watcher to take in the paths it watches. Changes made
+        before then may not be seen.
+
+        :param timeout: Optional time, in seconds, to wait for
+        :type timeout: float
+
+        :return: True if the watcher is ready
+        """
+        return bool(self._ready.wait(timeout))
+
+    # --------------------------------------------------------------------------
+    def start(self):
+        """
+        Starts watching the paths on a background thread
+
+        :return: None
+        """
+        if self.is_running():
+            return
+
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='factories-{}'.format(self.__class__.__name__),
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    # --------------------------------------------------------------------------
+    def stop(self, timeout=None):
+        """
+        Stops the watcher, waiting for its thread to finish.
+
+        :param timeout: Optional time to wait for the thread to finish
+        :type timeout: float
+
+        :return: None
+        """
+        self._stop.set()
+        self._wake()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+        self._thread = None
+        self._ready.clear()
+
+
+# ------------------------------------------------------------------------------
+class PollingWatcher(Watcher):
+    """
+    Watches paths by periodically polling the modification times of the
+    directories within them - which change when entries are added or
+    removed - along with the stamp of each file, which changes when a file
+    is modified in place.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self,
+                 paths,
+                 callback,
+                 interval=1.0,
+                 settle=0.2,
+                 match=None,
+                 ignore=None,
+                 max_depth=None,
+                 prune=None):
+        """
+        :param match: Optional callable which is given a filename and
+            returns True if changes to that file are of interest.
+        :type match: callable
+        """
+        super(PollingWatcher, self).__init__(
+            paths,
+            callback,
+            interval=interval,
+            settle=settle,
+            ignore=ignore,
+            max_depth=max_depth,
+            prune=prune,
+        )
+
+        self._match = match
+
+        # -- directory -> (mtime, [subdirectories], [files])
+        self._directories = dict()
+
+        # -- filepath -> stamp
+        self._files = dict()
+
+    # --------------------------------------------------------------------------
+    def _list(self, directory, root):
+        """
+        Lists the given directory, returning its subdirectories which are
+        not excluded from the walk of the given watched path, and the files
+        which are of interest.
+
+        :return: tuple(list, list)
+        """
+        directories = list()
+        files = list()
+
+        # -- Only this directory is listed, so the walk is abandoned
+        # -- before it descends
+        walked = next(self._walk(directory, root), None)
+
+        if walked is None:
+            return directories, files
+
+        _, names, filenames = walked
+
+        for name in names:
+            directories.append(os.path.join(directory, name))
+
+        for name in filenames:
+            if not self._match or self._match(name):
+                files.append(os.path.join(directory, name))
+
+        return directories, files
+
+    # --------------------------------------------------------------------------
+    def _poll_directory(self, directory, changes, root):
+        """
+        Polls the given directory and everything beneath it, adding any
+        changed locations to the given set. The root is the watched path
+        the directory is within.
+
+        :return: None
+        """
+        try:
+            mtime = os.stat(directory).st_mtime
+
+        except OSError:
+            self._forget_directory(directory, changes)
+            return
+
+        known = self._directories.get(directory)
+
+        # -- Only list the directory again if its entries have changed
+        if known is None or known[0] != mtime:
+            directories, files = self._list(directory, root)
+
+            if known is not None:
+                for filepath in set(known[2]) - set(files):
+                    self._files.pop(filepath, None)
+                    changes.add(filepath)
+
+                for subdirectory in set(known[1]) - set(directories):
+                    self._forget_directory(subdirectory, changes)
+
+            self._directories[directory] = (mtime, directories, files)
+
+        _, directories, files = self._directories[directory]
+
+        # -- Files can be modified in place without the directory
+        # -- changing, so we must stamp each one
+        for filepath in files:
+            file_stamp = cache.stamp(filepath)
+
+            if self._files.get(filepath) != file_stamp:
+
+                # -- Files we are seeing for the first time are only
+                # -- changes if the directory was already known
+                if filepath in self._files or known is not None:
+                    changes.add(filepath)
+
+                self._files[filepath] = file_stamp
+
+        for subdirectory in directories:
+            if subdirectory not in self._directories and known is not None:
+                changes.add(subdirectory)
+
+            self._poll_directory(subdirectory, changes, root)
+
+    # --------------------------------------------------------------------------
+    def _forget_directory(self, directory, changes):
+        """
+        Forgets a directory (and everything beneath it) which no longer
+        exists, recording it as a change.
+
+        :return: None
+        """
+        known = self._directories.pop(directory, None)
+
+        if known is None:
+            return
+
+        changes.add(directory)
+
+        for filepath in known[2]:
+            self._files.pop(filepath, None)
+
+        for subdirectory in known[1]:
+            self._forget_directory(subdirectory, changes)
+
+    # --------------------------------------------------------------------------
+    def poll(self):
+        """
+        Polls all the paths once, returning the set of changed locations
+
+        :return: set(str, ...)
+        """
+        changes = set()
+
+        with self._lock:
+            for path in self._paths:
+                self._poll_directory(path, changes, path)
+
+        return changes
+
+    # --------------------------------------------------------------------------
+    def _paths_changed(self, added, removed):
+
+        # -- Forget what we know of directories which are no longer
+        # -- within any watched path
+        for directory in list(self._directories):
+            if any(_within(directory, path) for path in removed) and \
+                    not self._is_watched(directory):
+                for filepath in self._directories.pop(directory)[2]:
+                    self._files.pop(filepath, None)
+
+        # -- Take a snapshot of the new paths to compare against, so
+        # -- that what is already within them is not seen as a change
+        for path in added:
+            self._poll_directory(path, set(), path)
+
+    # --------------------------------------------------------------------------
+    def _run(self):
+
+        # -- Take an initial snapshot to compare against
+        self.poll()
+        self._ready.set()
+
+        while not self._stop.wait(self._interval):
+            self._notify(self.poll())
+
+
+# ------------------------------------------------------------------------------
+class InotifyWatcher(Watcher):
+    """
+    Watches paths using the linux inotify api, meaning changes are reported
+    by the kernel rather than being polled for.
+    """
+
+    # --------------------------------------------------------------------------
+    def __init__(self,
+                 paths,
+                 callback,
+                 interval=1.0,
+                 settle=0.2,
+                 ignore=None,
+                 max_depth=None,
+                 prune=None):
+        super(InotifyWatcher, self).__init__(
+            paths,
+            callback,
+            interval=interval,
+            settle=settle,
+            ignore=ignore,
+            max_depth=max_depth,
+            prune=prune,
+        )
+
+        self._libc = _libc()
+        self._fd = None
+
+        # -- watch descriptor -> directory
+        self._watches = dict()
+
+        # -- A pipe which is written to in order to wake the watcher
+        # -- thread from waiting on events
+        self._waker = None
+
+    # --------------------------------------------------------------------------
+    @classmethod
+    def is_available(cls):
+        """
+        Returns True if inotify can be used on this system
+
+        :return: bool
+        """
+        return _libc() is not None
+
+    # --------------------------------------------------------------------------
+    def _add_watches(self, directory, root=None):
+        """
+        Adds a watch to the given directory and every directory beneath it,
+        other than those excluded by the ignore rules, maximum depth or
+        prune callback.
+
+        :param directory: The directory to watch
+        :type directory: str
+
+        :param root: The watched path the directory is within. If not
+            given, the directory is taken to be a watched path.
+        :type root: str
+
+        :return: None
+        """
+        for current, _, _ in self._walk(directory, root or directory):
+            descriptor = self._libc.inotify_add_watch(
+                self._fd,
+                current.encode(sys.getfilesystemencoding()),
+                _WATCH_MASK,
+            )
+
+            if descriptor >= 0:
+                self._watches[descriptor] = current
+
+    # --------------------------------------------------------------------------
+    def _remove_watches(self, path):
+        """
+        Removes the watches from the given directory and every directory
+        beneath it, other than those still within another watched path
+
+        :return: None
+        """
+        for descriptor, directory in list(self._watches.items()):
+            if _within(directory, path) and not self._is_watched(directory):
+                self._libc.inotify_rm_watch(self._fd, descriptor)
+                self._watches.pop(descriptor, None)
+
+    # --------------------------------------------------------------------------
+    def _paths_changed(self, added, removed):
+
+        # -- If the watcher is not running the watches are added for
+        # -- all the paths once it starts
+        if self._fd is None:
+            return
+
+        for path in removed:
+            self._remove_watches(path)
+
+        for path in added:
+            self._add_watches(path)
+
+    # --------------------------------------------------------------------------
+    def _wake(self):
+        with self._lock:
+            if self._waker is None:
+                return
+
+            # -- If the pipe is full the thread is already due to wake
+            try:
+                os.write(self._waker[1], b'.')
+
+            except OSError:
+                pass
+
+    # --------------------------------------------------------------------------
+    def _read(self):
+        """
+        Reads all the pending events, returning the changed locations
+
+        :return: set(str, ...)
+        """
+        changes = set()
+
+        with self._lock:
+            try:
+                data = os.read(self._fd, 65536)
+
+            except OSError:
+                return changes
+
+            self._process(data, changes)
+
+        return changes
+
+    # --------------------------------------------------------------------------
+    def _process(self, data, changes):
+        """
+        Adds the locations changed by the given inotify events to the
+        given set of changes
+
+        :param data: The events read from inotify
+        :type data: bytes
+
+        :param changes: The set to add the changed locations to
+        :type changes: set
+
+        :return: None
+        """
+        offset = 0
+
+        while offset + _EVENT_STRUCT.size <= len(data):
+            descriptor, mask, _, length = _EVENT_STRUCT.unpack_from(
+                data,
+                offset,
+            )
+
+            offset += _EVENT_STRUCT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            # -- If events have been dropped we cannot know what has
+            # -- changed, so we report every path
+            if mask & _IN_Q_OVERFLOW:
+                changes.update(self._paths)
+                continue
+
+            directory = self._watches.get(descriptor)
+
+            if directory is None:
+                continue
+
+            if mask & _IN_IGNORED:
+                self._watches.pop(descriptor, None)
+                continue
+
+            location = directory
+
+            if name:
+                location = os.path.join(
+                    directory,
+                    name.decode(sys.getfilesystemencoding()),
+                )
+
+            changes.add(location)
+
+            # -- New directories need watching too, unless the rules
+            # -- of the path they are within exclude them
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                root = self._root(location)
+
+                if root:
+                    self._add_watches(location, root)
+
+    # --------------------------------------------------------------------------
+    def _run(self):
+        descriptor = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+
+        if descriptor < 0:
+            log.warning('Could not initialise inotify')
+            return
+
+        try:
+            # -- Once the descriptor is set, paths are watched as soon
+            # -- as they are added
+            with self._lock:
+                self._fd = descriptor
+                self._waker = _pipe()
+
+                for path in self._paths:
+                    self._add_watches(path)
+
+            self._ready.set()
+
+            while not self._stop.is_set():
+                readable, _, _ = select.select(
+                    [self._fd, self._waker[0]],
+                    [],
+                    [],
+                    self._interval,
+                )
+
+                # -- We are only woken to check whether we have been
+                # -- stopped
+                if self._waker[0] in readable:
+                    os.read(self._waker[0], 4096)
+
+                if self._fd not in readable:
+                    continue
+
+                # -- Gather events for a short period so that related
+                # -- events are reported together
+                changes = self._read()
+                time.sleep(self._settle)
+                changes.update(self._read())
+
+                self._notify(changes)
+
+        finally:
+            with self._lock:
+                for opened in (self._waker or tuple()) + (descriptor,):
+                    os.close(opened)
+
+                self._fd = None
+                self._waker = None
+                self._watches = dict()
+
+
+# ------------------------------------------------------------------------------
+def _pipe():
+    """
+    Returns the (read, write) file descriptors of a new pipe, which do not
+    block where the platform allows it
+
+    :return: tuple(int, int)
+    """
+    if hasattr(os, 'pipe2'):
+        return os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    return os.pipe()
+
+
+# ------------------------------------------------------------------------------
+def _libc():
+    """
+    Returns the c library if it exposes the inotify api, otherwise None
+
+    :return: ctypes.CDLL or None
+    """
+    if ctypes is None or not sys.platform.startswith('linux'):
+        return None
+
+    # noinspection PyBroadException
+    try:
+        libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6',
+            use_errno=True,
+        )
+
+    except BaseException:
+        return None
+
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+
+    return libc
+
+
+# ------------------------------------------------------------------------------
+def create(paths,
+           callback,
+           interval=1.0,
+           match=None,
+           polling=False,
+           ignore=None,
+           max_depth=None,
+           prune=None):
+    """
+    Creates the most appropriate watcher for this platform. The watcher is
+    not started.
+
+    :param paths: The directories to watch
+    :type paths: list(str, ...)
+
+    :param callback: Callable which is given a set of changed locations
+    :type callback: callable
+
+    :param interval: The polling interval, in seconds
+    :type interval: float
+
+    :param match: Optional callable which is given a filename and returns
+        True if changes to that file are of interest. This is only used by
+        polling watchers, inotify watchers report all changes.
+    :type match: callable
+
+    :param polling: If True a polling watcher is always used
+    :type polling: bool
+
+    :param ignore: Ignore patterns which apply to every path, see the
+        walk module. Directories which are ignored are not watched.
+    :type ignore: list(str, ...)
+
+    :param max_depth: If given, directories deeper than this within a
+        path are not watched
+    :type max_depth: int
+
+    :param prune: Optional callable which is given the absolute path of
+        each directory and returns True if it should not be watched
+    :type prune: callable
+
+    :return: Watcher
+    """
+    if not polling and InotifyWatcher.is_available():
+        return InotifyWatcher(
+            paths,
+            callback,
+            interval=interval,
+            ignore=ignore,
+            max_depth=max_depth,
+            prune=prune,
+        )
+
+    return PollingWatcher(
+        paths,
+        callback,
+        interval=interval,
+        match=match,
+        ignore=ignore,
+        max_depth=max_depth,
+        prune=prune,
+    )